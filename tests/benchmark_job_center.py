@@ -0,0 +1,68 @@
+"""Time the Job Center parsers against the pages recorded in tests/cassettes.
+
+Run with ``make benchmark`` or ``python -m tests.benchmark_job_center``.
+"""
+
+import gzip
+import timeit
+from pathlib import Path
+
+import yaml
+
+from warn.platforms.job_center.site import NoSearchResultsError, Site
+
+CASSETTE_DIR = Path(__file__).parent / "cassettes"
+
+
+def load_pages():
+    """Pull every recorded Job Center page out of the cassettes, split by page type."""
+    search_pages, detail_pages = [], []
+    for cassette in sorted(CASSETTE_DIR.glob("*.yaml")):
+        with open(cassette) as fh:
+            interactions = yaml.safe_load(fh)["interactions"]
+        for interaction in interactions:
+            body = interaction["response"]["body"]["string"]
+            if isinstance(body, bytes):
+                if "gzip" in interaction["response"]["headers"].get(
+                    "Content-Encoding", []
+                ):
+                    body = gzip.decompress(body)
+                body = body.decode("utf-8")
+            if interaction["request"]["uri"].split("?")[0][-1].isdigit():
+                detail_pages.append(body)
+            else:
+                search_pages.append(body)
+    return search_pages, detail_pages
+
+
+def parse_search_pages(site, pages):
+    """Parse the rows and next page link out of each search results page."""
+    for html in pages:
+        try:
+            site._parse_search_results(html)
+        except NoSearchResultsError:
+            pass
+
+
+def parse_detail_pages(site, pages):
+    """Parse the definition list out of each detail page."""
+    for html in pages:
+        site._parse_detail_page(html)
+
+
+def main(repeat=5, number=20):
+    """Print the best pages-per-second rate for each kind of page."""
+    site = Site("OK", "https://okjobmatch.com/search/warn_lookups", "/tmp")
+    search_pages, detail_pages = load_pages()
+    for label, func, pages in [
+        ("search results", parse_search_pages, search_pages),
+        ("detail", parse_detail_pages, detail_pages),
+    ]:
+        timer = timeit.Timer(lambda: func(site, pages))
+        best = min(timer.repeat(repeat=repeat, number=number))
+        rate = len(pages) * number / best
+        print(f"{label:>15}: {len(pages)} pages, {rate:,.0f} pages/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Time pdfrodent's row classifier against synthetic camelot tables.
+
+Run with ``make benchmark`` or ``python -m tests.benchmark_pdfrodent``.
+"""
+
+import logging
+import random
+import time
+from unittest.mock import patch
+
+from warn.pdfrodent import pdfrodent
+
+HEADER = ["Company\nName", "Address", "City ,  State", "Notice  Date", "Employees"]
+FIELD_FIXES = {
+    "Company Name": "company",
+    "Address": "address",
+    "City , State": "city",
+    "Notice Date": "notice_date",
+}
+
+
+class FakeTable:
+    """Just enough of a camelot table for parse_pdf."""
+
+    def __init__(self, data, page, order):
+        """Initialize a new instance."""
+        self.data = data
+        self.rows = data
+        self.parsing_report = {"accuracy": 99.0, "page": page, "order": order}
+
+
+def make_tables(pages=200, rows_per_page=50, seed=0):
+    """Build pages of tables with headers, blank rows, fragments and an orphaned header."""
+    rng = random.Random(seed)
+    tables = []
+    for page in range(1, pages + 1):
+        data = [HEADER]
+        for i in range(rows_per_page):
+            kind = rng.random()
+            if kind < 0.05:
+                data.append(["", "  ", "\n", "", ""])
+            elif kind < 0.15 and len(data) > 1:
+                data.append(["", f"Suite {i}\n", "", "", ""])
+            else:
+                data.append(
+                    [
+                        f"Company  {i}\nInc.",
+                        f"{i} Main   St.",
+                        "Jackson ,\nMS",
+                        f" {page % 12 + 1}/{i % 28 + 1}/2024 ",
+                        str(rng.randint(1, 500)),
+                    ]
+                )
+        # Every so often the header is left alone at the bottom of the page
+        if page % 25 == 0:
+            tables.append(FakeTable([HEADER], page, 1))
+            data = data[1:]
+        tables.append(FakeTable(data, page, 1 if page % 25 else 2))
+    return tables
+
+
+def main():
+    """Print the rows per second the classifier gets through."""
+    # Fragments without a supplemental header log a warning each, which would swamp the timing
+    logging.disable(logging.WARNING)
+    runs = []
+    for _ in range(5):
+        # Fresh tables each time, in case a parse changes them
+        tables = make_tables()
+        rows = sum(len(t.data) for t in tables)
+        with patch.object(pdfrodent.camelot, "read_pdf", return_value=tables):
+            start = time.perf_counter()
+            pdfrodent.parse_pdf("synthetic.pdf", FIELD_FIXES, use_cache=False)
+            runs.append(time.perf_counter() - start)
+    best = min(runs)
+    print(f"Classified {rows:,} rows in {best:.3f}s: {rows / best:,.0f} rows/sec")
+
+
+if __name__ == "__main__":
+    main()
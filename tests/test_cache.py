@@ -1,10 +1,16 @@
+import hashlib
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from os.path import normpath as normpath
 from pathlib import Path, PurePosixPath
 from unittest.mock import patch
 
 import pytest
+import requests
 
-from warn.cache import Cache
+from warn.cache import LOCK_DIR, LOCK_STRIPES, Cache, FreshnessPolicy
 
 from .conftest import file_contents
 
@@ -73,3 +79,259 @@ def test_read(cache_dir):
     cache = Cache(path=cache_dir)
     html = cache.read("fl/2021_page_1.html").strip()
     assert html == "<html><h1>2021 page 1</h1></html>"
+
+
+class _ETagHandler(BaseHTTPRequestHandler):
+    """Serve a file with an ETag, honoring If-None-Match."""
+
+    protocol_version = "HTTP/1.1"
+    body = b"id,company\n1,Acme\n"
+    etag = '"v1"'
+    full_responses = 0
+
+    def do_GET(self):
+        """Respond with a 304 when the client already has this version."""
+        if self.path == "/broken.csv":
+            # Promise more than is sent, like a dropped connection
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(self.body) * 2))
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.wfile.write(self.body)
+            return
+        if self.path == "/slow.csv":
+            time.sleep(0.3)
+        if self.headers.get("If-None-Match") == self.etag:
+            self.send_response(304)
+            self.send_header("ETag", self.etag)
+            self.end_headers()
+            return
+        type(self).full_responses += 1
+        self.send_response(200)
+        self.send_header("ETag", self.etag)
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, *args):
+        """Keep the test output quiet."""
+        pass
+
+
+@pytest.fixture
+def etag_server():
+    """Run a local HTTP server that supports conditional requests."""
+    _ETagHandler.full_responses = 0
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _ETagHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}/data.csv"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_conditional_download(tmpdir, etag_server):
+    """Test that an unchanged file is reused instead of downloaded again."""
+    cache = Cache(tmpdir)
+    first = cache.download("ky/data.csv", etag_server)
+    assert file_contents(first) == _ETagHandler.body.decode()
+    assert _ETagHandler.full_responses == 1
+    # The sidecar isn't listed as a cached file
+    assert [Path(f).name for f in cache.files("ky")] == ["data.csv"]
+
+    second = cache.download("ky/data.csv", etag_server)
+    assert second == first
+    assert _ETagHandler.full_responses == 1
+    assert file_contents(second) == _ETagHandler.body.decode()
+
+    # Callers can still insist on a full download
+    cache.download("ky/data.csv", etag_server, conditional=False)
+    assert _ETagHandler.full_responses == 2
+
+
+def test_concurrent_downloads(tmp_path, etag_server):
+    """Test that workers asking for the same file at once share one download."""
+    cache = Cache(tmp_path)
+    url = etag_server.replace("data.csv", "slow.csv")
+    threads = [
+        threading.Thread(
+            target=cache.download,
+            args=("ky/data.csv", url),
+            kwargs={"conditional": False},
+        )
+        for _ in range(3)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert _ETagHandler.full_responses == 1
+    assert cache.read("ky/data.csv") == _ETagHandler.body.decode()
+    # Neither the locks nor any temporary files are listed
+    assert [Path(f).name for f in cache.files("ky")] == ["data.csv"]
+
+
+def test_interrupted_download(tmp_path, etag_server):
+    """Test that a download cut off partway leaves nothing behind in the cache."""
+    cache = Cache(tmp_path)
+    url = etag_server.replace("data.csv", "broken.csv")
+    with pytest.raises(requests.exceptions.ChunkedEncodingError):
+        cache.download("ky/data.csv", url)
+    assert not cache.exists("ky/data.csv")
+    assert list((tmp_path / "ky").iterdir()) == []
+
+
+def test_lock_stripes(tmp_path):
+    """Test that writing many files reuses a fixed set of lock files."""
+    cache = Cache(tmp_path)
+    for i in range(LOCK_STRIPES * 2):
+        cache.write(f"mo/page_{i}.html", "<html></html>")
+    locks = list((tmp_path / LOCK_DIR).iterdir())
+    assert 0 < len(locks) <= LOCK_STRIPES
+
+
+def test_cache_index(tmp_path, etag_server):
+    """Test that every file saved is recorded in the index."""
+    cache = Cache(tmp_path)
+    cache.write("fl/page.html", "<html></html>", url="https://example.com/page")
+    cache.write_binary("fl/notice.pdf", b"%PDF-1.4")
+    cache.download("ky/data.csv", etag_server)
+    cutoff = datetime.now(timezone.utc) + timedelta(minutes=1)
+
+    entries = cache.index.entries(state="fl")
+    assert [e["name"] for e in entries] == ["fl/notice.pdf", "fl/page.html"]
+    assert entries[1]["url"] == "https://example.com/page"
+    assert entries[1]["size"] == len("<html></html>")
+    assert entries[0]["sha256"] == hashlib.sha256(b"%PDF-1.4").hexdigest()
+    assert cache.index.get(tmp_path / "ky/data.csv")["url"] == etag_server
+    assert cache.index.bytes_by_state() == {
+        "fl": len("<html></html>") + len(b"%PDF-1.4"),
+        "ky": len(_ETagHandler.body),
+    }
+    assert len(cache.index.entries(fetched_before=cutoff)) == 3
+    assert cache.index.entries(fetched_before=cutoff - timedelta(hours=1)) == []
+    # The index isn't listed as a cached file
+    assert sorted(cache.files()) == [str(tmp_path / "fl"), str(tmp_path / "ky")]
+
+
+def test_freshness_policies(tmp_path, etag_server):
+    """Test that each file's policy decides whether it's fetched again."""
+    this_year = datetime.now().year
+    cache = Cache(
+        tmp_path,
+        policies={
+            "ky/*.csv": FreshnessPolicy(immutable_after_years=2),
+            "ky/latest.html": FreshnessPolicy(max_age=timedelta(hours=1)),
+            "ky/live.html": FreshnessPolicy(always_refresh=True),
+        },
+    )
+    for name in (f"ky/{this_year - 2}.csv", f"ky/{this_year - 1}.csv"):
+        cache.download(name, etag_server, conditional=False)
+    assert _ETagHandler.full_responses == 2
+    # History is never requested again, while last year is
+    assert cache.is_settled(f"ky/{this_year - 2}.csv")
+    assert not cache.is_settled(f"ky/{this_year - 1}.csv")
+    cache.download(f"ky/{this_year - 2}.csv", etag_server, conditional=False)
+    cache.download(f"ky/{this_year - 1}.csv", etag_server, conditional=False)
+    assert _ETagHandler.full_responses == 3
+    # A year can be supplied when it isn't in the name
+    cache.download("ky/archive.csv", etag_server, year=this_year - 5)
+    assert cache.is_fresh("ky/archive.csv", year=this_year - 5)
+    assert not cache.is_fresh("ky/archive.csv")
+
+    cache.write("ky/latest.html", "<html></html>")
+    cache.write("ky/live.html", "<html></html>")
+    cache.write("ky/other.html", "<html></html>")
+    assert cache.is_fresh("ky/latest.html")
+    assert not cache.is_fresh("ky/live.html")
+    assert cache.is_fresh("ky/other.html")
+    assert not cache.is_fresh("ky/missing.html")
+    assert cache.read_or_fetch("ky/live.html", etag_server) == "id,company\n1,Acme\n"
+    assert cache.read_or_fetch("ky/latest.html", etag_server) == "<html></html>"
+
+
+def test_source_manifest(tmp_path):
+    """Test that the manifest notices changed sources and missing exports."""
+    from warn.cache import SourceManifest
+
+    source = tmp_path / "cache" / "ca" / "report.pdf"
+    source.parent.mkdir(parents=True)
+    source.write_bytes(b"first version")
+    export = tmp_path / "exports" / "ca.csv"
+    export.parent.mkdir()
+    export.write_text("company\nAcme\n")
+
+    manifest = SourceManifest("ca", tmp_path / "cache")
+    # Nothing has been recorded yet
+    assert not manifest.is_current([source], export)
+    manifest.save([source], export)
+    assert manifest.is_current([source], export)
+
+    # A changed source, an extra source or a missing export all force a rebuild
+    source.write_bytes(b"second version")
+    assert not manifest.is_current([source], export)
+    manifest.save([source], export)
+    extra = source.with_name("extra.pdf")
+    extra.write_bytes(b"new file")
+    assert not manifest.is_current([source, extra], export)
+    export.unlink()
+    assert not manifest.is_current([source], export)
+
+
+def test_source_manifest_shared_code(tmp_path, monkeypatch):
+    """Test that a change to shared parsing code forces a rebuild."""
+    from warn import cache
+
+    shared = tmp_path / "pdfrodent.py"
+    shared.write_text("# first version\n")
+    monkeypatch.setattr(cache, "SHARED_PARSING_MODULES", [shared])
+    source = tmp_path / "cache" / "ms" / "report.pdf"
+    source.parent.mkdir(parents=True)
+    source.write_bytes(b"report")
+    export = tmp_path / "ms.csv"
+    export.write_text("company\nAcme\n")
+
+    manifest = cache.SourceManifest("ms", tmp_path / "cache")
+    manifest.save([source], export)
+    assert manifest.is_current([source], export)
+    shared.write_text("# second version\n")
+    assert not manifest.is_current([source], export)
+
+
+@pytest.mark.parametrize(
+    "compression,sharded",
+    [(None, True), ("gzip", False), ("gzip", True), ("zstd", True)],
+)
+def test_compact_layout(tmp_path, compression, sharded):
+    """Test that a sharded or compressed cache works just like a plain one."""
+    if compression == "zstd":
+        pytest.importorskip("zstandard")
+    cache = Cache(tmp_path, compression=compression, sharded=sharded)
+    html = "<html><h1>Hello\r\nworld</h1></html>"
+    assert cache.write("ks/records/1.html", html) == str(tmp_path / "ks/records/1.html")
+    cache.write("ks/records/2.html", html)
+    cache.write_binary("ks/notice.pdf", b"%PDF-1.4")
+    # Something saved before the layout was switched on
+    Cache(tmp_path).write("ks/records/old.html", "old")
+
+    assert cache.exists("ks/records/1.html")
+    assert not cache.exists("ks/records/3.html")
+    assert cache.read("ks/records/1.html") == html
+    assert cache.read("ks/records/old.html") == "old"
+    assert cache.read_binary("ks/notice.pdf") == b"%PDF-1.4"
+    assert cache.files("ks/records", "*.html") == [
+        str(tmp_path / f"ks/records/{n}.html") for n in ("1", "2", "old")
+    ]
+    assert cache.files("ks") == [str(tmp_path / "ks/notice.pdf")]
+    assert len(cache.files("ks", "**/*.html")) == 3
+
+    # Nothing is stored under its plain name
+    stored = [p for p in (tmp_path / "ks").rglob("*") if p.is_file()]
+    assert tmp_path / "ks/records/1.html" not in stored
+    assert len(stored) == 4
+
+
+def test_unknown_compression(tmp_path):
+    """Test that a typo in the compression is caught straight away."""
+    with pytest.raises(ValueError):
+        Cache(tmp_path, compression="gz")
@@ -0,0 +1,126 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from warn.client import Client, RateLimiter
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Serve a fixed body over keep-alive connections."""
+
+    protocol_version = "HTTP/1.1"
+    body = b"<html><h1>Hello world</h1></html>"
+
+    def do_GET(self):
+        """Respond to a GET request, setting a cookie on /login."""
+        self.send_response(200)
+        if self.path == "/login":
+            self.send_header("Set-Cookie", "session_id=abc123; Path=/")
+        if self.path == "/chunked":
+            # No Content-Length, like many file downloads
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for piece in (self.body[:10], self.body[10:]):
+                self.wfile.write(f"{len(piece):x}\r\n".encode() + piece + b"\r\n")
+            self.wfile.write(b"0\r\n\r\n")
+            return
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, *args):
+        """Keep the test output quiet."""
+        pass
+
+
+@pytest.fixture
+def server():
+    """Run a local HTTP server for the length of a test."""
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_stats_per_host(server):
+    """Test that bytes and requests are tallied for each host."""
+    client = Client()
+    for _ in range(3):
+        r = client.get(f"{server}/page.html")
+        assert r.ok
+    host = server.split("//")[-1]
+    assert client.stats[host]["requests"] == 3
+    assert client.stats[host]["bytes"] == 3 * len(_Handler.body)
+    assert client.stats[host]["seconds"] > 0
+    client.reset_stats()
+    assert client.stats == {}
+
+
+def test_streamed_bytes(server):
+    """Test that a chunked, streamed body is counted once it has been read."""
+    client = Client()
+    host = server.split("//")[-1]
+    with client.get(f"{server}/chunked", stream=True) as r:
+        assert host not in client.stats
+        body = b"".join(r.iter_content(chunk_size=4))
+    assert body == _Handler.body
+    assert client.stats[host]["bytes"] == len(_Handler.body)
+
+
+def test_sessions_keep_their_own_cookies(server):
+    """Test that cookies never leak between sessions or into one-off requests."""
+    client = Client()
+    with client.session() as first:
+        first.get(f"{server}/login")
+        assert first.cookies.get("session_id") == "abc123"
+        with client.session() as second:
+            assert second.cookies.get("session_id") is None
+        # Closing a session leaves the shared pool usable
+        assert first.get(f"{server}/page.html").ok
+    r = client.get(f"{server}/login")
+    assert r.cookies.get("session_id") == "abc123"
+    with client.session() as third:
+        assert third.cookies.get("session_id") is None
+
+
+def test_default_timeout(server, monkeypatch):
+    """Test that requests get the client's timeout unless they set their own."""
+    client = Client(timeout=5)
+    seen = []
+    original = requests.Session.request
+
+    def spy(self, method, url, **kwargs):
+        seen.append(kwargs["timeout"])
+        return original(self, method, url, **kwargs)
+
+    monkeypatch.setattr(requests.Session, "request", spy)
+    client.get(server)
+    client.get(server, timeout=30)
+    client.get(server, timeout=None)
+    assert seen == [5, 30, None]
+
+
+def test_rate_limit_per_host():
+    """Test that a declared limit paces one host without slowing another."""
+    limiter = RateLimiter()
+    limiter.limit("slow.example.com", rate=20, burst=2)
+    start = time.monotonic()
+    waits = [limiter.wait("https://slow.example.com/page") for _ in range(4)]
+    elapsed = time.monotonic() - start
+    # The burst goes straight out, then one request every 50 milliseconds
+    assert waits[:2] == [0.0, 0.0]
+    assert elapsed >= 0.09
+    assert limiter.wait("https://fast.example.com/page") == 0.0
+
+
+def test_rate_limit_keeps_existing():
+    """Test that a polite default doesn't override a scraper's own limit."""
+    limiter = RateLimiter()
+    limiter.limit("example.com", rate=5)
+    limiter.limit("example.com", rate=0.5, replace=False)
+    assert limiter.buckets["example.com"].rate == 5
@@ -1,9 +1,13 @@
 import re
+import time
 from pathlib import Path
 
 import pytest
 
 from warn.platforms import JobCenterSite
+from warn.platforms.job_center import site as site_module
+from warn.platforms.job_center.cache import RecordIndex
+from warn.platforms.job_center.site import _split_date_range
 
 
 @pytest.fixture
@@ -140,3 +144,145 @@ def test_cached_detail_pages(tmp_path):
     assert len(record_files) == 2
     assert Path(cache_dir, "records").exists()
     assert Path(cache_dir, "search_results").exists()
+
+
+def test_detail_pages_keep_their_order(ok_site, monkeypatch):
+    """Test that detail pages fetched at once come back in the order requested."""
+    numbers = list(range(8))
+
+    def get_page(url, params=None, use_cache=True):
+        number = int(url.rsplit("/")[-1])
+        # Make the earlier pages finish last
+        time.sleep((len(numbers) - number) * 0.01)
+        return (
+            '<dt class="definition-list__title">Company Name</dt>'
+            f'<dd class="definition-list__definition">Company {number}</dd>'
+        )
+
+    monkeypatch.setattr(ok_site, "_get_page", get_page)
+    rows = [
+        {"detail_page_url": f"https://okjobmatch.com/search/warn_lookups/{n}"}
+        for n in numbers
+    ]
+    details = ok_site._scrape_detail_pages(rows, use_cache=True)
+    assert [d["company_name"] for d in details] == [f"Company {n}" for n in numbers]
+
+
+def test_iter_records(ok_site, vcr):
+    """Test that records are yielded page by page without keeping the pages."""
+    # Replay the same searches recorded for test_paged_results
+    with vcr.use_cassette("test_paged_results.yaml"):
+        pages = ok_site.iter_pages(
+            start_date="2020-01-01",
+            end_date="2020-04-30",
+            detail_pages=False,
+        )
+        assert [len(p["data"]) for p in pages] == [25, 17]
+
+
+@pytest.fixture
+def fake_web(monkeypatch):
+    """Serve a one-row search result and its detail page, noting each URL fetched."""
+    search_row = {"city": "Tulsa"}
+    fetched = []
+
+    class Response:
+        status_code = 200
+
+        def __init__(self, text):
+            self.text = text
+
+    def get(url, params=None, verify=True):
+        fetched.append(url)
+        if url.endswith("/780"):
+            return Response("<dd class='definition-list__definition'>Acme</dd>")
+        return Response(
+            "<table><tr><th>Employer</th></tr>"
+            "<tr><td><a href='/search/warn_lookups/780'>Acme</a></td>"
+            f"<td>{search_row['city']}</td><td>74014</td><td>12</td>"
+            "<td>Jan 13, 2021</td><td>WARN</td></tr></table>"
+        )
+
+    monkeypatch.setattr(site_module.client, "get", get)
+    return search_row, fetched
+
+
+def test_record_index(tmp_path, fake_web):
+    """Test that detail pages are only fetched again when their search result changes."""
+    url = "https://okjobmatch.com/search/warn_lookups"
+    search_row, fetched = fake_web
+    path = tmp_path / "record_index.json"
+
+    def scrape():
+        fetched.clear()
+        site = JobCenterSite("OK", url, tmp_path, index=RecordIndex(path))
+        site.scrape("2021-01-01", "2021-12-31", use_cache=False)
+        site.index.save()
+        return [u.rsplit("/")[-1] for u in fetched]
+
+    assert scrape() == ["warn_lookups", "780"]
+    # An unchanged row reuses the cached detail page, even with the cache off
+    assert scrape() == ["warn_lookups"]
+    assert "780" in RecordIndex(path).records
+    # A changed row fetches it again
+    search_row["city"] = "Broken Arrow"
+    assert scrape() == ["warn_lookups", "780"]
+
+
+def test_fresh_pages_are_reused(tmp_path, fake_web):
+    """Test that a page fetched from the web during this run isn't fetched again."""
+    url = "https://okjobmatch.com/search/warn_lookups"
+    search_row, fetched = fake_web
+    site = JobCenterSite("OK", url, tmp_path)
+    assert site.windows("2021-01-01", "2021-12-31", use_cache=False) == [
+        ("2021-01-01", "2021-12-31")
+    ]
+    site.copy().scrape("2021-01-01", "2021-12-31", use_cache=False)
+    assert [u.rsplit("/")[-1] for u in fetched] == ["warn_lookups", "780"]
+
+
+def test_split_date_range():
+    """Test that date ranges are split into the next smaller calendar unit."""
+    assert _split_date_range("2020-01-01", "2020-12-31") == [
+        ("2020-01-01", "2020-03-31"),
+        ("2020-04-01", "2020-06-30"),
+        ("2020-07-01", "2020-09-30"),
+        ("2020-10-01", "2020-12-31"),
+    ]
+    assert _split_date_range("2020-01-01", "2020-03-31") == [
+        ("2020-01-01", "2020-01-31"),
+        ("2020-02-01", "2020-02-29"),
+        ("2020-03-01", "2020-03-31"),
+    ]
+    assert _split_date_range("2020-02-01", "2020-02-29")[:2] == [
+        ("2020-02-01", "2020-02-07"),
+        ("2020-02-08", "2020-02-14"),
+    ]
+    assert _split_date_range("2020-02-01", "2020-02-07") == []
+
+
+def test_windows(ok_site, monkeypatch):
+    """Test that only the busy parts of a year are split."""
+
+    def scrape_search_results_page(url, params, detail_pages, use_cache):
+        start = params["q[notice_on_gteq]"]
+        end = params["q[notice_on_lteq]"]
+        # A busy first quarter, with nothing at all in the fourth
+        if (start, end) == ("2020-10-01", "2020-12-31"):
+            return {}
+        busy = (start, end) in [
+            ("2020-01-01", "2020-12-31"),
+            ("2020-01-01", "2020-03-31"),
+        ]
+        return {"data": [{}], "last_page": 9 if busy else 2}
+
+    monkeypatch.setattr(
+        ok_site, "_scrape_search_results_page", scrape_search_results_page
+    )
+    assert ok_site.windows("2020-01-01", "2020-12-31") == [
+        ("2020-01-01", "2020-01-31"),
+        ("2020-02-01", "2020-02-29"),
+        ("2020-03-01", "2020-03-31"),
+        ("2020-04-01", "2020-06-30"),
+        ("2020-07-01", "2020-09-30"),
+    ]
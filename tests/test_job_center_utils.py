@@ -0,0 +1,130 @@
+import csv
+import time
+
+import pytest
+
+from warn import client
+from warn.platforms import JobCenterSite
+from warn.platforms.job_center import utils
+from warn.platforms.job_center.utils import _dedupe, _scrape_years
+
+from .conftest import file_contents, write_file
+
+RAW = (
+    "employer,address\r\n"
+    'Acme,"1 Main St\nTulsa, OK"\r\n'
+    "Globex,2 Elm St\r\n"
+    'Acme,"1 Main St\nTulsa, OK"\r\n'
+    'Acme,"1 Main St\nNorman, OK"\r\n'
+    "Globex,2 Elm St\r\n"
+)
+DEDUPED = (
+    "employer,address\r\n"
+    'Acme,"1 Main St\nTulsa, OK"\r\n'
+    "Globex,2 Elm St\r\n"
+    'Acme,"1 Main St\nNorman, OK"\r\n'
+)
+
+
+@pytest.mark.parametrize("max_memory_rows", [1_000, 2])
+def test_dedupe(tmp_path, max_memory_rows):
+    """Test that repeated records are dropped, in memory or on disk."""
+    raw_csv = tmp_path / "ok_raw.csv"
+    output_csv = tmp_path / "exports" / "ok.csv"
+    write_file(raw_csv, RAW)
+    _dedupe(raw_csv, output_csv, max_memory_rows=max_memory_rows)
+    assert file_contents(output_csv) == DEDUPED
+
+
+def test_scrape_years_keeps_order(tmp_path, monkeypatch):
+    """Test that years scraped at once are written newest first."""
+
+    def iter_pages(self, start_date, end_date, use_cache):
+        year = int(start_date[:4])
+        # Make the newest years finish last
+        time.sleep((year - 2015) * 0.02)
+        for page in (1, 2):
+            detail = {
+                "number_of_employees_affected": "1",
+                "address": "",
+                "record_number": f"{year}-{page}",
+            }
+            yield {"data": [{"employer": f"{year} page {page}", "detail": detail}]}
+
+    monkeypatch.setattr(JobCenterSite, "iter_pages", iter_pages)
+    monkeypatch.setattr(
+        JobCenterSite, "windows", lambda self, start, end, use_cache: [(start, end)]
+    )
+    site = JobCenterSite("OK", "https://okjobmatch.com/search/warn_lookups", tmp_path)
+    years = [(f"{y}-01-01", f"{y}-12-31") for y in range(2020, 2015, -1)]
+    output_csv = tmp_path / "ok_raw.csv"
+    headers = ["employer", "number_of_employees_affected", "address", "record_number"]
+    _scrape_years(site, output_csv, headers, years, workers=4)
+    with open(output_csv, newline="") as fh:
+        employers = [row[0] for row in csv.reader(fh)]
+    assert employers == [f"{y} page {p}" for y in range(2020, 2015, -1) for p in (1, 2)]
+
+
+def test_scrape_years_keeps_order_of_split_years(tmp_path, monkeypatch):
+    """Test that a year split into quarters keeps the site's oldest-first row order."""
+
+    def scrape_search_results_page(self, url, params, detail_pages, use_cache):
+        start = params["q[notice_on_gteq]"]
+        end = params["q[notice_on_lteq]"]
+        # Only 2020 is busy enough to split
+        last_page = 9 if (start, end) == ("2020-01-01", "2020-12-31") else 1
+        detail = {
+            "number_of_employees_affected": "1",
+            "address": "",
+            "record_number": "",
+        }
+        return {
+            "data": [{"employer": start, "detail": dict(detail)}],
+            "next_page_url": None,
+            "last_page": last_page,
+        }
+
+    monkeypatch.setattr(
+        JobCenterSite, "_scrape_search_results_page", scrape_search_results_page
+    )
+    site = JobCenterSite("OK", "https://okjobmatch.com/search/warn_lookups", tmp_path)
+    years = [("2021-01-01", "2021-12-31"), ("2020-01-01", "2020-12-31")]
+    output_csv = tmp_path / "ok_raw.csv"
+    headers = ["employer", "number_of_employees_affected", "address", "record_number"]
+    _scrape_years(site, output_csv, headers, years, workers=4)
+    with open(output_csv, newline="") as fh:
+        employers = [row[0] for row in csv.reader(fh)]
+    assert employers == [
+        "2021-01-01",
+        "2020-01-01",
+        "2020-04-01",
+        "2020-07-01",
+        "2020-10-01",
+    ]
+
+
+def test_scrape_state_limits_host(tmp_path, monkeypatch):
+    """Test that a Job Center host is paced without replacing a scraper's own limit."""
+    declared = []
+    monkeypatch.setattr(
+        client, "limit", lambda host, **kwargs: declared.append((host, kwargs))
+    )
+    monkeypatch.setattr(utils, "_scrape_years", lambda *args, **kwargs: None)
+    monkeypatch.setattr(utils, "_dedupe", lambda raw_csv, output_csv: output_csv)
+    utils.scrape_state(
+        "OK",
+        "https://okjobmatch.com/search/warn_lookups",
+        tmp_path / "ok.csv",
+        2021,
+        tmp_path,
+    )
+    assert declared == [
+        (
+            "okjobmatch.com",
+            {
+                "rate": utils.JOB_CENTER_RATE,
+                "burst": utils.JOB_CENTER_BURST,
+                "replace": False,
+            },
+        )
+    ]
@@ -0,0 +1,39 @@
+from pathlib import Path
+
+from warn import pdf
+
+FIXTURE = Path(__file__).parent / "fixtures" / "warn_notices.pdf"
+
+
+def test_extract_tables_in_parallel(monkeypatch):
+    """Test that pages read by a pool of workers come back in page order."""
+    serial = list(pdf.extract_tables(FIXTURE, workers=1))
+    assert len(serial) == 3
+    monkeypatch.setattr(pdf, "MIN_PARALLEL_PAGES", 1)
+    monkeypatch.setattr(pdf, "PAGES_PER_TASK", 1)
+    assert list(pdf.extract_tables(FIXTURE, workers=2)) == serial
+
+
+def test_extract_all_tables():
+    """Test that every table on each page can be asked for."""
+    pages = list(pdf.extract_tables(FIXTURE, all_tables=True))
+    assert [tables[0] for tables in pages] == list(pdf.extract_tables(FIXTURE))
+
+
+def test_default_workers(monkeypatch):
+    """Test that the Runner's cap keeps extract_tables from starting a pool per CPU."""
+    monkeypatch.setattr(pdf.os, "cpu_count", lambda: 8)
+    monkeypatch.delenv(pdf.WORKERS_ENV, raising=False)
+    assert pdf.default_workers() == 8
+    assert pdf.share_cpus(4) == 2
+    assert pdf.share_cpus(16) == 1
+
+    # Capped at one worker, even a long document is read without a pool
+    monkeypatch.setenv(pdf.WORKERS_ENV, "1")
+    monkeypatch.setattr(pdf, "MIN_PARALLEL_PAGES", 1)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("no pool should be started")
+
+    monkeypatch.setattr(pdf, "ProcessPoolExecutor", fail)
+    assert len(list(pdf.extract_tables(FIXTURE))) == 3
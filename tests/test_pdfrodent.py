@@ -0,0 +1,78 @@
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+
+from warn.pdfrodent import pdfrodent
+
+FIXTURE = Path(__file__).parent / "fixtures" / "warn_notices.pdf"
+
+
+@pytest.fixture
+def pdf(tmp_path):
+    """Copy the sample notices PDF somewhere its parse can be cached."""
+    path = tmp_path / "warn_notices.pdf"
+    shutil.copy(FIXTURE, path)
+    return path
+
+
+def test_parse_pdf(pdf):
+    """Test that the rows from every page are keyed to the header."""
+    filelist = pdfrodent.parse_pdf(pdf, use_cache=False)
+    assert len(filelist) == 24
+    assert filelist[0]["Company Name"] == "Company 1"
+    assert filelist[0]["Number Affected"] == "10"
+    assert filelist[-1]["_int_page"] == 3
+    assert not Path(str(pdf) + pdfrodent.PARSE_CACHE_SUFFIX).exists()
+
+
+def test_parse_cache(pdf, monkeypatch):
+    """Test that a second parse is served from the cache until its inputs change."""
+    first = pdfrodent.parse_pdf(pdf)
+    assert Path(str(pdf) + pdfrodent.PARSE_CACHE_SUFFIX).exists()
+
+    def fail(*args, **kwargs):
+        raise AssertionError("camelot should not run on a cache hit")
+
+    monkeypatch.setattr(pdfrodent.camelot, "read_pdf", fail)
+    assert pdfrodent.parse_pdf(pdf) == first
+
+    # Different field fixes mean a different parse
+    with pytest.raises(AssertionError):
+        pdfrodent.parse_pdf(pdf, field_fixes={"City": "Location"})
+
+
+def test_parse_cache_empty(pdf, monkeypatch):
+    """Test that a PDF without any rows is only parsed once."""
+    monkeypatch.setattr(pdfrodent, "_iter_pdf_rows", lambda *args, **kwargs: iter([]))
+    assert pdfrodent.parse_pdf(pdf) == []
+
+    def fail(*args, **kwargs):
+        raise AssertionError("an empty parse should be served from the cache")
+
+    monkeypatch.setattr(pdfrodent, "_iter_pdf_rows", fail)
+    assert pdfrodent.parse_pdf(pdf) == []
+
+
+def test_iter_pdf_rows(pdf):
+    """Test that reading a page at a time yields the same rows as a whole-document parse."""
+    filelist = pdfrodent.parse_pdf(pdf, use_cache=False)
+    rows = pdfrodent.iter_pdf_rows(pdf, chunk_pages=1)
+    assert next(rows) == filelist[0]
+    assert [filelist[0]] + list(rows) == filelist
+
+
+def test_trace_sink(pdf, tmp_path):
+    """Test that each row's classification is written as a JSON line with its coordinates."""
+    trace_path = tmp_path / "trace" / "debugging.jsonl"
+    with pdfrodent.TraceSink(trace_path) as tracer:
+        filelist = pdfrodent.parse_pdf(pdf, tracer=tracer)
+    with open(trace_path) as fh:
+        events = [json.loads(line) for line in fh]
+    data = [e for e in events if e["event"] == "data"]
+    assert len(data) == len(filelist)
+    assert data[-1]["page"] == 3
+    assert data[0]["line"]["Company Name"] == "Company 1"
+    assert {"pdf", "table", "row"} <= set(data[0])
+    assert events[0]["event"] == "table"
@@ -0,0 +1,26 @@
+from pathlib import Path
+
+from warn.runner import Runner, _scrape_in_worker
+
+
+def test_scrape_in_worker_captures_errors(tmp_path):
+    """Test that a failing scraper is reported instead of raised."""
+    result = _scrape_in_worker(
+        "zz", tmp_path / "exports", tmp_path / "cache", tmp_path / "logs", 10
+    )
+    assert result.state == "zz"
+    assert not result.ok
+    assert result.path is None
+    assert "ModuleNotFoundError" in result.error
+    log = Path(tmp_path, "logs", "zz.log").read_text()
+    assert "ModuleNotFoundError" in log
+
+
+def test_scrape_many_summary(tmp_path):
+    """Test that results come back in the order the states were provided."""
+    runner = Runner(tmp_path / "exports", tmp_path / "cache", tmp_path / "logs")
+    results = runner.scrape_many(["YY", " zz ", "yy"], workers=2)
+    assert [r.state for r in results] == ["yy", "zz"]
+    assert not any(r.ok for r in results)
+    assert Path(tmp_path, "logs", "yy.log").exists()
+    assert Path(tmp_path, "logs", "zz.log").exists()
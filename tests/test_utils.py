@@ -0,0 +1,185 @@
+import csv
+import zipfile
+from datetime import date
+
+import pytest
+from click.testing import CliRunner
+
+from warn import cli, utils
+
+
+def test_write_rows_from_generator(tmp_path, monkeypatch):
+    """Test that rows can be streamed from a generator in several batches."""
+    monkeypatch.setattr(utils, "WRITE_BATCH_SIZE", 3)
+    path = tmp_path / "out.csv"
+    rows = ([i, f"company {i}"] for i in range(10))
+    assert utils.write_rows_to_csv(path, rows) == 10
+    with open(path, newline="") as f:
+        assert list(csv.reader(f))[-1] == ["9", "company 9"]
+
+
+def test_write_dict_rows_from_generator(tmp_path):
+    """Test that dicts can be streamed and appended without repeating the header."""
+    path = tmp_path / "out.csv"
+    headers = ["id", "company"]
+    rows = ({"id": i, "company": f"company {i}"} for i in range(5))
+    assert utils.write_dict_rows_to_csv(path, headers, rows) == 5
+    more = iter([{"id": 5, "company": "company 5"}])
+    assert utils.write_dict_rows_to_csv(path, headers, more, mode="a") == 1
+    with open(path, newline="") as f:
+        written = list(csv.DictReader(f))
+    assert [r["id"] for r in written] == [str(i) for i in range(6)]
+
+
+@pytest.mark.parametrize("spill", [False, True])
+def test_write_disparate_dict_rows(tmp_path, spill):
+    """Test that the header gathers every key, with prefixed keys at the end."""
+    path = tmp_path / "out.csv"
+    rows = iter(
+        [
+            {"company": "Acme", "_int_page": 1},
+            {"company": "Initech", "city": "Austin", "int_row": 2},
+            {"city": "Reno"},
+        ]
+    )
+    assert utils.write_disparate_dict_rows_to_csv(path, rows, spill=spill) == 3
+    with open(path, newline="") as f:
+        written = list(csv.reader(f))
+    assert written == [
+        ["company", "city", "_int_page", "int_row"],
+        ["Acme", "", "1", ""],
+        ["Initech", "Austin", "", "2"],
+        ["", "Reno", "", ""],
+    ]
+
+
+@pytest.mark.parametrize("format", ["parquet", "arrow"])
+def test_export(tmp_path, format):
+    """Test that a CSV export is copied into a columnar file, with unknown columns as strings."""
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+
+    csv_path = tmp_path / "xx.csv"
+    utils.write_rows_to_csv(
+        csv_path,
+        [["company", "", "company"], ["Acme", "1", ""], ["Initech", "2", "x", "extra"]],
+    )
+    out_path = utils.export(csv_path, format)
+    assert out_path == tmp_path / f"xx.{format}"
+    if format == "parquet":
+        table = pq.read_table(out_path)
+    else:
+        table = pa.ipc.open_file(out_path).read_all()
+    assert table.column_names == ["company", "column_2", "company_2", "column_4"]
+    assert all(t == pa.string() for t in table.schema.types)
+    assert table.to_pylist()[0] == {
+        "company": "Acme",
+        "column_2": "1",
+        "company_2": None,
+        "column_4": None,
+    }
+    assert utils.export(csv_path) == csv_path
+
+
+def test_iter_excel_rows(tmp_path):
+    """Test that workbook rows are read as values, with blank rows left out."""
+    openpyxl = pytest.importorskip("openpyxl")
+
+    excel_path = tmp_path / "xx.xlsx"
+    workbook = openpyxl.Workbook()
+    first = workbook.active
+    first.append(["WARN Notices", None])
+    first.append(["Company", "Employees"])
+    first.append([None, None])
+    first.append(["Acme", 10])
+    workbook.create_sheet("second").append(["Initech", 20])
+    workbook.save(excel_path)
+
+    assert list(utils.iter_excel_rows(excel_path)) == [
+        ["WARN Notices", None],
+        ["Company", "Employees"],
+        ["Acme", 10],
+    ]
+    assert len(list(utils.iter_excel_rows(excel_path, skip_empty=False))) == 4
+    assert list(utils.iter_excel_rows(excel_path, sheet="second")) == [["Initech", 20]]
+    assert len(list(utils.iter_excel_rows(excel_path, sheet=None))) == 4
+    assert utils.parse_excel(excel_path, keep_header=False) == [
+        ["Company", "Employees"],
+        ["Acme", 10],
+    ]
+
+    rows = utils.iter_excel_rows(excel_path)
+    header = utils.find_header_row(rows, lambda row: "Company" in row)
+    assert utils.find_column(header, "employees") == 1
+    assert next(rows) == ["Acme", 10]
+    with pytest.raises(ValueError):
+        utils.find_column(header, "city")
+    with pytest.raises(ValueError):
+        utils.find_header_row(utils.iter_excel_rows(excel_path), lambda row: False)
+
+
+def test_export_types(tmp_path):
+    """Test that known columns get real types, and a declared schema fixes the columns."""
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+
+    csv_path = tmp_path / "xx.csv"
+    utils.write_rows_to_csv(
+        csv_path,
+        [
+            ["company", "notice_date", "jobs", "supplement_0"],
+            ["Acme", "Jan 13, 2021", "1,200", "x"],
+            ["Initech", "2021-02-03 00:00:00", "n/a", ""],
+            ["Globex", "3/4/2021", "", ""],
+        ],
+    )
+    table = pq.read_table(utils.export(csv_path, "parquet"))
+    assert table.schema.field("notice_date").type == pa.date32()
+    assert table.schema.field("jobs").type == pa.int64()
+    assert table.column("notice_date").to_pylist() == [
+        date(2021, 1, 13),
+        date(2021, 2, 3),
+        date(2021, 3, 4),
+    ]
+    # Counts that aren't numbers become nulls
+    assert table.column("jobs").to_pylist() == [1200, None, None]
+
+    schema = {"company": "string", "affected": "int", "notice_date": "date"}
+    table = pq.read_table(utils.export(csv_path, "parquet", schema))
+    assert table.column_names == list(schema)
+    assert table.column("affected").to_pylist() == [None, None, None]
+
+
+def test_export_needs_pyarrow(monkeypatch):
+    """Test that asking for a columnar export without pyarrow fails before scraping."""
+    monkeypatch.setattr(utils, "has_pyarrow", lambda: False)
+    result = CliRunner().invoke(cli.main, ["zz", "--format", "parquet"])
+    assert result.exit_code == 2
+    assert "requires pyarrow" in result.output
+
+
+@pytest.mark.parametrize("dimension", ['<dimension ref="A1:A2"/>', ""])
+def test_iter_excel_rows_bad_dimension(tmp_path, dimension):
+    """Test that rows are whole even when the file misstates the sheet's size."""
+    openpyxl = pytest.importorskip("openpyxl")
+
+    good_path = tmp_path / "good.xlsx"
+    workbook = openpyxl.Workbook()
+    for row in (["Company", "City", "Employees"], ["Acme", "Reno", 10], ["Initech"]):
+        workbook.active.append(row)
+    workbook.save(good_path)
+
+    # Rewrite the sheet with a dimension tag that's too small, or none at all
+    excel_path = tmp_path / "bad.xlsx"
+    with zipfile.ZipFile(good_path) as src, zipfile.ZipFile(excel_path, "w") as dst:
+        for item in src.infolist():
+            data = src.read(item.filename)
+            if item.filename == "xl/worksheets/sheet1.xml":
+                data = data.replace(b'<dimension ref="A1:C3"/>', dimension.encode())
+            dst.writestr(item, data)
+
+    assert list(utils.iter_excel_rows(excel_path)) == [
+        ["Company", "City", "Employees"],
+        ["Acme", "Reno", 10],
+        ["Initech", None, None],
+    ]
@@ -1,14 +1,139 @@
 import csv
+import gzip
+import hashlib
+import json
 import logging
 import os
+import re
+import sqlite3
+import tempfile
+import threading
 import typing
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone
+from fnmatch import fnmatch
+from importlib import metadata
 from os.path import expanduser, join
 from pathlib import Path
 
+import requests
+
 from .utils import get_url
 
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
 logger = logging.getLogger(__name__)
 
+# Suffix for the sidecar files that hold each download's HTTP validators
+VALIDATORS_SUFFIX = ".validators.json"
+
+# Suffixes added to files stored with each supported compression
+COMPRESSION_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+
+# The SQLite database, in the cache directory, that records what the cache holds
+INDEX_NAME = "cache_index.sqlite"
+
+# The folder, in the cache directory, that holds the lock files
+LOCK_DIR = ".locks"
+
+# Files share this many locks, picked by a hash of their names, so the lock files never pile up
+LOCK_STRIPES = 256
+
+# Suffix for files that are still being written
+TEMP_SUFFIX = ".tmp"
+
+# Parsing code shared between scrapers, which is part of every SourceManifest fingerprint
+SHARED_PARSING_MODULES = [
+    Path(__file__).parent / "utils.py",
+    Path(__file__).parent / "pdf.py",
+    Path(__file__).parent / "pdfrodent" / "pdfrodent.py",
+]
+
+# Read once, since the only way to check the umask is to change it
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+_thread_locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+
+
+class FreshnessPolicy:
+    """When a cached file can be used instead of fetching it again.
+
+    With no arguments, a cached file is always good enough.
+
+    Args:
+        max_age (timedelta): Fetch files again once they're older than this (default None)
+        immutable_after_years (int): Files for a year at least this many years
+            ago never change, so are never fetched again. Files for more recent
+            years are fetched every time, unless max_age allows them (default None)
+        always_refresh (bool): Always fetch files again (default False)
+    """
+
+    def __init__(
+        self,
+        max_age: typing.Optional[timedelta] = None,
+        immutable_after_years: typing.Optional[int] = None,
+        always_refresh: bool = False,
+    ):
+        """Initialize a new instance."""
+        self.max_age = max_age
+        self.immutable_after_years = immutable_after_years
+        self.always_refresh = always_refresh
+
+    def is_immutable(self, year: typing.Optional[int]) -> bool:
+        """Whether files for the provided year are settled for good."""
+        if self.always_refresh or self.immutable_after_years is None or year is None:
+            return False
+        return year <= date.today().year - self.immutable_after_years
+
+    def allows(self, fetched_at: datetime, year: typing.Optional[int] = None) -> bool:
+        """Whether a file fetched at the provided time, for the provided year, can be used."""
+        if self.always_refresh:
+            return False
+        if self.is_immutable(year):
+            return True
+        if self.max_age is not None:
+            return datetime.now(timezone.utc) - fetched_at <= self.max_age
+        return self.immutable_after_years is None
+
+    def __repr__(self):
+        """Describe the policy."""
+        return (
+            f"FreshnessPolicy(max_age={self.max_age!r}, "
+            f"immutable_after_years={self.immutable_after_years!r}, "
+            f"always_refresh={self.always_refresh!r})"
+        )
+
+
+# The notices for the year before last and earlier are taken as final
+SETTLED_YEARS = FreshnessPolicy(immutable_after_years=2)
+
+# How long each kind of cached source can be used before it's fetched again.
+# Patterns are matched against the name a file is cached under; the first match wins,
+# and files that match nothing are used for as long as they're in the cache.
+FRESHNESS_POLICIES = {
+    "fl/*_page_*.html": SETTLED_YEARS,
+    "mo/*.html": SETTLED_YEARS,
+    "wi/*.html": SETTLED_YEARS,
+    "sc/*.pdf": SETTLED_YEARS,
+    "nm/*.pdf": SETTLED_YEARS,
+    # Job Center sites, whose caches are rooted in the state's folder
+    "search_results/*": SETTLED_YEARS,
+}
+
 
 class Cache:
     """Basic interface to save files to and fetch from cache.
@@ -30,19 +155,126 @@ class Cache:
 
             cache.files('fl')
 
+    Caches that hold many pages can be stored more compactly. With
+    ``sharded=True`` each file goes in a subdirectory named for the first
+    two hex digits of its name's hash, so no directory holds more than a
+    few hundred files. With ``compression`` set to "gzip" or "zstd", files
+    saved by ``write`` and ``write_binary`` are compressed on disk. Either
+    way, files are still named, read, checked for and listed just as they
+    would be in a plain cache, and files saved before the layout was
+    switched on are still found.
+
+    Files saved by ``download`` are always stored plain, since they're
+    usually handed to spreadsheet and PDF readers by path.
+
+    Every file saved is recorded in a CacheIndex, with its source URL, when
+    it was fetched, its hash and its size, so questions about what the cache
+    holds can be answered without walking its directories.
+
+    Whether a cached file is still current is decided by the FreshnessPolicy
+    whose pattern matches its name, in FRESHNESS_POLICIES by default. Use
+    ``is_fresh`` to check, or let ``read_or_fetch`` and ``download`` decide.
+
+    Example:
+        Fetching a page only if the cached copy is out of date::
+
+            html = cache.read_or_fetch("mo/2019.html", "https://jobs.mo.gov/warn/2019")
+
     Args:
         path (str): Full path to cache directory. Defaults to WARN_ETL_DIR
             or, if env var not specified, $HOME/.warn-scraper/cache
+        compression (str): "gzip" or "zstd" to compress files on disk (default None).
+            zstd requires the zstandard package.
+        sharded (bool): Whether to spread files over hashed subdirectories (default False)
+        index_dir (str): Where to keep the cache index (default the cache directory)
+        policies (dict): Freshness policies keyed by name pattern (default FRESHNESS_POLICIES)
     """
 
-    def __init__(self, path=None):
+    def __init__(
+        self,
+        path=None,
+        compression=None,
+        sharded=False,
+        index_dir=None,
+        policies=None,
+    ):
         """Initialize a new instance."""
         self.root_dir = self._path_from_env or self._path_default
         self.path = path or str(Path(self.root_dir, "cache"))
+        self.index = CacheIndex(index_dir or self.path)
+        self.policies = FRESHNESS_POLICIES if policies is None else policies
+        if compression is not None and compression not in COMPRESSION_SUFFIXES:
+            raise ValueError(f"Unknown cache compression: {compression}")
+        if compression == "zstd" and zstandard is None:
+            raise ImportError("zstd compression requires `pip install zstandard`")
+        self.compression = compression
+        self.sharded = sharded
 
     def exists(self, name):
         """Test whether the provided file path exists."""
-        return Path(self.path, name).exists()
+        return self._locate(name)[0].exists()
+
+    def policy(self, name) -> typing.Optional[FreshnessPolicy]:
+        """Get the freshness policy for a file, or None if no pattern matches its name."""
+        name = self._relative_name(name)
+        for pattern, policy in self.policies.items():
+            if fnmatch(name, pattern):
+                return policy
+        return None
+
+    def is_settled(self, name, year: typing.Optional[int] = None) -> bool:
+        """Test whether a file's policy says it will never change, whether or not it's cached yet.
+
+        Args:
+            name (str): Partial name, relative to cache dir (eg. 'fl/2021_page_1.html')
+            year (int): The year the file covers (default the year in its name)
+        """
+        policy = self.policy(name)
+        if year is None:
+            year = _year_from_name(name)
+        return policy is not None and policy.is_immutable(year)
+
+    def is_fresh(self, name, year: typing.Optional[int] = None) -> bool:
+        """Test whether a file is cached and current enough to use without fetching it again.
+
+        Args:
+            name (str): Partial name, relative to cache dir (eg. 'fl/2021_page_1.html')
+            year (int): The year the file covers (default the year in its name)
+        """
+        if not self.exists(name):
+            return False
+        policy = self.policy(name)
+        if policy is None:
+            return True
+        if year is None:
+            year = _year_from_name(name)
+        entry = self.index.get(Path(self.path, name))
+        if entry is not None:
+            fetched_at = datetime.fromisoformat(entry["fetched_at"])
+        else:
+            # Saved before the index existed, so go by the file itself
+            mtime = self._locate(name)[0].stat().st_mtime
+            fetched_at = datetime.fromtimestamp(mtime, timezone.utc)
+        fresh = policy.allows(fetched_at, year)
+        logger.debug(f"{name} is {'fresh' if fresh else 'stale'} under {policy}")
+        return fresh
+
+    def read_or_fetch(self, name, url, **kwargs):
+        """Read a text file from the cache if it's fresh, otherwise fetch it from the web and save it.
+
+        Args:
+            name (str): Partial name, relative to cache dir (eg. 'mo/2019.html')
+            url (str): Where to fetch the file from
+            **kwargs: Additional arguments to pass to utils.get_url
+
+        Returns:
+            File content as string
+        """
+        if self.is_fresh(name):
+            return self.read(name)
+        text = get_url(url, **kwargs).text
+        self.write(name, text, url=url)
+        return text
 
     def read(self, name):
         """Read text file from cache.
@@ -53,9 +285,23 @@ class Cache:
         Returns:
             File content as string or error if file doesn't
         """
-        path = Path(self.path, name)
+        path, compressed = self._locate(name)
         logger.debug(f"Reading from cache {path}")
-        with open(path, newline="") as infile:
+        with self._open(path, "rt", compressed, newline="") as infile:
+            return infile.read()
+
+    def read_binary(self, name):
+        """Read binary file from cache.
+
+        Args:
+            name (str): Partial name, relative to cache dir (eg. 'ma/2021.xlsx')
+
+        Returns:
+            File content as bytes
+        """
+        path, compressed = self._locate(name)
+        logger.debug(f"Reading from cache {path}")
+        with self._open(path, "rb", compressed) as infile:
             return infile.read()
 
     def read_csv(self, name):
@@ -67,48 +313,117 @@ class Cache:
         Returns:
             list of rows
         """
-        path = Path(self.path, name)
+        path, compressed = self._locate(name)
         logger.debug(f"Reading CSV from cache {path}")
-        with open(path, encoding="utf-8") as fh:
+        with self._open(path, "rt", compressed, encoding="utf-8") as fh:
             return list(csv.reader(fh))
 
     def download(
-        self, name: str, url: str, encoding: typing.Optional[str] = None, **kwargs
+        self,
+        name: str,
+        url: str,
+        encoding: typing.Optional[str] = None,
+        conditional: bool = True,
+        year: typing.Optional[int] = None,
+        **kwargs,
     ) -> Path:
         """
         Download the provided URL and save it in the cache.
 
+        The ETag and Last-Modified headers of each download are saved next to the file.
+        When the file is requested again, they're sent back as If-None-Match and
+        If-Modified-Since, and a 304 Not Modified response reuses the cached copy.
+
+        Files with a freshness policy aren't requested at all while the policy
+        says the cached copy is current.
+
+        The file is written to a temporary file and renamed into place once it's
+        complete. Workers that ask for the same file at the same time wait on a
+        lock, and all but the first use what the first one downloaded.
+
         Args:
             name (str): The path where the file will be saved. Can be a simple string like "ia/data.xlsx"
             url (str): The URL to download
             encoding (str): The encoding of the response. Optional.
+            conditional (bool): Whether to ask the server if the cached copy is still current (default True)
+            year (int): The year the file covers, for its freshness policy (default the year in its name)
             **kwargs: Additional arguments to pass to requests.get()
 
         Returns: The Path where the file was saved
         """
+        out_path = Path(self.path, name)
+        if self.policy(name) is not None and self.is_fresh(name, year=year):
+            logger.debug(f"Using cached {out_path}")
+            return out_path
+
+        # If another thread or process is already downloading this file, wait for it
+        # and use what it fetched instead of downloading it again
+        before = _mtime(out_path)
+        with self.lock(name):
+            if _mtime(out_path) != before:
+                logger.debug(
+                    f"Downloaded meanwhile by another worker; using {out_path}"
+                )
+                return out_path
+            self._download(out_path, url, encoding, conditional, **kwargs)
+
+        # Return the path
+        return out_path
+
+    def _download(self, out_path: Path, url: str, encoding, conditional, **kwargs):
+        """Download a URL to a path, moving it into place only once it's complete."""
+        # Ask only for changes if we already have a copy of this URL
+        headers = dict(kwargs.pop("headers", None) or {})
+        if conditional and out_path.exists():
+            validators = self._read_validators(out_path)
+            if validators.get("url") == url:
+                if validators.get("etag"):
+                    headers["If-None-Match"] = validators["etag"]
+                if validators.get("last_modified"):
+                    headers["If-Modified-Since"] = validators["last_modified"]
+
         # Request the URL
         logger.debug(f"Downloading {url}")
-        with get_url(url, stream=True, **kwargs) as r:
+        with get_url(url, stream=True, headers=headers, **kwargs) as r:
+            if r.status_code == 304:
+                logger.debug(f"Not modified; using cached {out_path}")
+                self.index.touch(out_path)
+                return
+
             # If there's no encoding, set it
             if encoding:
                 r.encoding = encoding
             elif r.encoding is None:
                 r.encoding = "utf-8"
 
-            # Open the local Path
-            out_path = Path(self.path, name)
-            out_path.parent.mkdir(parents=True, exist_ok=True)
             logger.debug(f"Writing to {out_path}")
 
             # Write out the file in little chunks
-            with open(out_path, "wb") as f:
+            digest = hashlib.sha256()
+            size = 0
+            with self._atomic_open(out_path, "wb", compressed=False) as f:
                 for chunk in r.iter_content(chunk_size=8192):
                     f.write(chunk)
-
-        # Return the path
-        return out_path
-
-    def write(self, name, content):
+                    digest.update(chunk)
+                    size += len(chunk)
+
+                # Older versions of urllib3 don't notice a connection dropped partway,
+                # so check the length here and throw the partial file away
+                expected = r.headers.get("Content-Length")
+                if (
+                    expected
+                    and not r.headers.get("Content-Encoding")
+                    and size != int(expected)
+                ):
+                    raise requests.exceptions.ChunkedEncodingError(
+                        f"Download of {url} ended after {size:,} of {int(expected):,} bytes"
+                    )
+
+            # Keep the validators for next time
+            self._write_validators(out_path, url, r.headers)
+            self.index.record(out_path, url, digest.hexdigest(), size)
+
+    def write(self, name, content, url=None):
         """Save file contents to cache.
 
         Typically, this should be a state-specific directory
@@ -130,30 +445,44 @@ class Cache:
         Args:
             name (str): Partial name, relative to cache dir, where content should be saved.
             content (str): Any string content to save to file.
+            url (str): Where the content came from, for the cache index. Optional.
         """
-        out = Path(self.path, name)
-        out.parent.mkdir(parents=True, exist_ok=True)
+        out = self._storage_path(name)
         logger.debug(f"Writing to cache {out}")
-        with open(out, "w", newline="") as fh:
+        with self.lock(name), self._atomic_open(
+            out, "wt", bool(self.compression), newline=""
+        ) as fh:
             fh.write(content)
-        return str(out)
+        data = content.encode("utf-8")
+        self.index.record(
+            Path(self.path, name), url, hashlib.sha256(data).hexdigest(), len(data)
+        )
+        return str(Path(self.path, name))
 
-    def write_binary(self, name, content):
+    def write_binary(self, name, content, url=None):
         """
         Write binary data to a file.
 
         Args:
             name: Filename
             content: Binary contents
+            url: Where the content came from, for the cache index. Optional.
         Returns:
             Path to file
         """
-        out = Path(self.path, name)
-        out.parent.mkdir(parents=True, exist_ok=True)
+        out = self._storage_path(name)
         logger.debug(f"Writing to cache {out}")
-        with open(out, "wb") as fh:
+        with self.lock(name), self._atomic_open(
+            out, "wb", bool(self.compression)
+        ) as fh:
             fh.write(content)
-        return out
+        self.index.record(
+            Path(self.path, name),
+            url,
+            hashlib.sha256(content).hexdigest(),
+            len(content),
+        )
+        return Path(self.path, name)
 
     def files(self, subdir=".", glob_pattern="*"):
         """
@@ -177,7 +506,143 @@ class Cache:
             glob_pattern (str): Glob pattern. Defaults to all files in specified subdir ('*')
         """
         _dir = Path(self.path).joinpath(subdir)
-        return [str(p) for p in _dir.glob(glob_pattern)]
+        if not self.compression and not self.sharded:
+            return [str(p) for p in _dir.glob(glob_pattern) if not _is_bookkeeping(p)]
+        # Map every stored file back to its name, then match the pattern against that
+        names = set()
+        for p in _dir.rglob("*"):
+            if not p.is_file() or _is_bookkeeping(p):
+                continue
+            name = self._name_from_storage_path(p)
+            relative = name.relative_to(_dir).as_posix()
+            if "**" in glob_pattern:
+                matched = fnmatch(relative, glob_pattern.replace("**/", "*"))
+            else:
+                matched = relative.count("/") == glob_pattern.count("/") and fnmatch(
+                    relative, glob_pattern
+                )
+            if matched:
+                names.add(str(name))
+        return sorted(names)
+
+    def _relative_name(self, name) -> str:
+        """Get a file's name relative to the cache directory, for matching against patterns."""
+        path = Path(name)
+        if path.is_absolute():
+            try:
+                path = path.relative_to(self.path)
+            except ValueError:
+                pass
+        return path.as_posix()
+
+    def _storage_path(self, name) -> Path:
+        """Get where the file with the provided name is stored in this cache's layout."""
+        path = Path(self.path, name)
+        if self.sharded:
+            path = path.parent / _shard(path.name) / path.name
+        if self.compression:
+            path = path.with_name(path.name + COMPRESSION_SUFFIXES[self.compression])
+        return path
+
+    def _locate(self, name) -> typing.Tuple[Path, bool]:
+        """Find a stored file, and whether it's compressed.
+
+        Files saved in the plain layout, like downloads, are found too.
+        """
+        path = self._storage_path(name)
+        if (self.compression or self.sharded) and path.exists():
+            return (path, bool(self.compression))
+        return (Path(self.path, name), False)
+
+    def _name_from_storage_path(self, path: Path) -> Path:
+        """Undo _storage_path, turning where a file is stored back into its name."""
+        suffix = COMPRESSION_SUFFIXES.get(self.compression, "")
+        if suffix and path.name.endswith(suffix):
+            path = path.with_name(path.name[: -len(suffix)])
+        if self.sharded and path.parent.name == _shard(path.name):
+            path = path.parent.parent / path.name
+        return path
+
+    @contextmanager
+    def lock(self, name):
+        """Hold an exclusive lock on a file in the cache while it's written.
+
+        The lock is shared by every thread and process using this cache directory.
+        It's advisory: it only keeps out others who ask for the same lock. Files
+        share a fixed set of locks, picked by a hash of their names, so a write
+        may now and then wait on an unrelated one. The lock files are kept in a
+        .locks folder at the top of the cache, which never holds more than
+        LOCK_STRIPES of them.
+
+        Args:
+            name (str): Partial name, relative to cache dir (eg. 'fl/2021_page_1.html')
+        """
+        stripe = _stripe(self._relative_name(name))
+        lock_path = Path(self.path, LOCK_DIR, f"{stripe:02x}.lock")
+        # File locks don't always keep out other threads of the same process, so take a thread lock too
+        with _thread_locks[stripe]:
+            lock_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(lock_path, "a") as fh:
+                _lock_file(fh)
+                try:
+                    yield
+                finally:
+                    _unlock_file(fh)
+
+    @contextmanager
+    def _atomic_open(self, path: Path, mode: str, compressed: bool, **kwargs):
+        """Write to a temporary file beside a path, renaming it into place only once it's complete.
+
+        Readers never see a half-written file, and an interrupted write leaves
+        nothing behind to be mistaken for a cached copy.
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(
+            dir=path.parent, prefix=f".{path.name}.", suffix=TEMP_SUFFIX
+        )
+        os.close(fd)
+        tmp_path = Path(tmp)
+        try:
+            # mkstemp makes files only the owner can read; match a normal open() instead
+            os.chmod(tmp_path, 0o666 & ~_UMASK)
+            with self._open(tmp_path, mode, compressed, **kwargs) as fh:
+                yield fh
+            os.replace(tmp_path, path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+    def _open(self, path: Path, mode: str, compressed: bool, **kwargs):
+        """Open a stored file, compressing or decompressing it as needed."""
+        if not compressed:
+            return open(path, mode, **kwargs)
+        if self.compression == "zstd":
+            return zstandard.open(path, mode, **kwargs)
+        return gzip.open(path, mode, **kwargs)
+
+    def _read_validators(self, path: Path) -> dict:
+        """Read the HTTP validators saved alongside a downloaded file."""
+        sidecar = path.with_name(path.name + VALIDATORS_SUFFIX)
+        try:
+            with open(sidecar, encoding="utf-8") as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_validators(self, path: Path, url: str, headers):
+        """Save a response's HTTP validators alongside the downloaded file."""
+        sidecar = path.with_name(path.name + VALIDATORS_SUFFIX)
+        validators = {
+            "url": url,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+        }
+        if not validators["etag"] and not validators["last_modified"]:
+            # Nothing to send back next time, so don't leave a stale sidecar around
+            sidecar.unlink(missing_ok=True)
+            return
+        with self._atomic_open(sidecar, "wt", False, encoding="utf-8") as fh:
+            json.dump(validators, fh)
 
     @property
     def _path_from_env(self):
@@ -188,3 +653,298 @@ class Cache:
     def _path_default(self):
         """Get the default filesystem location of the cache."""
         return join(expanduser("~"), ".warn-scraper")
+
+
+class CacheIndex:
+    """A SQLite record of the files in a cache.
+
+    Each file's source URL, when it was last fetched, its SHA-256 hash and its
+    size are saved as it's written, keyed by its path relative to the index's
+    directory. The first part of that path is taken to be the state.
+
+    Example:
+        Finding Florida files that are more than a week old::
+
+            cutoff = datetime.now(timezone.utc) - timedelta(days=7)
+            cache.index.entries(state="fl", fetched_before=cutoff)
+
+        Totting up how much each state takes up::
+
+            cache.index.bytes_by_state()
+
+    Args:
+        directory (str): Where the index is kept; paths are recorded relative to it
+    """
+
+    def __init__(self, directory):
+        """Initialize a new instance."""
+        self.directory = Path(directory)
+        self.path = self.directory / INDEX_NAME
+        self._ready = False
+
+    def record(self, path, url: typing.Optional[str], sha256: str, size: int):
+        """Note that a file was just written."""
+        self._execute(
+            """
+            INSERT INTO entries (name, state, url, fetched_at, sha256, size)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (name) DO UPDATE SET
+                state = excluded.state,
+                url = COALESCE(excluded.url, entries.url),
+                fetched_at = excluded.fetched_at,
+                sha256 = excluded.sha256,
+                size = excluded.size
+            """,
+            (*self._name_and_state(path), url, _now(), sha256, size),
+        )
+
+    def touch(self, path):
+        """Note that a file was just confirmed current, without it changing."""
+        name, _ = self._name_and_state(path)
+        self._execute(
+            "UPDATE entries SET fetched_at = ? WHERE name = ?", (_now(), name)
+        )
+
+    def entries(
+        self,
+        state: typing.Optional[str] = None,
+        fetched_before: typing.Optional[datetime] = None,
+    ) -> typing.List[dict]:
+        """List the recorded files, optionally for one state or fetched before a time.
+
+        Args:
+            state (str): A two-letter postal code, like "fl"
+            fetched_before (datetime): Only files last fetched before this time
+
+        Returns: A list of dicts with name, state, url, fetched_at, sha256 and size keys
+        """
+        where = "WHERE 1"
+        params: list = []
+        if state is not None:
+            where += " AND state = ?"
+            params.append(state.lower())
+        if fetched_before is not None:
+            where += " AND fetched_at < ?"
+            params.append(_timestamp(fetched_before))
+        return self._select(where + " ORDER BY name", params)
+
+    def get(self, path) -> typing.Optional[dict]:
+        """Get the record for a single file, or None if it isn't recorded."""
+        name, _ = self._name_and_state(path)
+        found = self._select("WHERE name = ?", [name])
+        return found[0] if found else None
+
+    def bytes_by_state(self) -> typing.Dict[str, int]:
+        """Add up the size of the recorded files for each state."""
+        rows = self._execute(
+            "SELECT state, SUM(size) FROM entries GROUP BY state ORDER BY state"
+        )
+        return {state: total for state, total in rows}
+
+    def _select(self, where: str, params: list) -> typing.List[dict]:
+        """Fetch the records matching a WHERE clause as dicts."""
+        keys = ["name", "state", "url", "fetched_at", "sha256", "size"]
+        rows = self._execute(f"SELECT {', '.join(keys)} FROM entries {where}", params)
+        return [dict(zip(keys, row)) for row in rows]
+
+    def _name_and_state(self, path) -> typing.Tuple[str, str]:
+        """Get a file's key in the index, and the state it belongs to."""
+        path = Path(path)
+        try:
+            name = path.relative_to(self.directory).as_posix()
+        except ValueError:
+            # Somewhere outside the cache, so keep the whole path
+            name = path.as_posix()
+        return (name, name.split("/")[0].lower())
+
+    def _execute(self, sql: str, params: typing.Iterable = ()) -> list:
+        """Run a statement on a short-lived connection, so threads and processes can share the index."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=30)
+        try:
+            with connection:
+                if not self._ready:
+                    connection.execute("""
+                        CREATE TABLE IF NOT EXISTS entries (
+                            name TEXT PRIMARY KEY,
+                            state TEXT,
+                            url TEXT,
+                            fetched_at TEXT,
+                            sha256 TEXT,
+                            size INTEGER
+                        )
+                        """)
+                    connection.execute(
+                        "CREATE INDEX IF NOT EXISTS entries_state ON entries (state, fetched_at)"
+                    )
+                    self._ready = True
+                return connection.execute(sql, list(params)).fetchall()
+        finally:
+            connection.close()
+
+
+class SourceManifest:
+    """Fingerprints of the files a state's scraper consumed on its last run.
+
+    Scrapers that download their sources before parsing them can check the
+    manifest first, and skip the parse and export entirely when every input
+    hashes the same as it did when the current export was written.
+
+    The scraper's own module, the shared parsing modules in
+    SHARED_PARSING_MODULES and the package's version are all part of the
+    fingerprint, so a change to the parsing code always forces a fresh export.
+
+    Example:
+        Skipping the parse when nothing has changed::
+
+            manifest = SourceManifest("ca", cache_dir)
+            if manifest.is_current(file_list, output_path):
+                return output_path
+            ...  # parse and export
+            manifest.save(file_list, output_path)
+
+    Args:
+        state (str): The state's two-letter postal code
+        cache_dir (str): The root cache directory; the manifest lives in the state's folder
+    """
+
+    def __init__(self, state: str, cache_dir):
+        """Initialize a new instance."""
+        self.state = state.lower()
+        self.path = Path(cache_dir, self.state, "manifest.json")
+
+    def is_current(self, sources: typing.Iterable, export_path) -> bool:
+        """Check whether the export was built from exactly these sources.
+
+        Args:
+            sources (list): Paths to every file the scraper parses
+            export_path (Path): The export the scraper would write
+
+        Returns: True if the export exists and none of its inputs have changed
+        """
+        export_path = Path(export_path)
+        if not export_path.exists():
+            return False
+        try:
+            with open(self.path, encoding="utf-8") as fh:
+                saved = json.load(fh)
+        except (OSError, ValueError):
+            return False
+        current = self._fingerprint(sources, export_path)
+        if saved != current:
+            return False
+        logger.debug(f"Sources for {self.state} are unchanged; keeping {export_path}")
+        return True
+
+    def save(self, sources: typing.Iterable, export_path):
+        """Record the sources behind a freshly written export.
+
+        Args:
+            sources (list): Paths to every file the scraper parsed
+            export_path (Path): The export the scraper wrote
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as fh:
+            json.dump(self._fingerprint(sources, Path(export_path)), fh, indent=2)
+
+    def _fingerprint(self, sources: typing.Iterable, export_path: Path) -> dict:
+        """Hash the scraper's code, the shared parsing code, its sources and its export."""
+        module = Path(__file__).parent / "scrapers" / f"{self.state}.py"
+        return {
+            "version": _package_version(),
+            "code": _hash_file(module) if module.exists() else None,
+            "shared": {
+                p.name: _hash_file(p) if p.exists() else None
+                for p in SHARED_PARSING_MODULES
+            },
+            "sources": {str(p): _hash_file(Path(p)) for p in sources},
+            "export": _hash_file(export_path),
+        }
+
+
+def _package_version() -> typing.Optional[str]:
+    """Get the installed version of warn-scraper, or None when running from a plain checkout."""
+    try:
+        return metadata.version("warn-scraper")
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def _now() -> str:
+    """Get the current time as it's saved in the cache index."""
+    return _timestamp(datetime.now(timezone.utc))
+
+
+def _timestamp(moment: datetime) -> str:
+    """Format a time in UTC, so the index's timestamps sort in order."""
+    if moment.tzinfo is None:
+        moment = moment.astimezone()
+    return moment.astimezone(timezone.utc).isoformat(timespec="seconds")
+
+
+def _year_from_name(name) -> typing.Optional[int]:
+    """Pull the year out of a file's name, like 2021 from 'fl/2021_page_1.html'."""
+    match = re.search(r"(?<!\d)(?:19|20)\d{2}(?!\d)", Path(name).name)
+    return int(match.group()) if match else None
+
+
+def _is_bookkeeping(path: Path) -> bool:
+    """Check whether a file in the cache is one of its own records rather than cached content."""
+    return (
+        path.name.endswith(VALIDATORS_SUFFIX)
+        or path.name.startswith(INDEX_NAME)
+        or path.name == LOCK_DIR
+        or LOCK_DIR in path.parts
+        or (path.name.startswith(".") and path.name.endswith(TEMP_SUFFIX))
+    )
+
+
+def _mtime(path: Path) -> typing.Optional[int]:
+    """Get when a file was last modified, or None if it doesn't exist."""
+    try:
+        return path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _stripe(name: str) -> int:
+    """Get the number of the lock a file shares with others whose names hash alike."""
+    return int(hashlib.sha1(name.encode("utf-8")).hexdigest()[:8], 16) % LOCK_STRIPES
+
+
+def _lock_file(fh):
+    """Take an exclusive lock on an open file, waiting until it's free."""
+    if fcntl is not None:
+        fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+    elif msvcrt is not None:
+        # Windows; lock the first byte, retrying until it's free
+        while True:
+            try:
+                fh.seek(0)
+                msvcrt.locking(fh.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                continue
+
+
+def _unlock_file(fh):
+    """Release a lock taken by _lock_file."""
+    if fcntl is not None:
+        fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+    elif msvcrt is not None:
+        fh.seek(0)
+        msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _shard(name: str) -> str:
+    """Get the subdirectory a file is stored in when the cache is sharded."""
+    return hashlib.sha1(name.encode("utf-8")).hexdigest()[:2]
+
+
+def _hash_file(path: Path) -> str:
+    """Get the SHA-256 digest of a file, reading it in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -1,4 +1,5 @@
 import logging
+import sys
 from pathlib import Path
 
 import click
@@ -25,6 +26,20 @@ from . import Runner, utils
     default=False,
     help="Delete generated files from the cache",
 )
+@click.option(
+    "--workers",
+    "-w",
+    default=1,
+    type=click.IntRange(min=1),
+    help="Run this many scrapers at the same time, each in its own process",
+)
+@click.option(
+    "--format",
+    "export_format",
+    default="csv",
+    type=click.Choice(("csv", *utils.EXPORT_WRITERS), case_sensitive=False),
+    help="Also save each state's data in this format, alongside the CSV",
+)
 @click.option(
     "--log-level",
     "-l",
@@ -39,6 +54,8 @@ def main(
     data_dir: Path,
     cache_dir: Path,
     delete: bool,
+    workers: int,
+    export_format: str,
     log_level: str,
 ):
     """
@@ -55,10 +72,17 @@ def main(
     logging.basicConfig(level=log_level, format="%(asctime)s - %(name)s - %(message)s")
     logger = logging.getLogger(__name__)
 
+    # Check for pyarrow now, rather than after the first scrape has finished
+    if export_format.lower() != "csv" and not utils.has_pyarrow():
+        raise click.UsageError(
+            f"--format {export_format.lower()} requires pyarrow; "
+            "install it with `pip install warn-scraper[export]`"
+        )
+
     # Runner config
     data_dir = Path(data_dir)
     cache_dir = Path(cache_dir)
-    runner = Runner(data_dir, cache_dir)
+    runner = Runner(data_dir, cache_dir, export_format=export_format.lower())
 
     # Delete files, if asked
     if delete:
@@ -69,7 +93,14 @@ def main(
     if "all" in scrapers:
         scrapers = utils.get_all_scrapers()
 
-    # Loop through the states
+    # Run the states side by side in a pool of worker processes, if asked
+    if workers > 1:
+        results = runner.scrape_many(scrapers, workers=workers)
+        if not all(r.ok for r in results):
+            sys.exit(1)
+        return
+
+    # Otherwise loop through the states
     for scrape in scrapers:
         # Try running the scraper
         runner.scrape(scrape)
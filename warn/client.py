@@ -0,0 +1,352 @@
+import logging
+import threading
+import time
+import typing
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+
+# Applied to every request that doesn't ask for something else
+DEFAULT_TIMEOUT = 120
+
+# Transient failures worth another try before handing the response back
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# One request every two seconds, for helpers that fetch from hosts nobody has declared a limit for
+POLITE_RATE = 0.5
+
+
+class TokenBucket:
+    """Hand out tokens at a steady rate, allowing short bursts.
+
+    A caller that finds the bucket empty reserves the next token and sleeps
+    until it's due, so waiters are served in order and never spin.
+
+    Args:
+        rate (float): Tokens added per second
+        burst (int): The most tokens the bucket holds (default 1)
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        """Initialize a new instance."""
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take a token, sleeping until one is available.
+
+        Returns: The number of seconds spent waiting
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.burst, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+            # Going negative reserves a token that hasn't been minted yet
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        # Sleep outside the lock, so the next caller can queue up behind us
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+class RateLimiter:
+    """Keep one token bucket per host.
+
+    Hosts without a declared limit are never delayed, and a wait on one host
+    never holds up a request to another.
+    """
+
+    def __init__(self):
+        """Initialize a new instance."""
+        self.buckets: typing.Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def limit(self, host: str, rate: float, burst: int = 1, replace: bool = True):
+        """Declare the requests per second and burst size allowed for a host.
+
+        Args:
+            host (str): A host name, like "www.twc.texas.gov"
+            rate (float): Requests per second
+            burst (int): Requests that may go out back-to-back before the rate applies (default 1)
+            replace (bool): Whether to overwrite a limit already declared for the host (default True)
+        """
+        with self._lock:
+            if replace or host not in self.buckets:
+                self.buckets[host] = TokenBucket(rate, burst)
+
+    def wait(self, url: str) -> float:
+        """Block until a request to the URL's host is allowed.
+
+        Returns: The number of seconds spent waiting
+        """
+        host = urlsplit(url).netloc
+        with self._lock:
+            bucket = self.buckets.get(host)
+        if bucket is None:
+            return 0.0
+        waited = bucket.acquire()
+        if waited:
+            logger.debug(f"Waited {waited:.2f}s for {host}")
+        return waited
+
+
+class Client:
+    """Shared HTTP client with pooled keep-alive connections.
+
+    Every request made through a client goes through one pooled transport
+    adapter, so TLS connections are kept open and reused for each host.
+    Default timeouts and retries are applied consistently, and the number of
+    requests, bytes and seconds spent are tallied per host.
+
+    Requests to a host are paced by its token bucket, if one has been
+    declared with ``limit``. Cached files never touch the client, so they
+    never wait.
+
+    Cookies are never shared between callers. One-off requests made with
+    ``get`` and ``post`` don't keep cookies at all, like ``requests.get``.
+    A scraper that needs to carry cookies from one request to the next
+    should open its own session, which is thrown away when it's done.
+
+    Most code should use the module-level ``get``, ``post`` and ``session``
+    functions, which share one client for the whole process.
+
+    Example:
+        Fetching a page::
+
+            from warn import client
+
+            r = client.get("https://example.com/warn.html")
+
+        Keeping cookies across a few requests::
+
+            with client.session() as session:
+                session.get("https://example.com/search")
+                session.post("https://example.com/search", data=payload)
+
+        Checking what it cost::
+
+            client.get_client().stats["example.com"]
+
+    Args:
+        timeout (int): Seconds to wait on a response (default 120)
+        retries (int): Attempts for connection errors and 429/5xx responses (default 3)
+        backoff_factor (float): Exponential backoff between retries (default 1)
+        pool_maxsize (int): Connections kept open for each host (default 16)
+    """
+
+    def __init__(
+        self,
+        timeout: int = DEFAULT_TIMEOUT,
+        retries: int = 3,
+        backoff_factor: float = 1,
+        pool_maxsize: int = 16,
+    ):
+        """Initialize a new instance."""
+        self.timeout = timeout
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUS_CODES,
+            # Hand the final response back instead of raising, like requests does
+            raise_on_status=False,
+        )
+        self.adapter = HTTPAdapter(
+            pool_connections=pool_maxsize, pool_maxsize=pool_maxsize, max_retries=retry
+        )
+        self.limiter = RateLimiter()
+        self.stats: typing.Dict[str, typing.Dict[str, float]] = {}
+        self._stats_lock = threading.Lock()
+
+    def limit(self, host: str, rate: float, burst: int = 1, replace: bool = True):
+        """Declare the requests per second and burst size allowed for a host."""
+        self.limiter.limit(host, rate, burst=burst, replace=replace)
+
+    def session(self) -> "PooledSession":
+        """Open a session with its own cookies that shares the client's connection pool."""
+        return PooledSession(self)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Make a request without keeping any cookies it sets.
+
+        Args:
+            method (str): The HTTP method, like "GET" or "POST"
+            url (str): The URL to request
+            **kwargs: Additional arguments to pass to requests
+
+        Returns: A requests Response object
+        """
+        with self.session() as session:
+            return session.request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """Make a GET request."""
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """Make a POST request."""
+        return self.request("POST", url, **kwargs)
+
+    def instrument(self, session):
+        """Tally the requests made by a session the client doesn't own.
+
+        Some scrapers use a different HTTP library, like niquests, to get past
+        bot detection. Its connections can't be pooled with ours, but routing
+        its requests through here keeps the per-host stats complete.
+
+        Args:
+            session: A session object with a requests-style ``request`` method
+
+        Returns: The same session
+        """
+        send = session.request
+
+        def request(method, url, *args, **kwargs):
+            self.limiter.wait(url)
+            start = time.perf_counter()
+            response = send(method, url, *args, **kwargs)
+            self.measure(response, url, start, kwargs.get("stream", False))
+            return response
+
+        session.request = request
+        return session
+
+    def measure(self, response, url: str, start: float, stream: bool = False):
+        """Record what a response cost, waiting until a streamed body has been read."""
+        if not stream:
+            self.record(url, len(response.content), time.perf_counter() - start)
+            return
+
+        # Count a streamed body as it's read, so chunked downloads aren't tallied as empty
+        iter_content = response.iter_content
+
+        def counted(*args, **kwargs):
+            size = 0
+            for chunk in iter_content(*args, **kwargs):
+                size += len(chunk)
+                yield chunk
+            self.record(url, size, time.perf_counter() - start)
+
+        response.iter_content = counted
+
+    def record(self, url: str, size: int, seconds: float):
+        """Add a request's bytes and latency to the per-host tally."""
+        host = urlsplit(url).netloc
+        with self._stats_lock:
+            tally = self.stats.setdefault(
+                host, {"requests": 0, "bytes": 0, "seconds": 0.0}
+            )
+            tally["requests"] += 1
+            tally["bytes"] += size
+            tally["seconds"] += seconds
+        logger.debug(f"Fetched {size:,} bytes from {host} in {seconds:.2f}s")
+
+    def log_stats(self):
+        """Log the per-host tally of requests, bytes and seconds."""
+        with self._stats_lock:
+            for host, tally in sorted(self.stats.items()):
+                logger.info(
+                    f"{host}: {tally['requests']:,} requests, "
+                    f"{tally['bytes']:,} bytes, {tally['seconds']:.1f}s"
+                )
+
+    def reset_stats(self):
+        """Clear the per-host tally."""
+        with self._stats_lock:
+            self.stats.clear()
+
+
+class PooledSession(requests.Session):
+    """A requests session that borrows its client's connection pool.
+
+    It has its own cookies and headers, so state from one site's session
+    never leaks into another's, but closing it leaves the shared pool open.
+
+    Args:
+        client (Client): The client whose pool, timeout and stats are used
+    """
+
+    def __init__(self, client: Client):
+        """Initialize a new instance."""
+        super().__init__()
+        self.client = client
+        self.mount("https://", client.adapter)
+        self.mount("http://", client.adapter)
+
+    def request(self, method, url, *args, **kwargs):
+        """Make a request with the client's default timeout and record what it cost."""
+        if "timeout" not in kwargs:
+            kwargs["timeout"] = self.client.timeout
+        self.client.limiter.wait(url)
+        start = time.perf_counter()
+        response = super().request(method, url, *args, **kwargs)
+        self.client.measure(response, url, start, kwargs.get("stream", False))
+        return response
+
+    def close(self):
+        """Drop this session's cookies without closing the shared pool."""
+        self.cookies.clear()
+
+
+_client: typing.Optional[Client] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> Client:
+    """Get the client shared by the whole process, creating it on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = Client()
+        return _client
+
+
+def limit(host: str, rate: float, burst: int = 1, replace: bool = True):
+    """Declare the requests per second and burst size allowed for a host on the shared client.
+
+    Args:
+        host (str): A host name, like "www.twc.texas.gov"
+        rate (float): Requests per second
+        burst (int): Requests that may go out back-to-back before the rate applies (default 1)
+        replace (bool): Whether to overwrite a limit already declared for the host (default True)
+    """
+    get_client().limit(host, rate, burst=burst, replace=replace)
+
+
+def session() -> PooledSession:
+    """Open a session on the shared client that keeps its own cookies."""
+    return get_client().session()
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    """Make a GET request with the shared client.
+
+    Args:
+        url (str): The URL to request
+        **kwargs: Additional arguments to pass to requests
+
+    Returns: A requests Response object
+    """
+    return get_client().get(url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    """Make a POST request with the shared client.
+
+    Args:
+        url (str): The URL to request
+        **kwargs: Additional arguments to pass to requests
+
+    Returns: A requests Response object
+    """
+    return get_client().post(url, **kwargs)
@@ -0,0 +1,134 @@
+import logging
+import multiprocessing
+import os
+import typing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pdfplumber
+
+logger = logging.getLogger(__name__)
+
+
+# Documents shorter than this are read in the calling process, since starting a pool costs more than it saves
+MIN_PARALLEL_PAGES = 8
+
+# Each worker is handed a run of this many pages at a time, so it opens the PDF once per run
+PAGES_PER_TASK = 4
+
+# The most workers extract_tables uses by default. The Runner sets it in each
+# state's process when it runs several states at once, so they share the CPUs.
+WORKERS_ENV = "WARN_PDF_WORKERS"
+
+
+def extract_tables(
+    pdf_path: typing.Union[str, Path],
+    all_tables: bool = False,
+    table_settings: typing.Optional[dict] = None,
+    workers: typing.Optional[int] = None,
+) -> typing.Iterator:
+    """Extract the tables from every page of a PDF, spreading the pages across a pool of processes.
+
+    pdfplumber is pure Python, so a long report keeps one core busy for minutes.
+    Here runs of pages are handed to worker processes, and the results come back
+    in page order, as soon as each page and all the pages before it are done.
+
+    Anything that depends on earlier pages, like rows split across a page
+    break or headers repeated at the top of each page, should be fixed up by
+    the caller as it loops through the results.
+
+    Example:
+        Merging rows split across pages::
+
+            output_rows = []
+            for page_index, rows in enumerate(pdf.extract_tables(pdf_path)):
+                output_rows.extend(_clean_table(rows, output_rows))
+
+    Args:
+        pdf_path (Path): The PDF to read
+        all_tables (bool): Return every table on each page with ``extract_tables``,
+            rather than the largest with ``extract_table`` (default False)
+        table_settings (dict): Settings passed to pdfplumber's table finder. Optional.
+        workers (int): The most processes to use (default from default_workers)
+
+    Returns: An iterator with one result per page. It's a list of rows, or None
+        when the page has no table, or a list of tables if all_tables is True.
+    """
+    pdf_path = str(pdf_path)
+    with pdfplumber.open(pdf_path) as pdf:
+        page_count = len(pdf.pages)
+    workers = workers or default_workers()
+
+    runs = [
+        range(start, min(start + PAGES_PER_TASK, page_count))
+        for start in range(0, page_count, PAGES_PER_TASK)
+    ]
+    args = (pdf_path, all_tables, table_settings)
+
+    # Short documents, or a single worker, aren't worth a pool
+    if workers < 2 or page_count < MIN_PARALLEL_PAGES:
+        logger.debug(f"Extracting tables from {page_count} pages of {pdf_path}")
+        yield from _extract_pages(*args, range(page_count))
+        return
+
+    workers = min(workers, len(runs))
+    logger.debug(
+        f"Extracting tables from {page_count} pages of {pdf_path} with {workers} workers"
+    )
+    # Spawned rather than forked, like the Runner's pool, so the workers start clean
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = [pool.submit(_extract_pages, *args, pages) for pages in runs]
+        try:
+            for future in futures:
+                yield from future.result()
+        finally:
+            # If the caller stops early, don't wait on pages nobody will read
+            for future in futures:
+                future.cancel()
+
+
+def default_workers() -> int:
+    """Get how many processes extract_tables uses when it isn't told.
+
+    That's the number in the WARN_PDF_WORKERS environment variable, if it's
+    set, or else one per CPU.
+    """
+    value = os.environ.get(WORKERS_ENV)
+    if value:
+        try:
+            return max(1, int(value))
+        except ValueError:
+            logger.warning(f"Ignoring {WORKERS_ENV}={value!r}, which isn't a number")
+    return os.cpu_count() or 1
+
+
+def share_cpus(processes: int) -> int:
+    """Get how many PDF workers each of several processes running at once should use.
+
+    Args:
+        processes (int): How many processes might extract tables at the same time
+
+    Returns: The CPUs divided between them, and at least one
+    """
+    return max(1, (os.cpu_count() or 1) // max(1, processes))
+
+
+def _extract_pages(
+    pdf_path: str,
+    all_tables: bool,
+    table_settings: typing.Optional[dict],
+    pages: range,
+) -> list:
+    """Extract the tables from a run of pages, opening the PDF once."""
+    results = []
+    with pdfplumber.open(pdf_path) as pdf:
+        for index in pages:
+            page = pdf.pages[index]
+            if all_tables:
+                results.append(page.extract_tables(table_settings=table_settings))
+            else:
+                results.append(page.extract_table(table_settings=table_settings))
+            # Drop the page's parsed objects as soon as it's done
+            page.close()
+    return results
@@ -1,11 +1,27 @@
+import gzip
+import hashlib
+import json
 import logging
 import re
+import typing
 from pathlib import Path
 
 import camelot  # pip install camelot-py==1.0.9 for now
+from pypdf import PdfReader
 
 logger = logging.getLogger(__name__)
 
+# Parse results are saved next to each PDF with this suffix
+PARSE_CACHE_SUFFIX = ".pdfrodent.json.gz"
+
+# How many pages iter_pdf_rows has camelot read at a time
+PAGES_PER_CHUNK = 10
+
+_WHITESPACE = re.compile(r"\s+")
+
+# Any edit to this module changes how PDFs parse, so it invalidates every cached result
+_PARSER_FINGERPRINT = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()
+
 
 def clean_cell(text: str) -> str:
     """
@@ -21,7 +37,7 @@ def clean_cell(text: str) -> str:
         return ""
 
     # Standardize whitespace
-    clean_text = re.sub(r"\s+", " ", text).strip()
+    clean_text = _WHITESPACE.sub(" ", text).strip()
 
     return clean_text
 
@@ -94,12 +110,9 @@ def count_data_items(row: list, prefixes=None) -> int:
     good_items = 0
     if not prefixes:
         prefixes = ["int_", "_int_"]
+    prefix_tuple = tuple(prefixes)
     for field in row:
-        goodfieldname = True
-        for prefix in prefixes:
-            if field.startswith(prefix):
-                goodfieldname = False
-        if goodfieldname:
+        if not field.startswith(prefix_tuple):
             if has_content(row[field]):
                 good_items += 1
     return good_items
@@ -178,16 +191,170 @@ We probably want code that tells us what PDF this is pulled from, on which row.
 """
 
 
-def parse_pdf(pdffile: str | Path, field_fixes: dict | None = None):
+def parse_cache_key(pdffile: str | Path, field_fixes: dict | None = None) -> str:
+    """Build the key a PDF's parse results are cached under.
+
+    Args:
+        pdffile (str or Path): The PDF to be parsed
+        field_fixes (dict): The header lookup the PDF will be parsed with
+
+    Returns: A hex digest of the PDF's contents, the field_fixes and this parser's code
+    """
+    digest = hashlib.sha256()
+    with open(pdffile, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1024 * 1024), b""):
+            digest.update(chunk)
+    digest.update(json.dumps(field_fixes or {}, sort_keys=True).encode("utf-8"))
+    digest.update(_PARSER_FINGERPRINT.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _read_parse_cache(pdffile: str | Path, key: str):
+    """Fetch cached parse results for a PDF, if they match the key."""
+    sidecar = Path(str(pdffile) + PARSE_CACHE_SUFFIX)
+    try:
+        with gzip.open(sidecar, "rt", encoding="utf-8") as fh:
+            cached = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    if cached.get("key") != key:
+        return None
+    logger.debug(f"Using cached parse of {pdffile}")
+    return cached["filelist"]
+
+
+def _write_parse_cache(pdffile: str | Path, key: str, filelist):
+    """Save a PDF's parse results next to it."""
+    sidecar = Path(str(pdffile) + PARSE_CACHE_SUFFIX)
+    payload = {"key": key, "filelist": filelist}
+    with gzip.open(sidecar, "wt", encoding="utf-8") as fh:
+        json.dump(payload, fh, separators=(",", ":"))
+    logger.debug(f"Saved parse of {pdffile} to {sidecar}")
+
+
+class TraceSink:
+    """Write how pdfrodent sorted each row to a JSON Lines file, for debugging.
+
+    Each line is one event, like a data row or a repeated header, with the PDF,
+    page, table and row it came from. Tracing is off unless a sink is passed
+    in, and when it's off no events are built at all.
+
+    Example:
+        Tracing a run over several PDFs::
+
+            with pdfrodent.TraceSink(cache_dir / "ms/debugging.jsonl") as tracer:
+                for pdffile in pdffiles:
+                    rows = pdfrodent.parse_pdf(pdffile, headerfixes, tracer=tracer)
+
+    Args:
+        path (Path): The file to write, replacing any already there
+    """
+
+    def __init__(self, path: str | Path):
+        """Initialize a new instance."""
+        self.path = Path(path)
+        self._fh: typing.Optional[typing.TextIO] = None
+
+    def __enter__(self) -> "TraceSink":
+        """Open the file."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fh = open(self.path, "w", encoding="utf-8")
+        return self
+
+    def __exit__(self, *exc):
+        """Close the file."""
+        if self._fh:
+            self._fh.close()
+            self._fh = None
+
+    def event(self, event: str, **fields):
+        """Write one event, like "data" or "empty", with its coordinates and details."""
+        self._fh.write(json.dumps({"event": event, **fields}) + "\n")  # type: ignore
+
+
+def parse_pdf(
+    pdffile: str | Path,
+    field_fixes: dict | None = None,
+    use_cache: bool = True,
+    tracer: TraceSink | None = None,
+) -> list:
     """Parse a PDF file to extract data from tables.
 
+    Camelot parsing is slow, so results are saved in a compressed file next to
+    the PDF and reused until the PDF, the field_fixes or this parser change.
+    When a tracer is passed, the PDF is always parsed afresh, so every row is traced.
+
     Args:
         Filename (string)
         field_fixes (string or dict): If supplied, a dictionary of header lookup values with values of the target name
+        use_cache (bool): Whether to reuse and save cached parse results (default True)
+        tracer (TraceSink): Where to write how each row was sorted. Optional.
 
     Returns:
         filelist: A list of dictionaries of data rows keyed to headers
-        filerowholder: Debugging data showing how row types were determined
+    """
+    if use_cache:
+        key = parse_cache_key(pdffile, field_fixes)
+        cached = None if tracer else _read_parse_cache(pdffile, key)
+        # A PDF without any rows caches an empty list, which is still a hit
+        if cached is not None:
+            return cached
+    filelist = list(_iter_pdf_rows(pdffile, field_fixes, tracer=tracer))
+    if use_cache:
+        _write_parse_cache(pdffile, key, filelist)
+    return filelist
+
+
+def iter_pdf_rows(
+    pdffile: str | Path,
+    field_fixes: dict | None = None,
+    chunk_pages: int = PAGES_PER_CHUNK,
+    tracer: TraceSink | None = None,
+) -> typing.Iterator[dict]:
+    """Parse a PDF file a few pages at a time, yielding its data rows as they're found.
+
+    parse_pdf has camelot read every table in the document before the first
+    row comes out. Here camelot reads chunk_pages pages at a time, so memory
+    depends on the chunk size rather than the document, and the first rows
+    reach the caller early. A header orphaned at the end of one chunk is still
+    applied to the tables at the start of the next.
+
+    Rows are the same as parse_pdf's, but they aren't cached.
+
+    Args:
+        pdffile (str or Path): The PDF to be parsed
+        field_fixes (dict): If supplied, a dictionary of header lookup values with values of the target name
+        chunk_pages (int): How many pages camelot reads at a time (default 10)
+        tracer (TraceSink): Where to write how each row was sorted. Optional.
+
+    Yields: Dictionaries of data rows keyed to headers
+    """
+    yield from _iter_pdf_rows(pdffile, field_fixes, chunk_pages, tracer)
+
+
+def _iter_tables(pdffile: str | Path, chunk_pages: int | None):
+    """Read a PDF's tables with camelot, all at once or a chunk of pages at a time."""
+    if not chunk_pages:
+        yield from camelot.read_pdf(pdffile, pages="all")
+        return
+    page_count = len(PdfReader(pdffile).pages)
+    for start in range(1, page_count + 1, chunk_pages):
+        end = min(start + chunk_pages - 1, page_count)
+        logger.debug(f"Reading pages {start}-{end} of {page_count} in {pdffile}")
+        # Each chunk's tables are let go once they've been parsed
+        yield from camelot.read_pdf(pdffile, pages=f"{start}-{end}")
+
+
+def _iter_pdf_rows(
+    pdffile: str | Path,
+    field_fixes: dict | None = None,
+    chunk_pages: int | None = None,
+    tracer: TraceSink | None = None,
+) -> typing.Iterator[dict]:
+    """Sort a PDF's rows into headers, fragments and data, yielding each table's data rows.
+
+    The header state is kept across tables, so it carries over from one chunk of pages to the next.
+    How each row was sorted is written to the tracer, if there is one.
     """
     if not field_fixes:
         logger.debug(
@@ -196,16 +363,20 @@ def parse_pdf(pdffile: str | Path, field_fixes: dict | None = None):
         field_fixes = {}
     else:
         logger.debug(f"{len(field_fixes):,} field_fixes to be used to clean headers.")
-    filelist = []
-    filerowholder = []
     logger.debug(f"Opening {pdffile} for PDF parsing")
-    tables = camelot.read_pdf(pdffile, pages="all")
+    tables = _iter_tables(pdffile, chunk_pages)
+    patch_header = _header_patcher(field_fixes)
+    filename = str(pdffile).split("/")[-1].split("\\")[-1]
     orphanedheader = False
     orphanholder = None
     for tableindex, table in enumerate(tables):
         locallist: list = []
         logger.debug(f"Processing table {tableindex} of {pdffile}")
-        filerowholder.append(f"Processing table {tableindex} of {pdffile}")
+        report = table.parsing_report
+        # Checked before building each event, so nothing is allocated when tracing is off
+        if tracer:
+            where = {"pdf": filename, "page": report["page"], "table": tableindex}
+            tracer.event("table", rows=len(table.rows), **where)
         rawheader = None
         headerfirst = []
         headersupplement: dict = {}
@@ -218,24 +389,15 @@ def parse_pdf(pdffile: str | Path, field_fixes: dict | None = None):
         # If the table has only one row, it's a stray header and should be used with the next table.
         if len(table.rows) == 1:
             logger.debug("\tOrphaned header detected!")
-            filerowholder.append("\tOrphaned header detected!")
             orphanedheader = True
-            patchedheaders = []
             rawheader = table.data[0]
-            for item in clean_row(rawheader):
-                if item in field_fixes:
-                    patchedheaders.append(field_fixes[item])
-                else:
-                    logger.debug(
-                        f"New header type found: {item}, not in field_fixes: '{' '.join(sorted(list(field_fixes.keys())))}'"
-                    )
-                    patchedheaders.append(item)
             orphanholder = {
                 "rawheader": rawheader,
-                "patchedheaders": patchedheaders,
+                "patchedheaders": patch_header(rawheader),
             }
             logger.debug(f"{orphanholder}")
-            filerowholder.append(f"{orphanholder}")
+            if tracer:
+                tracer.event("orphaned_header", **where, **orphanholder)
         # If there are multiple rows, there are a bunch of possibilities we need to poke ...
         else:
             # If we have a header from a one-row table, prepare to use the orphaned header
@@ -245,71 +407,66 @@ def parse_pdf(pdffile: str | Path, field_fixes: dict | None = None):
                 headerfirst = orphanholder["patchedheaders"]  # type: ignore
 
             for rowindex, row in enumerate(table.data):
-                filerowholder.append(row)
-                line: dict = {}  # rows in, lines out
+                # Clean every cell once, and count the ones with anything in them
+                cells, filled = _normalize_row(row)
                 # If it's the first row in a table and we don't have an orphaned header,
                 # it's an index row
                 if rowindex == 0 and not orphanedheader:
                     rawheader = row
-                    patchedheaders = []
-                    for item in clean_row(rawheader):
-                        if item in field_fixes:
-                            patchedheaders.append(field_fixes[item])
-                        else:
-                            logger.debug(
-                                f"New header type found: {item}, not in field_fixes: '{' '.join(sorted(list(field_fixes.keys())))}'"
-                            )
-                            patchedheaders.append(item)
-                    headerfirst = patchedheaders
+                    headerfirst = patch_header(row)
                     isheader = True
-                    filerowholder.append("\tIndex row!")
+                    if tracer:
+                        tracer.event("index_row", **where, row=rowindex, cells=row)
 
                 elif row == rawheader:  # Later instance of a page header
                     isheader = True
-                    filerowholder.append("\tRepeated header")
+                    if tracer:
+                        tracer.event("repeated_header", **where, row=rowindex)
 
                 # Drop blank rows entirely
-                elif is_empty(clean_row(row)):
-                    filerowholder.append("\tEmpty row")
-                    pass
+                elif filled == 0:
+                    if tracer:
+                        tracer.event("empty", **where, row=rowindex)
 
                 # Handle fragmentary records
-                elif is_mostly_empty(clean_row(row)):
-                    filerowholder.append("\tMostly empty row!")
+                elif filled <= 2:
                     if not seendata:  # Is this part of the initial header?
-                        filerowholder.append("\tMostly empty row, haven't seen data")
-                        for cellindex, cell in enumerate(row):
-                            cleancell = clean_cell(cell)
-                            if len(cleancell) > 0:  # If we have good data
+                        if tracer:
+                            tracer.event(
+                                "header_fragment", **where, row=rowindex, cells=row
+                            )
+                        for cellindex, cleancell in enumerate(cells):
+                            if cleancell:  # If we have good data
                                 fieldname = f"supplement{cellindex}"
                                 headersupplement[fieldname] = None  # type: ignore
-                            isheader = False
-                            orphanedheader = False
+                        isheader = False
+                        orphanedheader = False
 
                     else:  # seendata
                         if isheader:  # Supplement to a header on a latter page
-                            filerowholder.append(
-                                "\tMostly empty row, seems to be appending to a header"
-                            )
-                            for cellindex, cell in enumerate(row):
-                                cleancell = clean_cell(cell)
-                                if len(cleancell) > 0:  # If we have good data
+                            if tracer:
+                                tracer.event(
+                                    "header_supplement",
+                                    **where,
+                                    row=rowindex,
+                                    cells=row,
+                                )
+                            for cellindex, cleancell in enumerate(cells):
+                                if cleancell:  # If we have good data
                                     if cleancell not in headersupplement:
                                         headersupplement[cellindex] = headersupplement
                                         logger.debug(
                                             f"Added {cleancell} to headersupplement, which now holds: {headersupplement}"
                                         )
-                            isheader = False
 
                         else:  # Not a header, have seenheader; must be a regular row supplement
                             orphanedheader = False
-                            isheader = False
-                            filerowholder.append(
-                                "\tMostly empty row, seems to be detailed info for a regular row"
-                            )
-                            for cellindex, cell in enumerate(row):
-                                cleancell = clean_cell(cell)
-                                if len(cleancell) > 0:  # If we have good data
+                            if tracer:
+                                tracer.event(
+                                    "row_supplement", **where, row=rowindex, cells=row
+                                )
+                            for cellindex, cleancell in enumerate(cells):
+                                if cleancell:  # If we have good data
                                     if cellindex in headersupplement:
                                         fieldname = headersupplement[cellindex]  # type: ignore
                                     else:
@@ -336,20 +493,20 @@ def parse_pdf(pdffile: str | Path, field_fixes: dict | None = None):
                     # It's not a supplemental data row
                     # We ... actually have a regular data row here.
                     orphanedheader = False
-                    filerowholder.append("\tSeems to be a regular row.")
                     isheader = False
                     seendata = True
-                    for cellindex, cell in enumerate(row):
-                        line[headerfirst[cellindex]] = clean_cell(cell)
-                    filerowholder.append(f"\t\t{line}")
-                    line["_int_raw_fields"] = row
+                    line: dict = {}  # rows in, lines out
+                    for cellindex, cleancell in enumerate(cells):
+                        line[headerfirst[cellindex]] = cleancell
+                    if tracer:
+                        tracer.event("data", **where, row=rowindex, line=line)
+                    # A copy, so supplements added to it never change the table's own row
+                    line["_int_raw_fields"] = list(row)
                     locallist.append(line)
 
-            report = table.parsing_report
-
-            for lineindex, line in enumerate(locallist):
+            for line in locallist:
                 line["_int_accuracy"] = report["accuracy"]
-                line["_int_pdf_filename"] = str(pdffile).split("/")[-1].split("\\")[-1]
+                line["_int_pdf_filename"] = filename
                 line["_int_page"] = report["page"]
                 line["_int_table_number"] = report["order"]
                 # line["_int_raw_fields"] = row    # HEY! Need to handle for supplemented lines
@@ -358,7 +515,41 @@ def parse_pdf(pdffile: str | Path, field_fixes: dict | None = None):
                 if "Event Number" in line:
                     line["Event Number"] = line["Event Number"].replace("\n", "")
 
-                locallist[lineindex] = line  # Save it back
+        yield from locallist
+
+
+def _normalize_row(row: list) -> typing.Tuple[list, int]:
+    """Clean a row's cells and count how many have content, in one pass.
+
+    Returns: The cleaned cells and the number that aren't empty
+    """
+    cells = [_WHITESPACE.sub(" ", cell).strip() if cell else "" for cell in row]
+    return cells, len(cells) - cells.count("")
+
+
+def _header_patcher(field_fixes: dict) -> typing.Callable[[list], list]:
+    """Build a function that swaps a header row's names for their field_fixes.
+
+    Headers repeat on every page, so each distinct header row is cleaned and
+    patched once, and later copies are a dictionary lookup.
+    """
+    patched: typing.Dict[tuple, list] = {}
+
+    def patch(rawheader: list) -> list:
+        key = tuple(rawheader)
+        if key not in patched:
+            patchedheaders = []
+            for item in clean_row(rawheader):
+                if item in field_fixes:
+                    patchedheaders.append(field_fixes[item])
+                else:
+                    # Listing every known header is costly, so only do it when it'll be seen
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug(
+                            f"New header type found: {item}, not in field_fixes: '{' '.join(sorted(field_fixes))}'"
+                        )
+                    patchedheaders.append(item)
+            patched[key] = patchedheaders
+        return patched[key]
 
-        filelist.extend(locallist)
-    return (filelist, filerowholder)
+    return patch
@@ -1,5 +1,13 @@
+import hashlib
+import json
 import logging
+import os
 import re
+import tempfile
+import threading
+import urllib.parse
+from datetime import datetime, timezone
+from pathlib import Path
 
 from warn.cache import Cache as BaseCache
 
@@ -9,12 +17,30 @@ logger = logging.getLogger(__name__)
 
 
 class Cache(BaseCache):
-    """A custom cache for Job Center sites."""
+    """A custom cache for Job Center sites.
+
+    These sites cache a page for every notice, so they can be stored sharded and
+    compressed by setting the WARN_CACHE_COMPRESSION environment variable to
+    "gzip" or "zstd".
+    """
+
+    def __init__(self, path=None, compression=None, sharded=None, index_dir=None):
+        """Initialize a new instance."""
+        compression = compression or os.environ.get("WARN_CACHE_COMPRESSION") or None
+        if sharded is None:
+            sharded = compression is not None
+        # Each site's cache is a state's folder, so share the index in the folder above
+        if index_dir is None and path is not None:
+            index_dir = Path(path).parent
+        super().__init__(
+            path, compression=compression, sharded=sharded, index_dir=index_dir
+        )
 
     def save(self, url, params, html):
         """Save file to the cache."""
         cache_key = self.key_from_url(url, params)
-        self.write(cache_key, html)
+        source = f"{url}?{urllib.parse.urlencode(params)}" if params else url
+        self.write(cache_key, html, url=source)
         logger.debug(f"Saved to cache: {cache_key}")
 
     def fetch(self, url, params):
@@ -51,3 +77,67 @@ class Cache(BaseCache):
                 page_num = 1
             cache_key = f"search_results/{start}_{end}_page{page_num}.html"
         return cache_key
+
+
+class RecordIndex:
+    """The search result row last seen for each of a state's records.
+
+    A Job Center notice's detail page only needs fetching again when its row in
+    the search results changes. The index keeps a fingerprint of each record's
+    row and when its detail page was last fetched, so a fresh search can reuse
+    the cached detail pages of every record that hasn't changed.
+
+    It's safe to share between threads, and it's saved with a write-and-rename
+    so an interrupted scrape never leaves a half-written file behind.
+
+    Args:
+        path (str): Where the index is saved (e.g. ~/.warn-scraper/cache/ks/record_index.json)
+    """
+
+    # Search result fields that go into a row's fingerprint
+    FIELDS = ("employer", "city", "zip", "lwib_area", "notice_date", "warn_type")
+
+    def __init__(self, path):
+        """Initialize a new instance, loading the saved index if there is one."""
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        try:
+            with open(self.path, encoding="utf-8") as fh:
+                self.records = json.load(fh)
+        except (OSError, ValueError):
+            self.records = {}
+
+    @classmethod
+    def fingerprint(cls, row):
+        """Hash the fields of a search result row."""
+        values = [row.get(field, "") for field in cls.FIELDS]
+        return hashlib.sha1(json.dumps(values).encode("utf-8")).hexdigest()
+
+    def is_current(self, record_number, fingerprint):
+        """Check whether a record's search result row is the same as last time."""
+        with self._lock:
+            entry = self.records.get(record_number)
+        return entry is not None and entry["fingerprint"] == fingerprint
+
+    def update(self, record_number, fingerprint):
+        """Note that a record's detail page was just fetched for this row."""
+        fetched = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        with self._lock:
+            self.records[record_number] = {
+                "fingerprint": fingerprint,
+                "fetched": fetched,
+            }
+
+    def save(self):
+        """Write the index to disk."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                    json.dump(self.records, fh, indent=2, sort_keys=True)
+                os.replace(tmp, self.path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+        logger.debug(f"Saved {len(self.records):,} records to {self.path}")
@@ -1,16 +1,28 @@
 import html as html_mod
 import logging
+import re
 import urllib.parse
-from datetime import date
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
 
-import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+
+from warn import client
 
 from .cache import Cache
 from .urls import urls
 
 logger = logging.getLogger(__name__)
 
+# Only these parts of each page are built into a tree; the rest is skipped by the parser
+SEARCH_RESULTS_STRAINER = SoupStrainer(["tr", "a"])
+DETAIL_PAGE_STRAINER = SoupStrainer(
+    attrs={"class": ["definition-list__title", "definition-list__definition"]}
+)
+
+# Date ranges whose search results run past this many pages are split into smaller ones
+MAX_WINDOW_PAGES = 5
+
 
 class NoSearchResultsError(Exception):
     """Thrown when there are no results."""
@@ -31,15 +43,73 @@ class Site:
         url (str): Search URL for the site (should end in '/warn_lookups')
         cache_dir (str): Cache directory
         verify (boolean, default True): SSL certificate verification
+        max_workers (int, default 4): Detail pages fetched at once for each page of search results
+        index (RecordIndex, optional): Reuse cached detail pages for records whose search result is unchanged
     """
 
-    def __init__(self, state, url, cache_dir, verify=True):
+    def __init__(self, state, url, cache_dir, verify=True, max_workers=4, index=None):
         """Initialize a new instance."""
         self.state = state.upper()
         self.url = url
         self.cache = Cache(cache_dir)
         self.verify = verify
-        print(f"Site init SSL verification status: {self.verify}")
+        self.max_workers = max_workers
+        self.index = index
+        # Cache keys of the pages fetched from the web during this run, which never need fetching again
+        self.fresh = set()
+        logger.debug(f"Site init SSL verification status: {self.verify}")
+
+    def copy(self):
+        """Make a new instance with the same settings, sharing the record index and fresh pages."""
+        site = type(self)(
+            self.state,
+            self.url,
+            self.cache.path,
+            verify=self.verify,
+            max_workers=self.max_workers,
+            index=self.index,
+        )
+        site.fresh = self.fresh
+        return site
+
+    def windows(self, start_date, end_date, max_pages=MAX_WINDOW_PAGES, use_cache=True):
+        """
+        Split a date range until the search results for each piece fit on a few pages.
+
+        The first page of results for the range is fetched to read its page count.
+        A range with too many pages is split into quarters, then months, then weeks,
+        and each piece is checked in turn. Ranges without any results are dropped.
+
+        The first pages fetched here are reused when the ranges are scraped.
+
+        Args:
+            start_date (str): YYYY-MM-DD
+            end_date (str): YYYY-MM-DD
+            max_pages (int, default 5): The most pages of results a range should have
+            use_cache (boolean, default True): Check cache before scraping.
+
+        Returns:
+            A list of (start_date, end_date) pairs, oldest first, like the rows in the search results
+        """
+        kwargs = {
+            "params": self._search_kwargs(start_date=start_date, end_date=end_date),
+            "detail_pages": False,
+            "use_cache": use_cache,
+        }
+        results = self._scrape_search_results_page(self.url, **kwargs)
+        if not results.get("data"):
+            return []
+        pieces = _split_date_range(start_date, end_date)
+        if results["last_page"] <= max_pages or not pieces:
+            return [(start_date, end_date)]
+        logger.debug(
+            f"Splitting {start_date} -> {end_date} with {results['last_page']} pages"
+        )
+        return [
+            window
+            for start, end in pieces
+            for window in self.windows(start, end, max_pages, use_cache)
+        ]
 
     def scrape(self, start_date=None, end_date=None, detail_pages=True, use_cache=True):
         """
@@ -58,34 +128,69 @@ class Site:
             and a list of parsed data dictionaries
             ( {1: <HTML str>}, [{data}, {more data}] )
         """
-        # Final payload here
         html_store = {}
         data = []
-        # Begin scrape with initial page
+        for results in self.iter_pages(start_date, end_date, detail_pages, use_cache):
+            self._update_payload(html_store, data, results)
+        return (html_store, data)
+
+    def iter_records(
+        self, start_date=None, end_date=None, detail_pages=True, use_cache=True
+    ):
+        """
+        Yield records between a start and end date as each page of results is scraped.
+
+        Unlike scrape, nothing is kept once it's been yielded, so memory stays
+        flat no matter how many pages a search runs to.
+
+        Args:
+            start_date (str): YYYY-MM-DD
+            end_date (str): YYYY-MM-DD
+            detail_pages (boolean, default True): Whether or not to scrape detail pages.
+            use_cache (boolean, default True): Check cache before scraping.
+
+        Yields:
+            Parsed data dictionaries, in the order they appear in the search results
+        """
+        for results in self.iter_pages(start_date, end_date, detail_pages, use_cache):
+            yield from results["data"]
+
+    def iter_pages(
+        self, start_date=None, end_date=None, detail_pages=True, use_cache=True
+    ):
+        """
+        Yield each page of search results between a start and end date.
+
+        Pages are walked in a loop by following each page's "next" link.
+
+        Args:
+            start_date (str): YYYY-MM-DD
+            end_date (str): YYYY-MM-DD
+            detail_pages (boolean, default True): Whether or not to scrape detail pages.
+            use_cache (boolean, default True): Check cache before scraping.
+
+        Yields:
+            A dictionary with the page number, its html and its parsed data
+            {"page_num": 1, "html": <HTML str>, "data": [{data}, {more data}]}
+        """
         start = start_date or self._start
         end = end_date or self._end
-        kwargs = {
-            "params": self._search_kwargs(start_date=start, end_date=end),
-            "use_cache": use_cache,
-            "detail_pages": detail_pages,
-        }
-        logger.debug(
-            f"Scraping initial page for date range: {start_date} -> {end_date}"
-        )
-        results = self._scrape_search_results_page(self.url, **kwargs)
-        # Exit early if there were no results
-        if not results.get("data"):
-            return (html_store, data)
-        # Update the html_store and data payloads
-        self._update_payload(html_store, data, results)
-        # Scrape downstream pages, if any
-        next_page_link = self._next_page_link(results["html"])
-        if next_page_link:
-            logger.debug("Scraping paged results")
-            self._scrape_next_page(
-                next_page_link, html_store, data, detail_pages, use_cache
+        logger.debug(f"Scraping initial page for date range: {start} -> {end}")
+        url = self.url
+        params = self._search_kwargs(start_date=start, end_date=end)
+        seen = set()
+        while url and url not in seen:
+            seen.add(url)
+            results = self._scrape_search_results_page(
+                url, params=params, detail_pages=detail_pages, use_cache=use_cache
             )
-        return (html_store, data)
+            # Empty results dict signals no search results were returned
+            if not results.get("data"):
+                return
+            yield results
+            # Downstream page links carry their own query string
+            url = results["next_page_url"]
+            params = {}
 
     @property
     def _start(self):
@@ -108,15 +213,16 @@ class Site:
         """
         logger.debug(f"Requesting {url}")
         cache_key = self.cache.key_from_url(url, params)
-        if use_cache and self.cache.exists(cache_key):
+        if (use_cache or cache_key in self.fresh) and self.cache.exists(cache_key):
             logger.debug("Fetching from cache")
             return self.cache.fetch(url, params)
         else:
             logger.debug(f"Pulling from the web: {url} with params {params}")
-            response = requests.get(url, params=params, verify=self.verify)
+            response = client.get(url, params=params, verify=self.verify)
             logger.debug(f"Response code: {response.status_code}")
             html = response.text
             self.cache.save(url, params, html)
+            self.fresh.add(cache_key)
             return html
 
     def _scrape_search_results_page(
@@ -134,42 +240,44 @@ class Site:
             page_num = 1
             html = self._get_page(url, **kwargs)
         try:
-            data = self._parse_search_results(html)
+            data, next_page_url, last_page = self._parse_search_results(html)
         except NoSearchResultsError:
             return {}
         if detail_pages:
             logger.debug("Scraping detail pages found on search results page...")
-            for row in data:
-                detail_page_data = self._scrape_detail_page(
-                    row["detail_page_url"], use_cache
-                )
+            for row, detail_page_data in zip(
+                data, self._scrape_detail_pages(data, use_cache)
+            ):
                 row["detail"].update(detail_page_data)
-        return {"page_num": page_num, "html": html, "data": data}
-
-    def _scrape_next_page(
-        self, next_page_link, html_store, data, detail_pages, use_cache
-    ):
-        """Scrape the results of next page and update the payload."""
-        kwargs = {
-            "params": {},
-            "detail_pages": detail_pages,
-            "use_cache": use_cache,
+        return {
+            "page_num": page_num,
+            "html": html,
+            "data": data,
+            "next_page_url": next_page_url,
+            "last_page": max(page_num, last_page),
         }
-        results = self._scrape_search_results_page(next_page_link, **kwargs)
-        try:
-            results["data"]
-        # Empty results dict signals no search results were returned
-        except KeyError:
-            return
-        self._update_payload(html_store, data, results)
-        # If there are any more pages, make a recursive call
-        next_page_link = self._next_page_link(results["html"])
-        if next_page_link:
-            args = [next_page_link, html_store, data, detail_pages, use_cache]
-            self._scrape_next_page(*args)
-        # Otherwise, we've reached the last page so return
-        else:
-            return
+
+    def _scrape_detail_pages(self, rows, use_cache):
+        """Scrape the detail pages for several search result rows at once, returning their data in the order given."""
+        if self.max_workers <= 1 or len(rows) <= 1:
+            return [self._scrape_row_detail_page(row, use_cache) for row in rows]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            return list(
+                pool.map(lambda row: self._scrape_row_detail_page(row, use_cache), rows)
+            )
+
+    def _scrape_row_detail_page(self, row, use_cache):
+        """Scrape a search result row's detail page, reusing the cached copy if the row hasn't changed."""
+        url = row["detail_page_url"]
+        if self.index is None:
+            return self._scrape_detail_page(url, use_cache)
+        record_number = row["detail"]["record_number"]
+        fingerprint = self.index.fingerprint(row)
+        if self.index.is_current(record_number, fingerprint):
+            return self._scrape_detail_page(url, use_cache=True)
+        detail = self._scrape_detail_page(url, use_cache)
+        self.index.update(record_number, fingerprint)
+        return detail
 
     def _scrape_detail_page(self, url, use_cache):
         """Scrape the provided detail page."""
@@ -184,7 +292,7 @@ class Site:
             "number_of_employees_affected": "",
             "notice_date": "",
         }
-        soup = BeautifulSoup(html, "html.parser")
+        soup = BeautifulSoup(html, "lxml", parse_only=DETAIL_PAGE_STRAINER)
         headers = [
             self._snake_case(header.text)
             for header in soup.select(".definition-list__title")
@@ -198,24 +306,31 @@ class Site:
         return payload
 
     def _parse_search_results(self, html):
-        """Parse data out of the search results."""
-        data = []
-        soup = BeautifulSoup(html, "html.parser")
-        table_rows = soup.find_all("tr")
-        # Remove header
-        try:
-            table_rows.pop(0)
-        except IndexError:
-            # IndexError signals no results were found on page
-            # Verify this page has no results and return data
-            msg = "no matches for your search results"
-            if msg in soup.text:
-                raise NoSearchResultsError(msg)
+        """Parse the data and the link to the next page out of the search results.
+
+        Returns:
+            A tuple of the parsed data dictionaries, the next page's URL (or None
+            on the last page) and the highest page number linked from the page
+        """
+        # The message is plain text in the page, so there's no need to parse for it
+        msg = "no matches for your search results"
+        if msg in html:
+            raise NoSearchResultsError(msg)
+        soup = BeautifulSoup(html, "lxml", parse_only=SEARCH_RESULTS_STRAINER)
+        # Skip the header
+        table_rows = soup.find_all("tr")[1:]
         # Process result listings
-        for row in table_rows:
-            row_data = self._extract_search_results_row(row)
-            data.append(row_data)
-        return data
+        data = [self._extract_search_results_row(row) for row in table_rows]
+        next_page = soup.find("a", class_="next_page")
+        if next_page and next_page.get("href"):
+            next_page_url = self._build_page_url(next_page["href"])
+        else:
+            next_page_url = None
+        page_links = soup.find_all("a", attrs={"aria-label": re.compile(r"^Page \d+$")})
+        last_page = max(
+            (int(a["aria-label"].split()[-1]) for a in page_links), default=1
+        )
+        return (data, next_page_url, last_page)
 
     def _update_payload(self, html_store, data, results):
         """Update a payload."""
@@ -259,17 +374,6 @@ class Site:
             },
         }
 
-    def _next_page_link(self, html):
-        """Get the link for the next page, if it exists."""
-        soup = BeautifulSoup(html, "html.parser")
-        next_page = soup.find("a", class_="next_page")
-        try:
-            url_path = next_page["href"]
-            next_page_url = self._build_page_url(url_path)
-        except TypeError:
-            next_page_url = None
-        return next_page_url
-
     def _build_page_url(self, url_path):
         """Create the URL for the page."""
         bits = urllib.parse.urlsplit(self.url)
@@ -283,3 +387,37 @@ class Site:
     def _clean_field(self, text):
         """Strip and tidy a line of text."""
         return html_mod.unescape(text.strip())
+
+
+def _split_date_range(start_date, end_date):
+    """Split a date range into quarters, months or weeks, whichever is the next size down.
+
+    Returns:
+        A list of (start_date, end_date) pairs, oldest first, or an empty list
+        if the range is a week or less
+    """
+    start = date.fromisoformat(start_date)
+    end = date.fromisoformat(end_date)
+    days = (end - start).days + 1
+    if days > 92:
+        months = 3
+    elif days > 31:
+        months = 1
+    elif days > 7:
+        months = 0
+    else:
+        return []
+    pieces = []
+    piece_start = start
+    while piece_start <= end:
+        if months:
+            # Break on calendar quarters or months
+            month = piece_start.month - (piece_start.month - 1) % months + months
+            year = piece_start.year + (month - 1) // 12
+            next_start = date(year, (month - 1) % 12 + 1, 1)
+        else:
+            next_start = piece_start + timedelta(days=7)
+        piece_end = min(next_start - timedelta(days=1), end)
+        pieces.append((piece_start.isoformat(), piece_end.isoformat()))
+        piece_start = next_start
+    return pieces
@@ -1,13 +1,30 @@
+import csv
+import hashlib
 import logging
 import re
-from collections import OrderedDict
+import shutil
+import sqlite3
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime as dt
+from pathlib import Path
+from urllib.parse import urlsplit
 
-from ... import utils
+from ... import client, utils
+from .cache import RecordIndex
 from .site import Site as JobCenterSite
 
 logger = logging.getLogger(__name__)
 
+# Distinct rows _dedupe tracks in memory before moving its digests to disk
+DEDUPE_MEMORY_ROWS = 1_000_000
+
+# Requests per second, and the burst allowed, for each state's Job Center host.
+# Years and detail pages are both fetched several at a time, so without a limit
+# a scrape could have year_workers * max_workers requests in flight at once.
+JOB_CENTER_RATE = 4
+JOB_CENTER_BURST = 4
+
 
 def scrape_state(
     state_postal,
@@ -17,16 +34,22 @@ def scrape_state(
     cache_dir,
     use_cache=True,
     verify=True,
+    max_workers=4,
+    year_workers=4,
 ):
     """Date-based scraper for Job Center states.
 
     This is the primary interface that should be used by downstream scrapers.
     It applies a date-based scraping strategy that:
 
-      - Scrapes one year at a time, in reverse chronological order
-      - Always does a fresh scrape for current and prior year
+      - Scrapes several years at a time, writing them out in reverse chronological order
+      - Splits busy years into quarters, months or weeks that fit on a few pages of results
+      - Always does a fresh scrape for current and prior year's search results,
+        but only fetches the detail pages of records that are new or changed
       - Uses cached files for years before current & prior
       - Deduplicates search results
+      - Paces requests to the state's host at JOB_CENTER_RATE, unless the
+        scraper has already declared its own limit for it
 
     Args:
         state_postal (str): Two-letter all-caps state postal (e.g. KS)
@@ -36,23 +59,47 @@ def scrape_state(
         cache_dir (str): The root directory for WARN's cache files (e.g. ~/.warn-scraper/cache)
         use_cache (boolean, default True): Whether to use cached files for older years
         verify (boolean, default True): Use SSL certificate verifcation
+        max_workers (int, default 4): Detail pages to fetch at once for each year
+        year_workers (int, default 4): Years to scrape at once
 
     Returns:
         Full path to exported csv (e.g. ~/.warn-scraper/exports/ks.csv)
     """
     yearly_dates = _date_ranges_to_scrape(stop_year)
 
-    # No caching should be used for current and prior year, so
-    # we have to separate those from remaining years.
-    no_cache_years = [yearly_dates.pop(0), yearly_dates.pop(0)]
+    # However many workers are running, keep the state's host to a steady pace
+    client.limit(
+        urlsplit(search_url).netloc,
+        rate=JOB_CENTER_RATE,
+        burst=JOB_CENTER_BURST,
+        replace=False,
+    )
 
     # Set up scraper instance
     state_cache_dir = cache_dir / state_postal.lower()
     print(f"scrape_state verify: {verify}")
+    index = RecordIndex(state_cache_dir / "record_index.json")
     site = JobCenterSite(
-        state_postal.upper(), search_url, cache_dir=state_cache_dir, verify=verify
+        state_postal.upper(),
+        search_url,
+        cache_dir=state_cache_dir,
+        verify=verify,
+        max_workers=max_workers,
+        index=index,
     )
 
+    # No caching should be used for recent years (by default the current and prior
+    # year, per the cache's freshness policy), so we have to separate those from
+    # the settled years.
+    settled_years = [
+        (start, end)
+        for start, end in yearly_dates
+        if site.cache.is_settled(
+            site.cache.key_from_url(site.url, site._search_kwargs(start, end))
+        )
+    ]
+    no_cache_years = [dates for dates in yearly_dates if dates not in settled_years]
+
     # Date-based searches produce search result pages that appear to have certain
     # records duplicated over paged results. We'll initially write all data to a raw
     # file which we then deduplicate to produce the final output_csv.
@@ -74,38 +121,92 @@ def scrape_state(
     ]
     utils.write_rows_to_csv(raw_csv, [headers])
     # Execute the scrape in two batches
-    # 1. Current and prior year. Always scrape fresh (i.e. never use cached files)
-    #    in case records have been updated.
-    _scrape_years(
-        site, raw_csv, headers, no_cache_years, use_cache=False, verify=verify
-    )
-    # 2. Years before current & prior, going back to stop_year.
-    #    We should generally use cached files for these older years,
-    #    since data is less likely to be updated.
-    _scrape_years(
-        site, raw_csv, headers, yearly_dates, use_cache=use_cache, verify=verify
-    )
+    try:
+        # 1. Current and prior year. Always scrape fresh search results in case
+        #    records have been updated. Detail pages are only fetched again for
+        #    records whose search result row has changed.
+        _scrape_years(
+            site,
+            raw_csv,
+            headers,
+            no_cache_years,
+            use_cache=False,
+            verify=verify,
+            workers=year_workers,
+        )
+        # 2. Years before current & prior, going back to stop_year.
+        #    We should generally use cached files for these older years,
+        #    since data is less likely to be updated.
+        _scrape_years(
+            site,
+            raw_csv,
+            headers,
+            settled_years,
+            use_cache=use_cache,
+            verify=verify,
+            workers=year_workers,
+        )
+    finally:
+        # Keep what was learned even if the scrape fails partway through
+        index.save()
     _dedupe(raw_csv, output_csv)
     return output_csv
 
 
 def _scrape_years(
-    site, output_csv, headers, start_end_dates, use_cache=True, verify=True
+    site, output_csv, headers, start_end_dates, use_cache=True, verify=True, workers=1
 ):
-    """Loop through years of data and write out to CSV."""
+    """Scrape several years of data at once and write them out to CSV in the order given.
+
+    Busy years are first split into smaller date ranges that each fit on a few
+    pages of results, since the pages of a range can only be walked one by one.
+    Each range gets its own copy of the site and its own temporary CSV, which
+    is appended to output_csv once every earlier range has been written.
+    """
     # NOTE: Scraping for Jan 1 - Dec 31 for current year works
     # throughout the year. Additionally, it allows us to avoid
     # generating cache files for all days of the year.
-    for start, end in start_end_dates:
-        kwargs = {
-            "start_date": start,
-            "end_date": end,
-            "use_cache": use_cache,
-        }
-        pages_dict, data = site.scrape(**kwargs)
-        rows = [_prepare_row(row) for row in data]
-        # We previously wrote the header so use append mode for data rows
-        utils.write_dict_rows_to_csv(output_csv, headers, rows, mode="a")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+
+        def split_year(dates):
+            start, end = dates
+            return site.copy().windows(start, end, use_cache=use_cache)
+
+        def scrape_window(window_csv, start, end):
+            kwargs = {
+                "start_date": start,
+                "end_date": end,
+                "use_cache": use_cache,
+            }
+            # Write each page's rows as it arrives, rather than holding the whole range
+            rows = (
+                _prepare_row(row)
+                for results in site.copy().iter_pages(**kwargs)
+                for row in results["data"]
+            )
+            utils.write_dict_rows_to_csv(window_csv, headers, rows, mode="a")
+            return window_csv
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            windows = [
+                window
+                for pieces in pool.map(split_year, start_end_dates)
+                for window in pieces
+            ]
+            futures = [
+                pool.submit(
+                    scrape_window, Path(tmp_dir, f"{start}_{end}.csv"), start, end
+                )
+                for start, end in windows
+            ]
+            # We previously wrote the header so use append mode for data rows
+            with open(output_csv, "a", newline="") as out:
+                for future in futures:
+                    window_csv = future.result()
+                    # A range without any notices never creates its file
+                    if window_csv.exists():
+                        with open(window_csv, newline="") as src:
+                            shutil.copyfileobj(src, out)
 
 
 def _prepare_row(row):
@@ -132,23 +233,78 @@ def _date_ranges_to_scrape(stop_year):
     return yearly_dates
 
 
-def _dedupe(raw_csv, output_csv):
-    """Create an ordered dict to discard dupes while preserving row order."""
-    data = OrderedDict()
+def _dedupe(raw_csv, output_csv, max_memory_rows=DEDUPE_MEMORY_ROWS):
+    """Copy the raw CSV's rows to output_csv, dropping repeats and preserving row order.
+
+    Rows are parsed as CSV records, so an address spanning several lines is a
+    single row, and only a 16-byte digest of each row is kept in memory. Past
+    max_memory_rows distinct rows the digests move to a temporary SQLite file.
+    """
     raw_count = 0
-    utils.create_directory(raw_csv, is_file=True)
-    with open(raw_csv, newline="") as src:
-        for row in src:
-            raw_count += 1
-            data[row] = row
-    # Write the deduped rows to final output_csv
     final_count = 0
+    utils.create_directory(raw_csv, is_file=True)
     utils.create_directory(output_csv, is_file=True)
-    with open(output_csv, "w", newline="") as out:
-        for row in data.keys():
-            final_count += 1
-            out.write(row)
+    with open(raw_csv, newline="") as src, open(
+        output_csv, "w", newline=""
+    ) as out, _DigestSet(max_memory_rows) as seen:
+        writer = csv.writer(out)
+        for row in csv.reader(src):
+            raw_count += 1
+            digest = hashlib.blake2b(
+                "\x1f".join(row).encode("utf-8"), digest_size=16
+            ).digest()
+            if seen.add(digest):
+                final_count += 1
+                writer.writerow(row)
     num_removed = raw_count - final_count
     if num_removed > 0:
         logger.debug(f"Removed {num_removed} duplicate records from {raw_csv}")
     return output_csv
+
+
+class _DigestSet:
+    """A set of row digests that spills to a temporary SQLite file once it grows large."""
+
+    def __init__(self, max_memory_rows):
+        """Initialize a new instance."""
+        self.max_memory_rows = max_memory_rows
+        self.digests = set()
+        self.db = None
+        self.tmpdir = None
+
+    def add(self, digest):
+        """Add a digest, returning True if it hadn't been seen before."""
+        if self.db is None:
+            if digest in self.digests:
+                return False
+            self.digests.add(digest)
+            if len(self.digests) > self.max_memory_rows:
+                self._spill()
+            return True
+        cursor = self.db.execute(
+            "INSERT OR IGNORE INTO seen (digest) VALUES (?)", (digest,)
+        )
+        return cursor.rowcount == 1
+
+    def _spill(self):
+        """Move the digests held in memory into SQLite."""
+        logger.debug(f"Moving {len(self.digests):,} row digests to disk")
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = sqlite3.connect(Path(self.tmpdir.name, "seen.db"))
+        self.db.execute("PRAGMA journal_mode = OFF")
+        self.db.execute("PRAGMA synchronous = OFF")
+        self.db.execute("CREATE TABLE seen (digest BLOB PRIMARY KEY) WITHOUT ROWID")
+        self.db.executemany(
+            "INSERT INTO seen (digest) VALUES (?)", ((d,) for d in self.digests)
+        )
+        self.digests = set()
+
+    def __enter__(self):
+        """Open the set."""
+        return self
+
+    def __exit__(self, *exc):
+        """Throw away the set, including any file on disk."""
+        if self.db is not None:
+            self.db.close()
+            self.tmpdir.cleanup()
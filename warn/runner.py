@@ -1,18 +1,39 @@
 import logging
+import multiprocessing
+import os
 import shutil
+import time
+import traceback
+import typing
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from importlib import import_module
 from pathlib import Path
 
-from . import utils
+from . import client, pdf, utils
 
 logger = logging.getLogger(__name__)
 
 
+class ScrapeResult(typing.NamedTuple):
+    """The outcome of running a single state's scraper."""
+
+    state: str
+    path: typing.Optional[Path]
+    error: typing.Optional[str]
+    seconds: float
+
+    @property
+    def ok(self) -> bool:
+        """Whether the scraper finished without raising an error."""
+        return self.error is None
+
+
 class Runner:
     """High-level interface for scraping state data.
 
     Provides methods for:
      - scraping a state
+     - scraping many states at once in a pool of worker processes
      - deleting files from prior runs
 
     The data_dir and cache_dir arguments can specify any
@@ -24,16 +45,23 @@ class Runner:
     Args:
         data_dir (str): Path where final output files are saved.
         cache_dir (str): Path to store intermediate files used in ETL.
+        log_dir (str): Path where per-state logs are written by worker processes.
+        export_format (str): "csv", or a columnar format from utils.EXPORT_WRITERS,
+            like "parquet", to also write each state's data in (default "csv").
     """
 
     def __init__(
         self,
         data_dir: Path = utils.WARN_DATA_DIR,
         cache_dir: Path = utils.WARN_CACHE_DIR,
+        log_dir: Path = utils.WARN_LOG_DIR,
+        export_format: str = "csv",
     ):
         """Initialize a new instance."""
         self.data_dir = data_dir
         self.cache_dir = cache_dir
+        self.log_dir = log_dir
+        self.export_format = export_format
 
     def scrape(self, state: str) -> Path:
         """Run the scraper for the provided state.
@@ -41,7 +69,7 @@ class Runner:
         Args:
             state (str): the two-letter postal code of the state to scrape.
 
-        Returns: a Path object leading to the CSV file.
+        Returns: a Path object leading to the CSV file, or the export in another format if one was asked for.
         """
         # Get the module
         state = state.strip().lower()
@@ -49,15 +77,140 @@ class Runner:
 
         # Run the scrape method
         logger.info(f"Scraping {state}")
+        client.get_client().reset_stats()
         data_path = state_mod.scrape(self.data_dir, self.cache_dir)
 
+        # Write it in another format too, if asked
+        schema = getattr(state_mod, "__export_schema__", None)
+        data_path = utils.export(data_path, self.export_format, schema)
+
         # Run the path to the data file
         logger.info(f"Generated {data_path}")
+        client.get_client().log_stats()
         return data_path
 
+    def scrape_many(
+        self, states: typing.Iterable[str], workers: int = 4
+    ) -> typing.List[ScrapeResult]:
+        """Run the scrapers for the provided states at the same time.
+
+        Each state runs in its own freshly spawned process, which exits once the
+        state is done, so a crash, a hung browser or a module-level side effect
+        like the shared HTTP client's stats can't leak into the next state.
+        Every worker logs to its own file in the log_dir. A state listed more
+        than once is only scraped once. The CPUs are divided between the
+        workers for reading PDFs, so they don't each start a pool the size of
+        the machine.
+
+        Args:
+            states (list): the two-letter postal codes of the states to scrape.
+            workers (int): the maximum number of scrapers to run at once (default 4)
+
+        Returns: a list of ScrapeResult objects, in the same order as the states provided.
+        """
+        # Drop repeats, which would otherwise race on the same log and export files
+        states = list(dict.fromkeys(s.strip().lower() for s in states))
+        log_level = logging.getLogger().getEffectiveLevel()
+        results: typing.Dict[str, ScrapeResult] = {}
+
+        logger.info(f"Scraping {len(states)} states with {workers} workers")
+        pdf_workers = pdf.share_cpus(min(workers, len(states)))
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=context, max_tasks_per_child=1
+        ) as pool:
+            futures = {
+                pool.submit(
+                    _scrape_in_worker,
+                    state,
+                    self.data_dir,
+                    self.cache_dir,
+                    self.log_dir,
+                    log_level,
+                    self.export_format,
+                    pdf_workers,
+                ): state
+                for state in states
+            }
+            for future in as_completed(futures):
+                state = futures[future]
+                try:
+                    result = future.result()
+                # A worker that dies outright (e.g. a segfault) never gets to report
+                except Exception as e:
+                    result = ScrapeResult(state, None, repr(e), 0.0)
+                if result.ok:
+                    logger.info(f"Finished {state} in {result.seconds:.1f}s")
+                else:
+                    logger.error(f"Failed {state} after {result.seconds:.1f}s")
+                results[state] = result
+
+        ordered = [results[s] for s in states]
+        self._log_summary(ordered)
+        return ordered
+
     def delete(self):
         """Delete the files in the output directories."""
         logger.debug(f"Deleting files in {self.data_dir}")
         shutil.rmtree(self.data_dir, ignore_errors=True)
         logger.debug(f"Deleting files in {self.cache_dir}")
         shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def _log_summary(self, results: typing.List[ScrapeResult]):
+        """Log which states succeeded, which failed and how long each took."""
+        succeeded = [r for r in results if r.ok]
+        failed = [r for r in results if not r.ok]
+        logger.info(f"{len(succeeded)} succeeded, {len(failed)} failed")
+        for r in sorted(results, key=lambda r: r.seconds, reverse=True):
+            status = "ok" if r.ok else "FAILED"
+            logger.info(f"  {r.state:<4}{status:<8}{r.seconds:>8.1f}s")
+        for r in failed:
+            # The full traceback is in the state's log file; the last line will do here
+            reason = r.error.strip().splitlines()[-1]
+            logger.error(f"{r.state}: {reason} (see {self.log_dir / f'{r.state}.log'})")
+
+
+def _scrape_in_worker(
+    state: str,
+    data_dir: Path,
+    cache_dir: Path,
+    log_dir: Path,
+    log_level: int,
+    export_format: str = "csv",
+    pdf_workers: typing.Optional[int] = None,
+) -> ScrapeResult:
+    """Run one state's scraper inside a worker process, logging to its own file.
+
+    If pdf_workers is given, it caps the processes each PDF is read with.
+    """
+    log_path = log_dir / f"{state}.log"
+    utils.create_directory(log_path, is_file=True)
+    handler = logging.FileHandler(log_path, mode="w", encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(message)s"))
+    root = logging.getLogger()
+    previous_handlers, previous_level = root.handlers, root.level
+    root.handlers = [handler]
+    root.setLevel(log_level)
+    logging.getLogger("urllib3").setLevel(logging.ERROR)
+    logging.getLogger("pdfminer").setLevel(logging.WARNING)
+    previous_pdf_workers = os.environ.get(pdf.WORKERS_ENV)
+    if pdf_workers:
+        os.environ[pdf.WORKERS_ENV] = str(pdf_workers)
+
+    start = time.perf_counter()
+    try:
+        path = Runner(data_dir, cache_dir, log_dir, export_format).scrape(state)
+        error = None
+    except (Exception, SystemExit):
+        # SystemExit too, since some scrapers quit() on import; Ctrl-C still stops the run
+        path = None
+        error = traceback.format_exc()
+        root.error(error)
+    finally:
+        root.handlers, root.level = previous_handlers, previous_level
+        handler.close()
+        if previous_pdf_workers is None:
+            os.environ.pop(pdf.WORKERS_ENV, None)
+        else:
+            os.environ[pdf.WORKERS_ENV] = previous_pdf_workers
+    return ScrapeResult(state, path, error, time.perf_counter() - start)
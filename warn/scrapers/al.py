@@ -7,7 +7,7 @@ from time import sleep
 
 import niquests as requests
 
-from .. import utils
+from .. import client, utils
 from ..cache import Cache
 
 __authors__ = ["zstumgoren", "Dilcia19", "stucka"]
@@ -48,7 +48,7 @@ def scrape(
     people_page = "https://workforce.alabama.gov/warn-list/"
     data_page = "https://workforce.alabama.gov/documents/warn-list/"
 
-    session = requests.Session()
+    session = client.get_client().instrument(requests.Session())
 
     page = session.get(people_page).text
 
@@ -4,12 +4,10 @@ import re
 from pathlib import Path
 from urllib.parse import urlparse
 
-import pdfplumber
 from bs4 import BeautifulSoup
-from openpyxl import load_workbook
 
-from .. import utils
-from ..cache import Cache
+from .. import pdf, utils
+from ..cache import Cache, SourceManifest
 
 __authors__ = ["zstumgoren", "Dilcia19", "ydoc5212"]
 __tags__ = ["html", "pdf", "excel"]
@@ -73,6 +71,12 @@ def scrape(
         file_path = cache.download(f"ca/{file_name}", link)
         file_list.append(file_path)
 
+    # Skip the parse if none of the data files have changed since the last export
+    output_path = data_dir / "ca.csv"
+    manifest = SourceManifest("ca", cache_dir)
+    if manifest.is_current(file_list, output_path):
+        return output_path
+
     # Parse all the data files
     output_rows = []
     for file_ in file_list:
@@ -95,10 +99,10 @@ def scrape(
         "address",
         "source_file",
     ]
-    output_path = data_dir / "ca.csv"
     utils.write_dict_rows_to_csv(
         output_path, output_headers, output_rows, extrasaction="ignore"
     )
+    manifest.save(file_list, output_path)
 
     # Return the path
     return output_path
@@ -107,55 +111,47 @@ def scrape(
 def _extract_excel_data(wb_path):
     """Parse data from the provided Excel file."""
     logger.debug(f"Reading in {wb_path}")
-    wb = load_workbook(filename=wb_path)
     targetsheet = "Detailed WARN Report "
-    if targetsheet in wb.sheetnames:
-        ws = wb[targetsheet]
-        logger.debug(f"Using worksheet '{targetsheet}'")
-    else:
-        ws = wb.worksheets[0]
-        logger.debug(
-            f"Using first worksheet; sheet {targetsheet} not found, but maybe look for them to remove the space"
+    payload = []
+    with utils.open_excel(wb_path) as wb:
+        if targetsheet in wb.sheetnames:
+            ws = wb[targetsheet]
+            logger.debug(f"Using worksheet '{targetsheet}'")
+        else:
+            ws = wb.worksheets[0]
+            logger.debug(
+                f"Using first worksheet; sheet {targetsheet} not found, but maybe look for them to remove the space"
+            )
+        rows = utils.iter_sheet_rows(ws, skip_empty=False)
+        # Throw away initial rows until we reach first data row, and grab the header
+        headers = utils.find_header_row(
+            rows, lambda row: str(row[0] or "").strip().lower().startswith("county")
         )
-    rows = [row for row in ws.rows]
-    # Throw away initial rows until we reach first data row
-    while True:
-        row = rows.pop(0)
-        first_cell = row[0].value.strip().lower()
-        if first_cell.startswith("county"):
-            # Grab the header
-            headers = row
-            break
-
-    # Get the location of the final two fields, which vary from week to week
-    num_employees_index = next(
-        i for i, c in enumerate(headers) if c.value and "employees" in c.value.lower()
-    )
-    address_index = next(
-        i for i, c in enumerate(headers) if c.value and "address" in c.value.lower()
-    )
 
-    # Loop through all the rows
-    payload = []
-    for row in rows:
-        if row[0].value:
-            first_cell = row[0].value.strip().lower()
-            # Exit if we've reached summary row at bottom
-            if first_cell == "report summary":
-                break
-
-            data = {
-                "county": row[0].value.strip(),
-                "notice_date": _convert_date(row[1].value),
-                "received_date": _convert_date(row[2].value),
-                "effective_date": _convert_date(row[3].value),
-                "company": row[4].value.strip(),
-                "layoff_or_closure": row[5].value.strip(),
-                "num_employees": row[num_employees_index].value,
-                "address": row[address_index].value.strip(),
-                "source_file": str(wb_path).split("/")[-1],
-            }
-            payload.append(data)
+        # Get the location of the final two fields, which vary from week to week
+        num_employees_index = utils.find_column(headers, "employees")
+        address_index = utils.find_column(headers, "address")
+
+        # Loop through all the rows
+        for row in rows:
+            if row[0]:
+                first_cell = row[0].strip().lower()
+                # Exit if we've reached summary row at bottom
+                if first_cell == "report summary":
+                    break
+
+                data = {
+                    "county": row[0].strip(),
+                    "notice_date": _convert_date(row[1]),
+                    "received_date": _convert_date(row[2]),
+                    "effective_date": _convert_date(row[3]),
+                    "company": row[4].strip(),
+                    "layoff_or_closure": row[5].strip(),
+                    "num_employees": row[num_employees_index],
+                    "address": row[address_index].strip(),
+                    "source_file": str(wb_path).split("/")[-1],
+                }
+                payload.append(data)
     return payload
 
 
@@ -204,46 +200,44 @@ def _extract_pdf_data(pdf_path):
     }
     data = []
     logger.debug(f"Opening {pdf_path} for PDF parsing")
-    with pdfplumber.open(pdf_path) as pdf:
-        for idx, page in enumerate(pdf.pages):
-            # All pages pages except last should have a single table
-            # Last page has an extra summary table, but indexing
-            # for the first should avoid grabbing the summary data
-            rows = page.extract_tables()[0]
-            # Remove header row on first page
-            # and update the standardized "headers" var if the source
-            # data has no county field, as in the case of
-            # files covering 07/2016-to-06/2017 fiscal year and earlier
-            if idx == 0:
-                raw_header = rows.pop(0)
-                raw_header_str = "-".join([col.strip().lower() for col in raw_header])
-                if "county" not in raw_header_str:
-                    headers.remove("county")
-            # Skip if it's a summary table (this happens
-            # when summary is only table on page, as in 7/2019-6/2020)
-            first_cell = rows[0][0].strip().lower()
-            if "summary" in first_cell:
-                continue
-            for row in rows:
-                # Summary rows have an extra field, and the above code does not
-                # block the summary table from being parsed if it jumps onto another page.
-                if len(row) != len(raw_header) + 1:
-                    data_row = {}
-                    for i, value in enumerate(row):
-                        this_raw_header = raw_header[i]
-                        this_clean_header = header_crosswalk[this_raw_header]
-                        data_row[this_clean_header] = value
-                    # Data clean-ups
-                    data_row.update(
-                        {
-                            "effective_date": data_row["effective_date"].replace(
-                                " ", ""
-                            ),
-                            "received_date": data_row["received_date"].replace(" ", ""),
-                            "source_file": str(pdf_path).split("/")[-1],
-                        }
-                    )
-                    data.append(data_row)
+    # The pages are read in parallel, then walked in order here
+    for idx, tables in enumerate(pdf.extract_tables(pdf_path, all_tables=True)):
+        # All pages pages except last should have a single table
+        # Last page has an extra summary table, but indexing
+        # for the first should avoid grabbing the summary data
+        rows = tables[0]
+        # Remove header row on first page
+        # and update the standardized "headers" var if the source
+        # data has no county field, as in the case of
+        # files covering 07/2016-to-06/2017 fiscal year and earlier
+        if idx == 0:
+            raw_header = rows.pop(0)
+            raw_header_str = "-".join([col.strip().lower() for col in raw_header])
+            if "county" not in raw_header_str:
+                headers.remove("county")
+        # Skip if it's a summary table (this happens
+        # when summary is only table on page, as in 7/2019-6/2020)
+        first_cell = rows[0][0].strip().lower()
+        if "summary" in first_cell:
+            continue
+        for row in rows:
+            # Summary rows have an extra field, and the above code does not
+            # block the summary table from being parsed if it jumps onto another page.
+            if len(row) != len(raw_header) + 1:
+                data_row = {}
+                for i, value in enumerate(row):
+                    this_raw_header = raw_header[i]
+                    this_clean_header = header_crosswalk[this_raw_header]
+                    data_row[this_clean_header] = value
+                # Data clean-ups
+                data_row.update(
+                    {
+                        "effective_date": data_row["effective_date"].replace(" ", ""),
+                        "received_date": data_row["received_date"].replace(" ", ""),
+                        "source_file": str(pdf_path).split("/")[-1],
+                    }
+                )
+                data.append(data_row)
     return data
 
 
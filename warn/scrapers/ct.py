@@ -1,9 +1,7 @@
 import logging
 from pathlib import Path
 
-import requests
-
-from .. import utils
+from .. import client, utils
 from ..cache import Cache
 
 # from bs4 import BeautifulSoup
@@ -41,7 +39,7 @@ def scrape(
     cache = Cache(cache_dir)
 
     logger.debug("Seeking people-friendly page first")
-    r = requests.get(__source__["url"])
+    r = client.get(__source__["url"])
     cookies = r.cookies
 
     headers = {
@@ -60,7 +58,7 @@ def scrape(
 
     logger.debug("Seeking data page")
 
-    r = requests.get(__source__["detail_url"], cookies=cookies, headers=headers)
+    r = client.get(__source__["detail_url"], cookies=cookies, headers=headers)
 
     cache.write("fl/source.json", r.text)
 
@@ -1,11 +1,9 @@
-import datetime
 import logging
 import re
 from os.path import exists
 from pathlib import Path
 
 import niquests
-import pdfplumber
 
 # import requests
 import tenacity
@@ -13,7 +11,7 @@ import urllib3
 from bs4 import BeautifulSoup
 from pyquery import PyQuery as pq
 
-from .. import utils
+from .. import client, pdf, utils
 from ..cache import Cache
 
 __authors__ = ["zstumgoren", "Dilcia19", "shallotly", "stucka"]
@@ -53,7 +51,8 @@ def scrape(
     """
     output_csv = data_dir / "fl.csv"
     cache = Cache(cache_dir)  # ~/.warn-scraper/cache
-    session = niquests.Session()
+    # niquests gets past bot detection; the shared client only keeps count
+    session = client.get_client().instrument(niquests.Session())
     url = "https://floridajobs.org/workforce-resources/worker-adjustment-and-retraining-notification-(warn)"
     response = session.get(url)
     logger.debug(f"Request status is {response.status_code} for {url}")
@@ -106,27 +105,17 @@ def _scrape_html(cache, url, session, page=1):
     # extract year from URL
     year = _extract_year(url)
     html_cache_key = f"fl/{year}_page_{page}.html"
-    current_year = datetime.date.today().year
-    last_year = str(current_year - 1)
-    current_year = str(current_year)
-    page_text = ""
-    # search in cache first before scraping
-    try:
-        # re-scrape current year by default
-        if not (year == current_year or year == last_year):
-            logger.debug(f"Trying to read from cache: {html_cache_key}")
-            cachefile = cache.read(html_cache_key)
-            page_text = cachefile
-            logger.debug(f"Page fetched from cache: {html_cache_key}")
-        else:
-            raise FileNotFoundError
-    except FileNotFoundError:
+    # search in cache first before scraping; the cache's freshness policy re-scrapes recent years
+    if cache.is_fresh(html_cache_key):
+        page_text = cache.read(html_cache_key)
+        logger.debug(f"Page fetched from cache: {html_cache_key}")
+    else:
         # scrape & cache html
         response = session.get(url)
         logger.debug(f"Request status is {response.status_code} for {url}")
         response.raise_for_status()
         page_text = response.text
-        cache.write(html_cache_key, page_text)
+        cache.write(html_cache_key, page_text, url=url)
         logger.debug(f"Successfully scraped page {url} to cache: {html_cache_key}")
     page_text = page_text.replace("</br>", "\n")
     # search the page we just scraped for links to the next page
@@ -190,17 +179,15 @@ def _scrape_pdf(cache, cache_dir, url, session):
         with open(f"{cache_dir}/{pdf_cache_key}", "wb") as f:
             f.write(download)
         logger.debug(f"Successfully scraped PDF from {url} to cache: {pdf_cache_key}")
-    # scrape tables from PDF
-    with pdfplumber.open(f"{cache_dir}/{pdf_cache_key}") as pdf:
-        pages = pdf.pages
-        output_rows = []
-        for page_num, page in enumerate(pages):
-            table = page.extract_table(table_settings={})
-            # remove each year's header
-            if page_num == 0:
-                table.pop(0)
-            table = _clean_table(table, output_rows)
-            output_rows.extend(table)  # merging lists
+    # scrape tables from PDF; the pages are read in parallel, then merged in order here
+    output_rows = []
+    pages = pdf.extract_tables(f"{cache_dir}/{pdf_cache_key}", table_settings={})
+    for page_num, table in enumerate(pages):
+        # remove each year's header
+        if page_num == 0:
+            table.pop(0)
+        table = _clean_table(table, output_rows)
+        output_rows.extend(table)  # merging lists
     logger.debug(f"Successfully scraped PDF from {url}")
     return output_rows
 
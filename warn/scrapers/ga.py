@@ -6,10 +6,9 @@ import re
 from glob import glob
 from pathlib import Path
 
-import requests
 from bs4 import BeautifulSoup, Tag
 
-from .. import utils
+from .. import client, utils
 
 __authors__ = ["chriszs", "esagara", "Ash1R", "stucka"]
 __tags__ = ["html"]
@@ -120,7 +119,7 @@ def scrape(
         "setUrlOnSearch": True,
         "shortcode_atts": {"id": 77460, "class": None, "detail": None},
     }
-    response = requests.post(api_url, data=payload, headers=headers)
+    response = client.post(api_url, data=payload, headers=headers)
 
     # Use JSON as an index to get other data files
     data = response.json()["data"]
@@ -1,12 +1,11 @@
 import datetime
 import logging
 from pathlib import Path
-from time import sleep
 from urllib.parse import quote
 
 from bs4 import BeautifulSoup
 
-from .. import utils
+from .. import client, utils
 
 __authors__ = ["Ash1R", "stucka"]
 __tags__ = ["html", "pdf"]
@@ -38,6 +37,7 @@ def scrape(
     if usegooglecache:
         firstpageurl = cacheprefix + quote(firstpageurl)
 
+    client.limit("labor.hawaii.gov", rate=0.5)
     firstpage = utils.get_url(firstpageurl)
     soup = BeautifulSoup(firstpage.text, features="html5lib")
     pagesection = soup.select("div#container_main")[0]
@@ -58,7 +58,6 @@ def scrape(
     # lastdateseen = "2099-12-31"
 
     for subpageurl in reversed(subpageurls):
-        sleep(2)
         # Conditionally here, we want to check and see if we have the old cached files, or if the year is current or previous.
         # Only need to download if it's current or previous year.
         # But do we care enough to implement right now?
@@ -4,7 +4,7 @@ from pathlib import Path
 from bs4 import BeautifulSoup
 
 from .. import utils
-from ..cache import Cache
+from ..cache import Cache, SourceManifest
 
 __authors__ = ["zstumgoren", "Dilcia19", "shallotly", "palewire", "stucka"]
 __tags__ = ["html", "excel"]
@@ -46,26 +46,29 @@ def scrape(
         if "Excel" in link.text.strip():
             excel_url = "https://workforce.iowa.gov" + link.get("href")
 
-    # Download the Excel file
+    # Download the Excel files
     excel_path = cache.download("ia/source.xlsx", excel_url)
+    historic_url = "https://storage.googleapis.com/bln-data-public/warn-layoffs/ia_historical_2018.xlsx"
+    historic_excel_path = cache.download("ia/historic.xlsx", historic_url)
+
+    # Skip the parse if neither file has changed since the last export
+    data_path = data_dir / "ia.csv"
+    sources = [excel_path, historic_excel_path]
+    manifest = SourceManifest("ia", cache_dir)
+    if manifest.is_current(sources, data_path):
+        return data_path
 
     # Parse it
     row_list = utils.parse_excel(excel_path)
 
-    # Get historic file
-    historic_url = "https://storage.googleapis.com/bln-data-public/warn-layoffs/ia_historical_2018.xlsx"
-    historic_excel_path = cache.download("ia/historic.xlsx", historic_url)
-
     # Parse it, minus the header
     row_list += utils.parse_excel(historic_excel_path, keep_header=False)
     if "Iowa WARN Log" in row_list[0]:
         del row_list[0]
 
-    # Set the export path
-    data_path = data_dir / "ia.csv"
-
     # Write out the file
     utils.write_rows_to_csv(data_path, row_list)
+    manifest.save(sources, data_path)
 
     # Return the path to the file
     return data_path
@@ -3,11 +3,9 @@ import random
 import re
 from pathlib import Path
 
-import pdfplumber
-import requests
 from bs4 import BeautifulSoup
 
-from .. import utils
+from .. import client, pdf, utils
 from ..cache import Cache
 
 __authors__ = ["chriszs", "stucka"]
@@ -49,7 +47,7 @@ def scrape(
     cache = Cache(cache_dir)
     state_code = "id"
     logger.debug(f"Trying to fetch page at {page_url}")
-    r = requests.get(page_url)
+    r = client.get(page_url)
 
     # Start finding the link before "Who to contact"
     html = r.text
@@ -67,15 +65,13 @@ def scrape(
 
     # Loop through the PDF pages and scrape out the data
     output_rows: list = []
-    with pdfplumber.open(pdf_file) as pdf:
-        for index, page in enumerate(pdf.pages):
-            rows = page.extract_table()
-            if rows[0][0] in ["Date of\nLetter", "Date of Letter"] and index > 1:
-                rows = rows[
-                    1:
-                ]  # Drop inside header rows that _clean_table will mangle if merged cells span pages
-            # logger.debug(f"\n\nRows for page {page}: {rows}")
-            output_rows += _clean_table(rows, index)
+    for index, rows in enumerate(pdf.extract_tables(pdf_file)):
+        if rows[0][0] in ["Date of\nLetter", "Date of Letter"] and index > 1:
+            rows = rows[
+                1:
+            ]  # Drop inside header rows that _clean_table will mangle if merged cells span pages
+        # logger.debug(f"\n\nRows for page {page}: {rows}")
+        output_rows += _clean_table(rows, index)
 
     # Write out the data to a CSV
     data_path = data_dir / f"{state_code}.csv"
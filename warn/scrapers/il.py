@@ -2,7 +2,7 @@ import logging
 from pathlib import Path
 
 from .. import utils
-from ..cache import Cache
+from ..cache import Cache, SourceManifest
 
 __authors__ = ["chriszs"]
 __tags__ = ["html", "excel"]
@@ -35,12 +35,18 @@ def scrape(
     url = "https://apps.illinoisworknet.com/iebs/api/public/export?search=&layoffTypes=&trade=0&dateReportedStart=Invalid%20Date&dateReportedEnd=Invalid%20Date&statuses=4&reasons=&eventCauses=&naicsCodes=1&naicIndustries=&naics=&unionsInvolved=0&geolocation=1&cities=&counties=&lwias=&includeAdditionalLwias=false&edrs=&lat=0&lng=0&distance=.5&memberType=1&users=&accessList=&bookmarked=false"
     file_path = cache.download(f"{state_code}/export.xlsx", url)
 
+    # Skip the parse if the file hasn't changed since the last export
+    data_path = data_dir / f"{state_code}.csv"
+    manifest = SourceManifest(state_code, cache_dir)
+    if manifest.is_current([file_path], data_path):
+        return data_path
+
     # Parse it
     row_list = utils.parse_excel(file_path)
 
     # Write out the results
-    data_path = data_dir / f"{state_code}.csv"
     utils.write_rows_to_csv(data_path, row_list)
+    manifest.save([file_path], data_path)
 
     # Return the path to the CSV
     return data_path
@@ -1,13 +1,10 @@
 import csv
 import logging
-import typing
 from pathlib import Path
 
-import requests
-from openpyxl import load_workbook
 from pyquery import PyQuery as pq
 
-from .. import utils
+from .. import client, utils
 from ..cache import Cache
 
 __authors__ = [
@@ -51,7 +48,7 @@ def scrape(
     headers = {
         "User-Agent": "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:109.0) Gecko/20100101 Firefox/116.0"
     }
-    r = requests.get(hostpage, headers=headers)
+    r = client.get(hostpage, headers=headers)
     html = r.content
     buttons = pq(html)("a.btn-block")
     latest_url = None
@@ -127,9 +124,9 @@ def scrape(
     archive_url = "https://storage.googleapis.com/bln-data-public/warn-layoffs/ky-historical-normalized.csv"
 
     logger.debug("Getting KY historical data")
-    r = requests.get(archive_url)
-
-    reader = list(csv.reader(r.text.splitlines()))
+    archive_path = cache.download("ky/historical.csv", archive_url, encoding="utf-8")
+    with open(archive_path, encoding="utf-8", newline="") as fh:
+        reader = list(csv.reader(fh))
 
     localheadersraw = reader[0]
     localheaders: list = []  # type: ignore
@@ -188,7 +185,7 @@ def start_csv(latest_path):
 
 
 def start_xlsx(latest_path):
-    """Begin processing an Excel file, using the parse_xlsx function.
+    """Begin processing an Excel file, one worksheet at a time.
 
     Args:
         latest_path: Path to the Excel file. Was it a path or a string?
@@ -198,10 +195,10 @@ def start_xlsx(latest_path):
     """
     masterlist: list = []
 
-    workbook = load_workbook(filename=latest_path)
+    with utils.open_excel(latest_path) as workbook:
+        sheets = [list(utils.iter_sheet_rows(sheet)) for sheet in workbook.worksheets]
 
-    for sheet in workbook.worksheets:
-        localrows = parse_xlsx(sheet)
+    for localrows in sheets:
 
         # Traverse each tab. Assume the first line is a header. Check if the second line is bogus.
         # Build a list of dicts.
@@ -254,33 +251,5 @@ def start_xlsx(latest_path):
     return masterlist
 
 
-def parse_xlsx(worksheet) -> typing.List[typing.List]:
-    """Parse the Excel xlsx file at the provided path.
-
-    Args:
-        worksheet: An openpyxl worksheet ready to parse
-
-    Returns: List of values ready to write.
-    """
-    # Convert the sheet to a list of lists
-    row_list = []
-    for r in worksheet.rows:
-        # Parse cells
-        cell_list = [cell.value for cell in r]
-
-        # Skip empty rows
-        try:
-            # A list with only empty cells will throw an error
-            next(c for c in cell_list if c)
-        except StopIteration:
-            continue
-
-        # Add to the master list
-        row_list.append(cell_list)
-
-    # Pass it back
-    return row_list
-
-
 if __name__ == "__main__":
     scrape()
@@ -1,7 +1,7 @@
-import json
 import logging
 import os
 import re
+from contextlib import nullcontext
 from pathlib import Path
 
 from bs4 import BeautifulSoup
@@ -17,10 +17,22 @@ __source__ = {
     "name": "Louisiana Workforce Commission",
     "url": "https://www.laworks.net/Downloads/Downloads_WFD.asp",
 }
+# The headers in the PDFs drift, so Parquet and Arrow exports stick to these columns
+__export_schema__ = {
+    "company": "string",
+    "address": "string",
+    "date_notice": "date",
+    "date_action": "date",
+    "affected": "int",
+    "notes": "string",
+    "_int_pdf_filename": "string",
+    "_int_page": "int",
+}
 
 logger = logging.getLogger(__name__)
 
-want_debugging_file = True
+# Write how pdfrodent sorted every row to la/debugging*.jsonl in the cache
+want_debugging_file = False
 
 
 def scrape(
@@ -71,19 +83,16 @@ def scrape(
     if historicalneeded:
         logger.debug(f"Need to process historical records")
         historicallist = []
-        historicaldebug = []
-        for historicalfile in historicalfiles:
-            locallist, localdebug = pdfrodent.parse_pdf(historicalfile, headerfixes)
-            historicallist.extend(locallist)
-            historicaldebug.extend(localdebug)
+        trace_path = Path(cache_dir) / "la/debugging-historical.jsonl"
+        with (
+            pdfrodent.TraceSink(trace_path) if want_debugging_file else nullcontext()
+        ) as tracer:
+            for historicalfile in historicalfiles:
+                locallist = pdfrodent.parse_pdf(historicalfile, headerfixes, tracer=tracer)
+                historicallist.extend(locallist)
 
         with open(Path(cache_dir) / "la/historical.json", "w") as outfile:
             outfile.write(json.dumps(historicallist), indent=4*" ")
-
-        if want_debugging_file:
-            with open(Path(cache_dir) / "la/debugging-historical.txt", "w") as outfile:
-                for row in historicaldebug:
-                    outfile.write(json.dumps(row) + "\r\n")
     else:
         logger.debug(f"No historical data missing.")
 
@@ -107,23 +116,24 @@ def scrape(
     links = document.find_all("a")
 
     masterlist = []
-    fulldebug = []
-
-    for link in links:
-        if "WARN Notices" in link.text:
-            # Download the PDF
-            pdf_url = f"{base_url}{link['href']}"
-            rawbin, rawtext = utils.get_with_zyte(pdf_url)
-            pdf_path = cache_dir / f"{state_code}/{os.path.basename(pdf_url)}"
-
-            with open(pdf_path, "wb") as fp:
-                fp.write(rawbin)
-
-            # Process the PDF
-            logger.debug(f"Attempting to parse {pdf_path}")
-            locallist, localdebug = pdfrodent.parse_pdf(pdf_path, headerfixes)
-            masterlist.extend(locallist)
-            fulldebug.extend(localdebug)
+    trace_path = Path(cache_dir) / "la/debugging.jsonl"
+    with (
+        pdfrodent.TraceSink(trace_path) if want_debugging_file else nullcontext()
+    ) as tracer:
+        for link in links:
+            if "WARN Notices" in link.text:
+                # Download the PDF
+                pdf_url = f"{base_url}{link['href']}"
+                rawbin, rawtext = utils.get_with_zyte(pdf_url)
+                pdf_path = cache_dir / f"{state_code}/{os.path.basename(pdf_url)}"
+
+                with open(pdf_path, "wb") as fp:
+                    fp.write(rawbin)
+
+                # Process the PDF
+                logger.debug(f"Attempting to parse {pdf_path}")
+                locallist = pdfrodent.parse_pdf(pdf_path, headerfixes, tracer=tracer)
+                masterlist.extend(locallist)
 
     # Earlier versions assumed headers were the same. Let's not do that.
     # Identify all header elements, even in the ones we're about to remove.
@@ -181,11 +191,6 @@ def scrape(
     with open(Path(cache_dir) / "la/allheaders.txt", "w") as outfile:
         outfile.write(text)
 
-    if want_debugging_file:
-        with open(Path(cache_dir) / "la/debugging.txt", "w") as outfile:
-            for row in fulldebug:
-                outfile.write(json.dumps(row) + "\r\n")
-
     targetfilename = data_dir / f"{state_code}.csv"
     logger.debug(f"Writing {len(masterlist):,} rows of data to {targetfilename}")
     utils.write_disparate_dict_rows_to_csv(targetfilename, masterlist)
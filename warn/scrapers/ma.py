@@ -6,7 +6,6 @@ from pathlib import Path
 from urllib.parse import unquote, urljoin
 
 from bs4 import BeautifulSoup
-from openpyxl import load_workbook
 
 from .. import utils
 from ..cache import Cache
@@ -141,15 +140,14 @@ def _parse_workbook(excel_path: Path) -> list:
 
     Returns: a list of dicts keyed by CANONICAL_HEADER
     """
-    workbook = load_workbook(filename=excel_path, read_only=True, data_only=True)
     rows: list = []
-    for sheet in workbook.worksheets:
-        sheet_rows = [list(r) for r in sheet.iter_rows(values_only=True)]
-        if _has_region_column(sheet_rows):
-            rows.extend(_parse_flat_rows(sheet_rows))
-        else:
-            rows.extend(_parse_region_sheet(sheet_rows, sheet.title.strip()))
-    workbook.close()
+    with utils.open_excel(excel_path, data_only=True) as workbook:
+        for sheet in workbook.worksheets:
+            sheet_rows = list(utils.iter_sheet_rows(sheet, skip_empty=False))
+            if _has_region_column(sheet_rows):
+                rows.extend(_parse_flat_rows(sheet_rows))
+            else:
+                rows.extend(_parse_region_sheet(sheet_rows, sheet.title.strip()))
     return rows
 
 
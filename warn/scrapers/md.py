@@ -1,11 +1,10 @@
 import logging
 import re
 from pathlib import Path
-from time import sleep
 
 from bs4 import BeautifulSoup
 
-from .. import utils
+from .. import client, utils
 from ..cache import Cache
 
 __authors__ = ["zstumgoren", "Dilcia19", "shallotly"]
@@ -40,6 +39,9 @@ def scrape(
     request_headers = {"User-Agent": "BigLocalNews.org"}
     request_verify = False
 
+    # Try to stop blocked connections by being less aggressive
+    client.limit("www.dllr.state.md.us", rate=1 / naptime)
+
     # Get the page
     url = "https://www.dllr.state.md.us/employment/warn.shtml"
     r = utils.get_url(url, headers=request_headers, verify=request_verify)
@@ -49,8 +51,6 @@ def scrape(
     # Save it to the cache
     cache.write("md/source.html", html)
 
-    sleep(naptime)  # Try to stop blocked connections by being less aggressive
-
     # Parse the list of links
     soup = BeautifulSoup(html, "html.parser")
     a_list = soup.find_all("a", {"class": "sub"})
@@ -86,7 +86,6 @@ def scrape(
 
         if href not in old_pages:
             logger.debug(f"Trying special handling on {href}")
-            sleep(naptime)  # Try to stop blocked connections by being less aggressive
             r = utils.get_url(url, headers=request_headers, verify=request_verify)
             r.encoding = "utf-8"
             html = r.text
@@ -2,10 +2,9 @@ import json
 import logging
 from pathlib import Path
 
-import requests
 from pyquery import PyQuery as pq
 
-from .. import utils
+from .. import client, utils
 from ..cache import Cache
 
 __authors__ = ["anikasikka", "stucka"]
@@ -41,7 +40,7 @@ def scrape(
 
     headers = {"User-Agent": "Big Local News (biglocalnews.org)"}
 
-    r = requests.get(sourcejson, headers=headers)
+    r = client.get(sourcejson, headers=headers)
 
     # Save the semi-raw data
     cache = Cache()
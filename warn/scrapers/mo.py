@@ -51,16 +51,8 @@ def scrape(
         # Set the URL, with a hack for 2020 and 2022
         url = f"https://jobs.mo.gov/warn/{year}"
 
-        # Read from cache if available and not this year or the year before
-        cache_key = f"mo/{year}.html"
-        if cache.exists(cache_key) and year < current_year - 1:
-            html = cache.read(cache_key)
-        else:
-            # Otherwise, go request it
-            r = utils.get_url(url)
-            html = r.text
-            # Save it to the cache
-            cache.write(cache_key, html)
+        # Read from cache if its freshness policy allows, otherwise go request it
+        html = cache.read_or_fetch(f"mo/{year}.html", url)
 
         # Add it to the list
         html_list.append(html)
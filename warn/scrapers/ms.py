@@ -1,5 +1,5 @@
-import json
 import logging
+from contextlib import nullcontext
 from pathlib import Path
 
 from pyquery import PyQuery as pq
@@ -7,7 +7,7 @@ from pyquery import PyQuery as pq
 from warn.pdfrodent import pdfrodent as pdfrodent
 
 from .. import utils
-from ..cache import Cache
+from ..cache import Cache, SourceManifest
 
 __authors__ = ["Ash1R", "stucka"]
 __tags__ = ["pdf"]
@@ -15,9 +15,28 @@ __source__ = {
     "name": "Mississippi Department of Employment Security",
     "url": "https://mdes.ms.gov/information-center/warn-information/",
 }
+# The headers in the PDFs drift, so Parquet and Arrow exports stick to these columns
+__export_schema__ = {
+    "company": "string",
+    "city": "string",
+    "county": "string",
+    "date_notice": "date",
+    "date_effective": "date",
+    "affected": "int",
+    "notices_received": "int",
+    "event_number": "string",
+    "naics": "string",
+    "action_type": "string",
+    "notice_types": "string",
+    "reason": "string",
+    "workforce_area": "string",
+    "_int_pdf_filename": "string",
+    "_int_page": "int",
+}
 
 logger = logging.getLogger(__name__)
-want_debugging_file = True
+# Write how pdfrodent sorted every row to ms/debugging.jsonl in the cache
+want_debugging_file = False
 
 
 def scrape(
@@ -60,14 +79,24 @@ def scrape(
         basefilename = urlwanted.split("/")[-1]
         localfilename = cache_dir / f"ms/{basefilename}"
         if i <= 4:  # Get the five newest files to ensure proper overlap
-            logger.debug(f"Fetching fresh copy of {localfilename}")
-            utils.save_if_good_url(localfilename, urlwanted)
+            # A conditional request only transfers the file if it has changed
+            logger.debug(f"Checking for a fresh copy of {localfilename}")
+            try:
+                cache.download(f"ms/{basefilename}", urlwanted)
+            except AssertionError:
+                logger.error(f"URL {urlwanted} fetch failed; keeping any cached copy")
         else:
             logger.debug(f"Getting copy of {localfilename} if needed")
             utils.fetch_if_not_cached(localfilename, urlwanted)
 
     pdffiles = sorted(cache.files(subdir="ms/", glob_pattern="*.pdf"))
 
+    # Skip the parse if none of the PDFs have changed since the last export
+    targetfilename = data_dir / "ms.csv"
+    manifest = SourceManifest("ms", cache_dir)
+    if manifest.is_current(pdffiles, targetfilename):
+        return targetfilename
+
     headerfixes = {
         "": "blank_entry",
         "# Affected": "affected",
@@ -116,11 +145,12 @@ def scrape(
     }
 
     masterlist = []
-    rowholder = []
-    for pdffile in pdffiles:
-        locallist, localrows = pdfrodent.parse_pdf(pdffile, headerfixes)
-        masterlist.extend(locallist)
-        rowholder.extend(localrows)
+    trace_path = Path(cache_dir) / "ms/debugging.jsonl"
+    with (
+        pdfrodent.TraceSink(trace_path) if want_debugging_file else nullcontext()
+    ) as tracer:
+        for pdffile in pdffiles:
+            masterlist.extend(pdfrodent.parse_pdf(pdffile, headerfixes, tracer=tracer))
 
     # Identify all header elements, even in the ones we're about to remove.
     allheaders = set()
@@ -133,7 +163,6 @@ def scrape(
     with open(Path(cache_dir) / "ms/allheaders.txt", "w") as outfile:
         outfile.write(text)
 
-    targetfilename = data_dir / "ms.csv"
     logger.debug(f"Found {len(masterlist):,} extracted rows from the PDFs.")
     cleaned = pdfrodent.drop_thin_rows(masterlist, 6)
     logger.debug(
@@ -141,10 +170,6 @@ def scrape(
     )
     # utils.write_disparate_dict_rows_to_csv(targetfilename, masterlist)
     utils.write_disparate_dict_rows_to_csv(targetfilename, cleaned)
-
-    if want_debugging_file:
-        with open(Path(cache_dir) / "ms/debugging.txt", "w") as outfile:
-            for row in rowholder:
-                outfile.write(json.dumps(row) + "\r\n")
+    manifest.save(pdffiles, targetfilename)
 
     return targetfilename
@@ -1,10 +1,9 @@
 from pathlib import Path
 
 from bs4 import BeautifulSoup, Tag
-from openpyxl import load_workbook
 
 from .. import utils
-from ..cache import Cache
+from ..cache import Cache, SourceManifest
 
 __authors__ = ["zstumgoren", "ydoc5212"]
 __tags__ = ["html", "excel"]
@@ -55,33 +54,18 @@ def scrape(
     # Download the Excel file
     excel_path = cache.download("mt/source.xlsx", excel_url, verify=True)
 
-    # Open it up
-    workbook = load_workbook(filename=excel_path)
-
-    # Get the first sheet
-    worksheet = workbook.worksheets[0]
-
-    # Convert the sheet to a list of lists
-    row_list = []
-    for row in worksheet.rows:
-        # Get the cells
-        cell_list = [cell.value for cell in row]
-
-        # Skip empty rows
-        try:
-            # A list with only empty cell will throw an error
-            next(i for i in cell_list if i)
-        except StopIteration:
-            continue
-
-        # Add it to the pile
-        row_list.append(cell_list)
-
-    # Set the export path
+    # Skip the parse if the workbook hasn't changed since the last export
     data_path = data_dir / "mt.csv"
+    manifest = SourceManifest("mt", cache_dir)
+    if manifest.is_current([excel_path], data_path):
+        return data_path
+
+    # Stream the first sheet's rows, minus the empty ones, straight to the file
+    row_list = utils.iter_excel_rows(excel_path)
 
     # Write out the file
     utils.write_rows_to_csv(data_path, row_list)
+    manifest.save([excel_path], data_path)
 
     # Return the path to the file
     return data_path
@@ -2,10 +2,8 @@ import logging
 import re
 from pathlib import Path
 
-import pdfplumber
-
-from .. import utils
-from ..cache import Cache
+from .. import pdf, utils
+from ..cache import Cache, SourceManifest
 
 __authors__ = ["riordan"]
 __tags__ = ["pdf"]
@@ -41,38 +39,43 @@ def scrape(
     cache_key = f"{state_code}/WARN_Notices_2015_to_present.pdf"
     pdf_path = cache.download(cache_key, pdf_url)
 
+    # Skip the parse if the PDF hasn't changed since the last export
+    data_path = data_dir / f"{state_code}.csv"
+    manifest = SourceManifest(state_code, cache_dir)
+    if manifest.is_current([pdf_path], data_path):
+        return data_path
+
     # Loop through the PDF pages and pull out the table
     output_rows: list = []
     header_written = False
-    with pdfplumber.open(pdf_path) as pdf:
-        for page_index, page in enumerate(pdf.pages):
-            rows = page.extract_table() or []
-
-            for rowindex, row in enumerate(rows):
-                # Standardize each cell
-                output_row = [_clean_text(cell) for cell in row]
-
-                # Skip fully empty rows
-                if not any(output_row):
+    for page_index, rows in enumerate(pdf.extract_tables(pdf_path)):
+        rows = rows or []
+
+        for rowindex, row in enumerate(rows):
+            # Standardize each cell
+            output_row = [_clean_text(cell) for cell in row]
+
+            # Skip fully empty rows
+            if not any(output_row):
+                continue
+
+            # The header repeats at the top of the table. Keep it once.
+            if output_row[0] == "Company Name":
+                if header_written:
+                    logger.debug(
+                        f"Skipping repeated header row on page {page_index + 1}"
+                    )
                     continue
+                header_written = True
 
-                # The header repeats at the top of the table. Keep it once.
-                if output_row[0] == "Company Name":
-                    if header_written:
-                        logger.debug(
-                            f"Skipping repeated header row on page {page_index + 1}"
-                        )
-                        continue
-                    header_written = True
-
-                if rowindex > 0:  # If not a header row
-                    if output_row[1].endswith(", ND"):
-                        output_row[1] = output_row[1][:-4]
-                output_rows.append(output_row)
+            if rowindex > 0:  # If not a header row
+                if output_row[1].endswith(", ND"):
+                    output_row[1] = output_row[1][:-4]
+            output_rows.append(output_row)
 
     # Write out to CSV
-    data_path = data_dir / f"{state_code}.csv"
     utils.write_rows_to_csv(data_path, output_rows)
+    manifest.save([pdf_path], data_path)
 
     # Return the path
     return data_path
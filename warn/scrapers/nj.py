@@ -1,10 +1,8 @@
 import logging
 from pathlib import Path
 
-from openpyxl import load_workbook
-
 from .. import utils
-from ..cache import Cache
+from ..cache import Cache, SourceManifest
 
 __authors__ = ["zstumgoren", "Dilcia19", "palewire"]
 __tags__ = ["html"]
@@ -36,47 +34,47 @@ def scrape(
     url = "https://www.nj.gov/labor/assets/PDFs/WARN/WARN_Notice_Archive.xlsx"
     wb_path = cache.download("nj/source.xlsx", url)
 
+    # Skip the parse if the workbook hasn't changed since the last export
+    data_path = data_dir / "nj.csv"
+    manifest = SourceManifest("nj", cache_dir)
+    if manifest.is_current([wb_path], data_path):
+        return data_path
+
     # Read in the workbook
     output_rows = []
-    wb = load_workbook(filename=wb_path)
-    for ws in wb.worksheets:
-        logger.debug(f"Parsing {ws}")
-        for i, row in enumerate(ws.rows):
+    with utils.open_excel(wb_path) as wb:
+        for ws in wb.worksheets:
+            logger.debug(f"Parsing {ws}")
+            rows = utils.iter_sheet_rows(ws, skip_empty=False)
             # Skip header
-            if i == 0:
-                continue
-
-            # A list with only empty cells will throw an error
-            try:
-                next(v for v in row if v.value)
-            except StopIteration:
-                continue
-
-            # Parse out data
-            d = {
-                "Company": _parse_value(row[0]),
-                "City": _parse_value(row[1]),
-                "Month Posted": _parse_value(row[2]),
-                "Effective Date": _parse_value(row[3]),
-                "Workforce Affected": _parse_value(row[4]),
-            }
-
-            # Tack it on
-            output_rows.append(d)
-
-    # Set the export path
-    data_path = data_dir / "nj.csv"
+            next(rows, None)
+            for row in rows:
+                # Skip empty rows
+                if not any(row):
+                    continue
+
+                # Parse out data
+                d = {
+                    "Company": _parse_value(row[0]),
+                    "City": _parse_value(row[1]),
+                    "Month Posted": _parse_value(row[2]),
+                    "Effective Date": _parse_value(row[3]),
+                    "Workforce Affected": _parse_value(row[4]),
+                }
+
+                # Tack it on
+                output_rows.append(d)
 
     # Write out the file
     headers = output_rows[0].keys()
     utils.write_dict_rows_to_csv(data_path, headers, output_rows)
+    manifest.save([wb_path], data_path)
 
     # Return the path to the file
     return data_path
 
 
-def _parse_value(cell):
-    v = cell.value
+def _parse_value(v):
     if isinstance(v, str):
         return v.strip()
     return v
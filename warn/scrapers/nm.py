@@ -1,14 +1,12 @@
 import logging
 import os
 import re
-from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
-import pdfplumber
 from bs4 import BeautifulSoup
 
-from .. import utils
+from .. import pdf, utils
 from ..cache import Cache
 
 __authors__ = ["chriszs"]
@@ -66,32 +64,26 @@ def scrape(
     for pdf_index, pdf_url in enumerate(pdf_urls):
         file_name = os.path.basename(pdf_url)
         cache_key = f"{state_code}/{file_name}"
+        # Only downloaded again if the cache's freshness policy says it may have changed
         year = _extract_year(file_name)
-        current_year = datetime.now().year
-        if cache.exists(cache_key) and year is not None and year < current_year - 1:
-            pdf_path = Path(cache_dir, cache_key)
-        else:
-            pdf_path = cache.download(cache_key, pdf_url)
-
-        with pdfplumber.open(pdf_path) as pdf:
-            for page_index, page in enumerate(pdf.pages):
-                rows = page.extract_table()
-
-                # Loop through the rows
-                for row_index, row in enumerate(rows):
-                    # Skip headers on all but first page of first PDF
-                    if pdf_index > 0 and row_index == 0:
-                        logger.debug(
-                            f"Skipping header row on PDF {pdf_index+1} page {page_index+1}"
-                        )
-                        continue
-
-                    # Extract data
-                    output_row = [_clean_text(cell) for cell in row]
-
-                    # Write row
-                    if any([cell != "" for cell in output_row]):
-                        output_rows.append(output_row)
+        pdf_path = cache.download(cache_key, pdf_url, year=year)
+
+        for page_index, rows in enumerate(pdf.extract_tables(pdf_path)):
+            # Loop through the rows
+            for row_index, row in enumerate(rows):
+                # Skip headers on all but first page of first PDF
+                if pdf_index > 0 and row_index == 0:
+                    logger.debug(
+                        f"Skipping header row on PDF {pdf_index+1} page {page_index+1}"
+                    )
+                    continue
+
+                # Extract data
+                output_row = [_clean_text(cell) for cell in row]
+
+                # Write row
+                if any([cell != "" for cell in output_row]):
+                    output_rows.append(output_row)
 
     # Write out to CSV
     data_path = data_dir / f"{state_code}.csv"
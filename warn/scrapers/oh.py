@@ -6,7 +6,7 @@ from pathlib import Path
 
 import niquests as requests  # Avoid some detection schemes
 
-from .. import utils
+from .. import client, utils
 from ..cache import Cache
 
 __authors__ = ["zstumgoren", "Dilcia19", "chriszs", "stucka"]
@@ -44,7 +44,8 @@ def scrape(
     # latesturl = "https://jfs.ohio.gov/job-services-and-unemployment/job-services/job-programs-and-services/submit-a-warn-notice/current-public-notices-of-layoffs-and-closures-sa"
     latesturl = "https://jfs.ohio.gov/job-workforce-services/job-programs-and-services/submit-a-warn-notice/current-public-notices-of-layoffs-and-closures"
     logger.debug(f"Attempting to fetch current data from {latesturl}")
-    r = requests.get(latesturl, headers=headers)
+    session = client.get_client().instrument(requests.Session())
+    r = session.get(latesturl, headers=headers)
     cache.write("oh/index.html", r.text)
     logger.debug("Attempting to get CSV link from Ohio file")
     html = r.text
@@ -55,7 +56,7 @@ def scrape(
         logger.error(html)
 
     logger.debug(f"CSV link found at {csv_url}")
-    r = requests.get(csv_url, headers=headers)
+    r = session.get(csv_url, headers=headers)
     cache.write("oh/rawdata.csv", r.text)
 
     # Ohio CSV as of June 2026 was coming in with extra prefacing headers that ... make it not a CSV.
@@ -81,7 +82,7 @@ def scrape(
         "Notice ID": "Notice ID",
     }
 
-    r = requests.get(
+    r = client.get(
         "https://storage.googleapis.com/bln-data-public/warn-layoffs/oh_historical.csv"
     )
     reader = list(csv.DictReader(r.text.splitlines()))
@@ -1,11 +1,10 @@
 import logging
+from itertools import islice
 from pathlib import Path
 
-import requests
 from bs4 import BeautifulSoup, Tag
-from openpyxl import load_workbook
 
-from .. import utils
+from .. import client, utils
 from ..cache import Cache
 
 __authors__ = ["zstumgoren", "Dilcia19", "ydoc5212", "stucka"]
@@ -37,7 +36,7 @@ def scrape(
     starturl = "https://ccwd.hecc.oregon.gov/Layoff/WARN/Download"
     baseurl = "https://ccwd.hecc.oregon.gov"
 
-    r = requests.get(starturl)
+    r = client.get(starturl)
 
     cookies = r.cookies
 
@@ -74,7 +73,7 @@ def scrape(
         "Connection": "keep-alive",
     }
 
-    r = requests.post(starturl, cookies=cookies, data=payload, headers=requestheaders)
+    r = client.post(starturl, cookies=cookies, data=payload, headers=requestheaders)
 
     dlsoup = BeautifulSoup(r.content, features="html5lib")
     excellink = dlsoup.find("a", {"class": "btn-primary"})
@@ -89,19 +88,17 @@ def scrape(
     logger.debug(f"Trying to save to, we hope, {cache_dir/latest_excel_path}")
     cache.download(latest_excel_path, excelurl)
 
-    workbook = load_workbook(filename=cache_dir / latest_excel_path)
-    worksheet = workbook.worksheets[0]
-
     masterlist: list = []
-    headers: list = []
 
-    sheetrows = list(worksheet.rows)
-    for cell in sheetrows[2]:
-        headers.append(cell.value)
-    for row in sheetrows[3:]:
+    # The header is on the third row
+    sheetrows = islice(
+        utils.iter_excel_rows(cache_dir / latest_excel_path, skip_empty=False), 2, None
+    )
+    headers: list = next(sheetrows)
+    for row in sheetrows:
         line = {}
         for i, item in enumerate(headers):
-            line[item] = list(row)[i].value
+            line[item] = row[i]
         if (
             len(str(line[headers[0]])) + len(str(line[headers[1]])) != 0
         ):  # Filter out blank rows
@@ -112,32 +109,33 @@ def scrape(
     historical_excel_path = str(cache_dir) + "/or/historical.xlsx"
 
     utils.fetch_if_not_cached(historical_excel_path, historicalurl)
-    workbook = load_workbook(filename=historical_excel_path)
 
     # Get the first sheet
-    worksheet = workbook.worksheets[0]
-    sheetrows = list(worksheet.rows)
-
-    historical_headers = []
-    for cell in sheetrows[2]:
-        historical_headers.append(cell.value)
+    sheetrows = islice(
+        utils.iter_excel_rows(historical_excel_path, skip_empty=False), 2, None
+    )
+    historical_headers = next(sheetrows)
 
     if historical_headers != headers:
         logger.error("Newest headers no longer match historical headers")
     else:
         logger.debug("OK! Newest headers match historical headers.")
 
+    # Look up rows already seen in a set, rather than searching the whole list for each
+    seen = {tuple(line.items()) for line in masterlist}
     duplicated_rows = 0
-    for row in sheetrows[3:]:
+    for row in sheetrows:
         line = {}
         for i, item in enumerate(headers):
-            line[item] = list(row)[i].value
+            line[item] = row[i]
         if (
             len(str(line[headers[0]])) + len(str(line[headers[1]]))
         ) != 0:  # Filter out blank rows
-            if line in masterlist:
+            key = tuple(line.items())
+            if key in seen:
                 duplicated_rows += 1
             else:
+                seen.add(key)
                 masterlist.append(line)
 
     logger.debug(f"{duplicated_rows:,} duplicated rows not added.")
@@ -1,9 +1,7 @@
 import logging
-import typing
 from pathlib import Path
 
 from bs4 import BeautifulSoup
-from openpyxl import load_workbook
 
 from .. import utils
 from ..cache import Cache
@@ -53,12 +51,7 @@ def scrape(
             excel_path = cache.download(f"{state_code}/WARN Report.xlsx", excel_url)
 
             # Open it up
-            workbook = load_workbook(filename=excel_path)
-
-            dirty_list: list = []
-            for sheet in workbook.worksheets:
-                localrows = parse_xlsx(sheet)
-                dirty_list.extend(localrows)
+            dirty_list = list(utils.iter_excel_rows(excel_path, sheet=None))
 
             headers = dirty_list[1]  # Skip false header at position 0
             headers = [x for x in headers if x is not None]
@@ -107,33 +100,5 @@ def scrape(
     return data_path
 
 
-def parse_xlsx(worksheet) -> typing.List[typing.List]:
-    """Parse the Excel xlsx file at the provided path.
-
-    Args:
-        worksheet: An openpyxl worksheet ready to parse
-
-    Returns: List of values ready to write.
-    """
-    # Convert the sheet to a list of lists
-    row_list = []
-    for r in worksheet.rows:
-        # Parse cells
-        cell_list = [cell.value for cell in r]
-
-        # Skip empty rows
-        try:
-            # A list with only empty cells will throw an error
-            next(c for c in cell_list if c)
-        except StopIteration:
-            continue
-
-        # Add to the master list
-        row_list.append(cell_list)
-
-    # Pass it back
-    return row_list
-
-
 if __name__ == "__main__":
     scrape()
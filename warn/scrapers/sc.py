@@ -1,12 +1,10 @@
 import logging
 import re
-from datetime import datetime
 from pathlib import Path
 
-import pdfplumber
 from bs4 import BeautifulSoup
 
-from .. import utils
+from .. import pdf, utils
 from ..cache import Cache
 
 __authors__ = ["palewire"]
@@ -76,66 +74,58 @@ def scrape(
     date_re = re.compile("^[0-9]{1,2}/[0-9]{1,2}[/]{1,2}[0-9]{2}")
     jobs_re = re.compile("^[0-9]{1,4}$")
 
-    current_year = datetime.now().year
     output_rows = []
     for pdf_year, pdf_href in pdf_dict.items():
         cache_key = f"sc/{pdf_year}.pdf"
-        if cache.exists(cache_key) and pdf_year < (current_year - 1):
-            pdf_path = cache.path / cache_key
-        else:
-            pdf_path = cache.download(
-                cache_key, f"https://scworks.org/{pdf_href}", verify=False
-            )
-
-        # Open the PDF
-        with pdfplumber.open(pdf_path) as pdf:
-            # Loop through the pages
-            for page in pdf.pages:
-                # Pull out the table
-                row_list = page.extract_table()
-
-                # Skip empty pages
-                if not row_list:
+        # Only downloaded again if the cache's freshness policy says it may have changed
+        pdf_path = cache.download(
+            cache_key, f"https://scworks.org/{pdf_href}", year=pdf_year, verify=False
+        )
+
+        # Loop through the tables on each page, which are read in parallel
+        for row_list in pdf.extract_tables(pdf_path):
+            # Skip empty pages
+            if not row_list:
+                continue
+
+            # Skip skinny and empty rows
+            real_rows = []
+            for row in row_list:
+                values = [v for v in row if v]
+                if len(values) < 4:
+                    continue
+                real_rows.append(row)
+
+            # Loop through each row in the table
+            for row in real_rows:
+                # Clean values
+                cell_list = [_clean_cell(c) for c in row if _clean_cell(c)]
+
+                # Pluck out the values based on our regex
+                d = {}
+                for cell in cell_list:
+                    if naics_re.search(cell):
+                        d["naics"] = cell
+                    elif date_re.search(cell):
+                        d["date"] = cell
+                    elif jobs_re.search(cell):
+                        d["jobs"] = int(cell)
+
+                # If there haven't been at least two matches, it must be junk
+                if len(d) < 2:
                     continue
 
-                # Skip skinny and empty rows
-                real_rows = []
-                for row in row_list:
-                    values = [v for v in row if v]
-                    if len(values) < 4:
-                        continue
-                    real_rows.append(row)
-
-                # Loop through each row in the table
-                for row in real_rows:
-                    # Clean values
-                    cell_list = [_clean_cell(c) for c in row if _clean_cell(c)]
-
-                    # Pluck out the values based on our regex
-                    d = {}
-                    for cell in cell_list:
-                        if naics_re.search(cell):
-                            d["naics"] = cell
-                        elif date_re.search(cell):
-                            d["date"] = cell
-                        elif jobs_re.search(cell):
-                            d["jobs"] = int(cell)
-
-                    # If there haven't been at least two matches, it must be junk
-                    if len(d) < 2:
-                        continue
-
-                    # The first one should be the company
-                    d["company"] = cell_list[0]
-
-                    # The second one should be the location
-                    d["location"] = cell_list[1]
-
-                    # Tack in the source PDF
-                    d["source"] = cache_key
-
-                    # Keep what we got
-                    output_rows.append(d)
+                # The first one should be the company
+                d["company"] = cell_list[0]
+
+                # The second one should be the location
+                d["location"] = cell_list[1]
+
+                # Tack in the source PDF
+                d["source"] = cache_key
+
+                # Keep what we got
+                output_rows.append(d)
 
     # Write out the data to a CSV
     data_path = data_dir / "sc.csv"
@@ -1,15 +1,12 @@
 import logging
-import random
 import re
 import sys
 from pathlib import Path
-from time import sleep
 
 import niquests as requests
 from bs4 import BeautifulSoup
-from openpyxl import load_workbook
 
-from .. import utils
+from .. import client, utils
 from ..cache import Cache
 
 __authors__ = ["Dilcia19", "ydoc5212"]
@@ -41,7 +38,9 @@ def scrape(
     # Get the root URL
     url = "https://www.twc.texas.gov/data-reports/warn-notice"
     #    pagebin, html = utils.get_with_zyte(url)
-    session = requests.Session()
+    # One request every three seconds, the middle of the two-to-four we used to sleep
+    client.limit("www.twc.texas.gov", rate=1 / 3)
+    session = client.get_client().instrument(requests.Session())
 
     page = session.get(url)
     logger.debug(f"Page retrieval with response code {page.status_code}")
@@ -52,7 +51,6 @@ def scrape(
     #        user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/999.0.0.0 Safari/537.36",
     #    )
     html = page.text
-    sleep(random.uniform(2, 4))
 
     # Cache it
     cache.write("tx/source.html", html)
@@ -97,24 +95,17 @@ def scrape(
 
         with open(excel_path, "wb") as outfile:
             outfile.write(r.content)
-        sleep(random.uniform(2, 4))
 
         # filename = f"tx/{year}{ext}"
         # excelbin, exceltext = utils.get_with_zyte(data_url)
         # excel_path = cache.write_binary(filename, excelbin)
 
-        # Open it up
-        workbook = load_workbook(filename=excel_path)
-
-        # Get the first sheet
-        worksheet = workbook.worksheets[0]
-
-        # Convert the sheet to a list of lists
-        for irow, row in enumerate(worksheet.rows):
+        # Convert the first sheet to a list of lists
+        rows = utils.iter_excel_rows(excel_path, skip_empty=False)
+        for irow, cell_list in enumerate(rows):
             # Skip headers after the first workbook
             if ihref > 0 and irow == 0:
                 continue
-            cell_list = [cell.value for cell in row]
 
             # Skip empty rows
             if cell_list[0] is None:
@@ -129,14 +120,8 @@ def scrape(
     )
     excel_path = cache.download("tx/historical.xlsx", historical_url)
 
-    # Open it up
-    workbook = load_workbook(filename=excel_path)
-
-    # Get the first sheet
-    worksheet = workbook.worksheets[0]
-
-    # Convert the sheet to a list of lists
-    for i, row in enumerate(worksheet.rows):
+    # Convert the first sheet to a list of lists
+    for i, row in enumerate(utils.iter_excel_rows(excel_path, skip_empty=False)):
         # Skip header
         if i == 0:
             continue
@@ -154,8 +139,7 @@ def scrape(
         ]
 
         # Tack 'em on
-        cell_list = [c.value for c in select_columns]
-        row_list.append(cell_list)
+        row_list.append(select_columns)
 
     # Set the export path
     data_path = data_dir / "tx.csv"
@@ -2,10 +2,9 @@ import logging
 import re
 from pathlib import Path
 
-import requests
 from bs4 import BeautifulSoup, Tag
 
-from .. import utils
+from .. import client, utils
 from ..cache import Cache
 
 __authors__ = ["zstumgoren", "Dilcia19"]
@@ -36,7 +35,7 @@ def scrape(
 
     output_rows = []
 
-    with requests.Session() as session:
+    with client.session() as session:
         # Request the initial page
         url = "https://fortress.wa.gov/esd/file/warn/Public/SearchWARN.aspx"
         user_agent = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:68.0) Gecko/20100101 Firefox/68.0"
@@ -63,14 +63,8 @@ def scrape(
             continue
 
         # Request fresh pages, use cache for old ones
-        cache_key = f"wi/{year}.html"
-        if cache.exists(cache_key) and year < current_year - 1:
-            html = cache.read(cache_key)
-        else:
-            url = f"https://dwd.wisconsin.gov/dislocatedworker/warn/default.htm?year={year}"
-            r = utils.get_url(url)
-            html = r.text
-            cache.write(cache_key, html)
+        url = f"https://dwd.wisconsin.gov/dislocatedworker/warn/default.htm?year={year}"
+        html = cache.read_or_fetch(f"wi/{year}.html", url)
 
         # Add to the list
         html_list.append(html)
@@ -2,14 +2,20 @@ import csv
 import json
 import logging
 import os
+import pickle
+import tempfile
+import time
 import typing
 from base64 import b64decode, b64encode
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from itertools import islice
 from pathlib import Path
-from time import sleep
+from urllib.parse import urlsplit
 
-import requests
 from openpyxl import load_workbook
-from retry import retry
+
+from . import client
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +32,31 @@ WARN_CACHE_DIR = WARN_OUTPUT_DIR / "cache"
 WARN_DATA_DIR = WARN_OUTPUT_DIR / "exports"
 WARN_LOG_DIR = WARN_OUTPUT_DIR / "logs"
 
+# Rows handed to the CSV writer at a time by the write_*_csv helpers
+WRITE_BATCH_SIZE = 1000
+
+# Rows in each record batch of a columnar export
+EXPORT_BATCH_SIZE = 65_536
+
+# Types given to columns with these names in a columnar export, unless a scraper
+# declares its own __export_schema__. Other columns are kept as strings.
+EXPORT_COLUMN_TYPES = {
+    "notice_date": "date",
+    "received_date": "date",
+    "effective_date": "date",
+    "date_notice": "date",
+    "date_received": "date",
+    "date_effective": "date",
+    "date_action": "date",
+    "jobs": "int",
+    "affected": "int",
+    "num_employees": "int",
+    "number_of_employees_affected": "int",
+}
+
+# Date layouts recognized in date columns, tried in order after ISO 8601
+EXPORT_DATE_FORMATS = ("%m/%d/%Y", "%m/%d/%y", "%b %d, %Y", "%B %d, %Y", "%m-%d-%Y")
+
 
 def create_directory(path: Path, is_file: bool = False):
     """Create the filesystem directories for the provided Path objects.
@@ -59,18 +90,17 @@ def fetch_if_not_cached(filename, url, **kwargs):
         url: The URL from which the file may be downloaded.
     Notes: Should this even be in utils vs. cache? Should it exist?
     """
-    if "timeout" not in kwargs:
-        kwargs["timeout"] = 120
     create_directory(Path(filename), is_file=True)
     if not os.path.exists(filename):
         logger.debug(f"Fetching {filename} from {url}")
-        response = requests.get(url, **kwargs)
+        # Be polite to hosts whose scrapers haven't declared a rate limit of their own
+        client.limit(urlsplit(url).netloc, client.POLITE_RATE, replace=False)
+        response = client.get(url, **kwargs)
         if not response.ok:
             logger.error(f"Failed to fetch {url} to {filename}")
         else:
             with open(filename, "wb") as outfile:
                 outfile.write(response.content)
-        sleep(2)  # Pause between requests
     return
 
 
@@ -83,9 +113,9 @@ def save_if_good_url(filename, url, **kwargs):
     Notes: Should this even be in utils vs. cache? Should it exist?
     """
     create_directory(Path(filename), is_file=True)
-    if "timeout" not in kwargs:
-        kwargs["timeout"] = 120
-    response = requests.get(url, **kwargs)
+    # Be polite to hosts whose scrapers haven't declared a rate limit of their own
+    client.limit(urlsplit(url).netloc, client.POLITE_RATE, replace=False)
+    response = client.get(url, **kwargs)
     if not response.ok:
         logger.error(f"URL {url} fetch failed with {response.status_code}")
         logger.error(f"Not saving to {filename}. Is a new year's URL not started?")
@@ -96,7 +126,6 @@ def save_if_good_url(filename, url, **kwargs):
             outfile.write(response.content)
             success_flag = True
             content = response.content
-    sleep(2)  # Pause between requests
     return success_flag, content
 
 
@@ -123,9 +152,6 @@ def get_with_zyte(url, json_extras=None, **kwargs):
         )
         return (None, None)
 
-    if "timeout" not in kwargs:
-        kwargs["timeout"] = 120
-
     myjson = {
         "url": url,
         "httpResponseBody": True,
@@ -135,7 +161,7 @@ def get_with_zyte(url, json_extras=None, **kwargs):
         for item in json_extras:
             myjson[item] = json_extras[item]
 
-    api_response = requests.post(
+    api_response = client.post(
         "https://api.zyte.com/v1/extract",
         auth=(zyte_api_key, ""),
         json=myjson,
@@ -185,16 +211,13 @@ def post_with_zyte(url, payload, **kwargs):
         )
         return (None, None)
 
-    if "timeout" not in kwargs:
-        kwargs["timeout"] = 120
-
     if isinstance(payload, dict):
         payload = json.dumps(payload)
 
     if isinstance(payload, str):
         payload = b64encode(payload.encode("utf-8"))
 
-    api_response = requests.post(
+    api_response = client.post(
         "https://api.zyte.com/v1/extract",
         auth=(zyte_api_key, ""),
         json={
@@ -218,33 +241,51 @@ def post_with_zyte(url, payload, **kwargs):
     return (returnbin, returntext)
 
 
-def write_rows_to_csv(output_path: Path, rows: list, mode="w"):
-    """Write the provided list to the provided path as comma-separated values.
+def write_rows_to_csv(
+    output_path: Path, rows: typing.Iterable[typing.Sequence], mode="w"
+) -> int:
+    """Write the provided rows to the provided path as comma-separated values.
+
+    Rows can come from any iterable, including a generator, and are written in
+    batches as they arrive, so they never need to be held in memory all at once.
 
     Args:
-        rows (list): the list to be saved
+        rows (iterable): the rows to be saved
         output_path (Path): the Path were the result will be saved
         mode (str): the mode to be used when opening the file (default 'w')
+
+    Returns: the number of rows written
     """
     create_directory(output_path, is_file=True)
-    logger.debug(f"Writing {len(rows):,} rows to {output_path}")
+    count = 0
     with open(output_path, mode, newline="", encoding="utf-8") as f:
         writer = csv.writer(f)
-        writer.writerows(rows)
+        for batch in _batches(rows):
+            writer.writerows(batch)
+            count += len(batch)
+    logger.debug(f"Wrote {count:,} rows to {output_path}")
+    return count
+
 
+def write_dict_rows_to_csv(
+    output_path, headers, rows: typing.Iterable[dict], mode="w", extrasaction="raise"
+) -> int:
+    """Write the provided dictionaries to the provided path as comma-separated values.
 
-def write_dict_rows_to_csv(output_path, headers, rows, mode="w", extrasaction="raise"):
-    """Write the provided list of dictionaries to the provided path as comma-separated values.
+    Rows can come from any iterable, including a generator, and are written in
+    batches as they arrive.
 
     Args:
         output_path (Path): the Path were the result will be saved
         headers (list): a list of the headers for the output file
-        rows (list): the list of dictionaries to be saved
+        rows (iterable): the dictionaries to be saved
         mode (str): the mode to be used when opening the file (default 'w')
         extrasaction (str): what to do if the if a field isn't in the headers (default 'raise')
+
+    Returns: the number of rows written, not counting the header
     """
     create_directory(output_path, is_file=True)
-    logger.debug(f"Writing {len(rows):,} rows to {output_path}")
+    count = 0
     with open(output_path, mode, newline="") as f:
         # Create the writer object
         writer = csv.DictWriter(f, fieldnames=headers, extrasaction=extrasaction)
@@ -252,63 +293,316 @@ def write_dict_rows_to_csv(output_path, headers, rows, mode="w", extrasaction="r
         if mode == "w":
             # ... drop in the headers
             writer.writeheader()
-        # Loop through the dicts and write them in one by one.
-        for row in rows:
-            writer.writerow(row)
+        # Write the dicts out a batch at a time
+        for batch in _batches(rows):
+            writer.writerows(batch)
+            count += len(batch)
+    logger.debug(f"Wrote {count:,} rows to {output_path}")
+    return count
+
+
+def _batches(rows: typing.Iterable, size: typing.Optional[int] = None):
+    """Split an iterable into lists of up to the provided size (default WRITE_BATCH_SIZE)."""
+    iterator = iter(rows)
+    while batch := list(islice(iterator, size or WRITE_BATCH_SIZE)):
+        yield batch
 
 
 def write_disparate_dict_rows_to_csv(
-    output_path, rows, mode="w", prefixes: None | list = None
-):
+    output_path,
+    rows: typing.Iterable[dict],
+    mode="w",
+    prefixes: None | list = None,
+    spill: bool = False,
+) -> int:
     """Write the provided list of dictionaries to the provided path as comma-separated values, while determining a header.
 
+    The header is every key found in the rows, in the order they first appear,
+    so all of the rows have to be read before any can be written. By default
+    they're held in memory. With spill=True they're pickled to a temporary file
+    as they're read instead, then streamed back out, so a huge output never has
+    to fit in memory.
+
     Args:
         output_path (Path): the Path were the result will be saved
-        rows (list): the list of dictionaries to be saved; can have disparate dict keys
+        rows (iterable): the dictionaries to be saved; can have disparate dict keys
         mode (str): the mode to be used when opening the file (default 'w')
         prefixes(list|None): text strings that determine whether fields should arrive after other fields.
             Send an empty list, [], to run without any prefixes.
             Send None or don't send to use default prefixes of _int_ and int_
+        spill (bool): whether to hold the rows in a temporary file rather than memory (default False)
+
+    Returns: the number of rows written, not counting the header
     """
     if not prefixes:
         prefixes = ["int_", "_int_"]
-    logger.debug(f"Writing {(len(rows)+1):,} rows to {output_path}")
+    prefix_tuple = tuple(prefixes)
     create_directory(output_path, is_file=True)
-    headers: list = []  # We want to preserve order, and set won't do it.
-    headerextras: list = []  # stuff that should be at the right of the field list
-    for row in rows:
-        for item in row:
-            if item not in headers and item not in headerextras:
-                prefixhere = False
-                for prefix in prefixes:
-                    if item:
-                        if item.startswith(prefix):
-                            prefixhere = True
-                if prefixhere:
-                    headerextras.append(item)
-                else:
-                    headers.append(item)
-    logger.debug(
-        f"Found {(len(headers) + len(headerextras)):,} header entries in the supplied list of dicts."
-    )
-    headers.extend(headerextras)
-    with open(output_path, mode, newline="") as outfile:
-        # Create the writer object
-        writer = csv.writer(outfile)
-        # If we are writing a new row ...
-        if mode == "w":
-            # ... drop in the headers
-            writer.writerow(headers)
-        # Loop through the dicts and write them in one by one.
+
+    # Dicts keep their insertion order, so they make ordered sets
+    headers: dict = {}
+    headerextras: dict = {}  # stuff that should be at the right of the field list
+
+    def discover(rows):
+        # Each new key has its prefix checked once, and known keys are a quick lookup
         for row in rows:
-            line = {}
-            for item in headers:
-                if item in row:
-                    line[item] = row[item]
-                else:
-                    line[item] = None
-            writer.writerow(list(line.values()))
-    return
+            for item in row:
+                if item not in headers and item not in headerextras:
+                    if item and item.startswith(prefix_tuple):
+                        headerextras[item] = None
+                    else:
+                        headers[item] = None
+            yield row
+
+    with tempfile.TemporaryFile() if spill else nullcontext() as spill_file:
+        if spill:
+            count = 0
+            for row in discover(rows):
+                pickle.dump(row, spill_file, protocol=pickle.HIGHEST_PROTOCOL)
+                count += 1
+            spill_file.seek(0)
+            rows = (pickle.load(spill_file) for _ in range(count))
+        else:
+            rows = list(discover(rows))
+            count = len(rows)
+
+        logger.debug(
+            f"Found {(len(headers) + len(headerextras)):,} header entries in the supplied list of dicts."
+        )
+        columns = list(headers) + list(headerextras)
+        with open(output_path, mode, newline="") as outfile:
+            # Create the writer object
+            writer = csv.writer(outfile)
+            # If we are writing a new row ...
+            if mode == "w":
+                # ... drop in the headers
+                writer.writerow(columns)
+            # Write the values in column order, leaving blanks for missing keys
+            for batch in _batches(rows):
+                writer.writerows([row.get(c) for c in columns] for row in batch)
+
+    logger.debug(f"Wrote {count:,} rows to {output_path}")
+    return count
+
+
+def export(
+    csv_path: Path,
+    format: str = "csv",
+    schema: typing.Optional[typing.Dict[str, str]] = None,
+) -> Path:
+    """Write a state's CSV export in another format, alongside the CSV.
+
+    Without a schema, the columns follow the CSV's header. Those named in
+    EXPORT_COLUMN_TYPES get dates or integers, and the rest are strings.
+
+    Scrapers whose headers change from run to run, like those that read
+    PDFs with pdfrodent, should declare an ``__export_schema__`` mapping each
+    column to "string", "int" or "date". The export then has exactly those
+    columns, in that order, every time. Anything else in the CSV is left out.
+
+    Blank cells, and cells that can't be read as their column's type, become
+    nulls; the CSV keeps the original text. Rows are read and written a batch
+    at a time.
+
+    The columnar formats require the pyarrow package, from the "export" extra.
+
+    Args:
+        csv_path (Path): the CSV written by a scraper
+        format (str): "csv", or one of the EXPORT_WRITERS, like "parquet" or "arrow" (default "csv")
+        schema (dict): column names mapped to their types, in order. Optional.
+
+    Returns: the Path to the export in the requested format
+    """
+    if format == "csv":
+        return csv_path
+    if format not in EXPORT_WRITERS:
+        raise ValueError(
+            f"Unknown export format {format!r}; pick csv or one of {', '.join(EXPORT_WRITERS)}"
+        )
+    out_path = Path(csv_path).with_suffix(f".{format}")
+    logger.debug(f"Exporting {csv_path} to {out_path}")
+    count = EXPORT_WRITERS[format](Path(csv_path), out_path, schema)
+    logger.debug(f"Wrote {count:,} rows to {out_path}")
+    return out_path
+
+
+def write_parquet(
+    csv_path: Path, out_path: Path, types: typing.Optional[typing.Dict[str, str]] = None
+) -> int:
+    """Write a CSV export as a zstd-compressed Parquet file.
+
+    Returns: the number of rows written
+    """
+    pa = _import_pyarrow()
+    import pyarrow.parquet as pq
+
+    schema, positions = _export_schema(csv_path, types)
+    count = 0
+    with pq.ParquetWriter(out_path, schema, compression="zstd") as writer:
+        for batch in _export_batches(csv_path, schema, positions):
+            writer.write_batch(batch)
+            count += batch.num_rows
+        # An export with no rows still gets its columns
+        if not count:
+            writer.write_table(pa.Table.from_batches([], schema=schema))
+    return count
+
+
+def write_arrow(
+    csv_path: Path, out_path: Path, types: typing.Optional[typing.Dict[str, str]] = None
+) -> int:
+    """Write a CSV export as a zstd-compressed Arrow IPC file.
+
+    Returns: the number of rows written
+    """
+    pa = _import_pyarrow()
+
+    schema, positions = _export_schema(csv_path, types)
+    options = pa.ipc.IpcWriteOptions(compression="zstd")
+    count = 0
+    with pa.ipc.new_file(out_path, schema, options=options) as writer:
+        for batch in _export_batches(csv_path, schema, positions):
+            writer.write_batch(batch)
+            count += batch.num_rows
+    return count
+
+
+# The formats, beyond CSV, that exports can be written in. Add a function that takes
+# a CSV path, an output path and an optional schema, and returns the rows written,
+# to support another.
+EXPORT_WRITERS: typing.Dict[str, typing.Callable[..., int]] = {
+    "parquet": write_parquet,
+    "arrow": write_arrow,
+}
+
+
+def _import_pyarrow():
+    """Import pyarrow, which only the columnar exports need."""
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc  # noqa: F401
+    except ImportError:
+        raise ImportError(
+            "Parquet and Arrow exports require pyarrow; "
+            "install it with `pip install warn-scraper[export]`"
+        )
+    return pa
+
+
+def has_pyarrow() -> bool:
+    """Check whether pyarrow, which the columnar exports need, is installed."""
+    try:
+        _import_pyarrow()
+    except ImportError:
+        return False
+    return True
+
+
+def _export_schema(
+    csv_path: Path, types: typing.Optional[typing.Dict[str, str]] = None
+) -> typing.Tuple[typing.Any, typing.List[typing.Optional[int]]]:
+    """Build the schema of a columnar export, and find where each column is in the CSV.
+
+    Without types, there's a column for every one in the CSV. Rows wider than
+    the header get extra columns, and blank or repeated names are made
+    unique, so every cell has somewhere to go.
+
+    Returns: the Arrow schema, and the CSV position of each of its columns,
+        or None for a column the CSV doesn't have
+    """
+    pa = _import_pyarrow()
+    arrow_types = {"string": pa.string(), "int": pa.int64(), "date": pa.date32()}
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        width = max([len(header)] + [len(row) for row in reader])
+
+    if types is not None:
+        unknown = set(types.values()) - set(arrow_types)
+        if unknown:
+            raise ValueError(f"Unknown export column types: {', '.join(unknown)}")
+        left_out = [name for name in header if name and name not in types]
+        if left_out:
+            logger.warning(
+                f"Leaving columns out of the {csv_path} export: {', '.join(left_out)}"
+            )
+        positions = [header.index(name) if name in header else None for name in types]
+        fields = [pa.field(name, arrow_types[kind]) for name, kind in types.items()]
+        return (pa.schema(fields), positions)
+
+    names: typing.List[str] = []
+    for i in range(width):
+        name = header[i] if i < len(header) and header[i] else f"column_{i + 1}"
+        unique, n = name, 2
+        while unique in names:
+            unique, n = f"{name}_{n}", n + 1
+        names.append(unique)
+    fields = [
+        pa.field(name, arrow_types[EXPORT_COLUMN_TYPES.get(name, "string")])
+        for name in names
+    ]
+    return (pa.schema(fields), list(range(width)))
+
+
+def _export_batches(
+    csv_path: Path, schema, positions: typing.List[typing.Optional[int]]
+):
+    """Read a CSV's rows, after its header, as Arrow record batches."""
+    pa = _import_pyarrow()
+    converters = {
+        pa.string(): str,
+        pa.int64(): _parse_export_int,
+        pa.date32(): _parse_export_date,
+    }
+    columns = list(zip(schema, positions))
+    failures = dict.fromkeys(schema.names, 0)
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for rows in _batches(reader, EXPORT_BATCH_SIZE):
+            arrays = []
+            for field, i in columns:
+                convert = converters[field.type]
+                values = []
+                for row in rows:
+                    cell = row[i] if i is not None and i < len(row) else ""
+                    value = convert(cell) if cell else None
+                    if cell and value is None:
+                        failures[field.name] += 1
+                    values.append(value)
+                arrays.append(pa.array(values, type=field.type))
+            yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+    for name, count in failures.items():
+        if count:
+            logger.warning(
+                f"{count:,} cells in {csv_path}'s {name} column couldn't be read "
+                "as its type and were exported as nulls"
+            )
+
+
+def _parse_export_int(text: str) -> typing.Optional[int]:
+    """Read a count like "1,200" or "35.0" as an integer, or return None."""
+    try:
+        number = float(text.replace(",", ""))
+    except ValueError:
+        return None
+    return int(number) if number.is_integer() else None
+
+
+def _parse_export_date(text: str):
+    """Read a date in ISO 8601 or one of the EXPORT_DATE_FORMATS, or return None."""
+    text = text.strip()
+    try:
+        # Also covers the "2021-01-13 00:00:00" that spreadsheet dates are written as
+        return datetime.fromisoformat(text).date()
+    except ValueError:
+        pass
+    for layout in EXPORT_DATE_FORMATS:
+        try:
+            return datetime.strptime(text, layout).date()
+        except ValueError:
+            continue
+    return None
 
 
 def get_all_scrapers():
@@ -323,16 +617,17 @@ def get_all_scrapers():
     )
 
 
-@retry(tries=3, delay=15, backoff=2)
 def get_url(
     url, user_agent="Big Local News (biglocalnews.org)", session=None, **kwargs
 ):
     """Request the provided URL and return a response object.
 
+    Retries for connection errors and 429/5xx responses are handled by the shared client.
+
     Args:
         url (str): the url to be requested
         user_agent (str): the user-agent header passed with the request (default: biglocalnews.org)
-        session: a session object to use when making the request. optional
+        session: a session object to use when making the request, e.g. from client.session(). optional
     """
     logger.debug(f"Requesting {url}")
 
@@ -341,15 +636,21 @@ def get_url(
         kwargs["headers"] = {}
     kwargs["headers"]["User-Agent"] = user_agent
 
-    if "timeout" not in kwargs:
-        kwargs["timeout"] = 120
-
     # Go get it
-    if session is not None:
+    if isinstance(session, client.PooledSession):
         logger.debug(f"Requesting with session {session}")
         response = session.get(url, **kwargs)
+    elif session is not None:
+        # A session from elsewhere can't use our pool, but it still gets counted
+        if "timeout" not in kwargs:
+            kwargs["timeout"] = client.DEFAULT_TIMEOUT
+        logger.debug(f"Requesting with session {session}")
+        client.get_client().limiter.wait(url)
+        start = time.perf_counter()
+        response = session.get(url, **kwargs)
+        client.get_client().measure(response, url, start, kwargs.get("stream", False))
     else:
-        response = requests.get(url, **kwargs)
+        response = client.get(url, **kwargs)
     logger.debug(f"Response code: {response.status_code}")
 
     # Verify that the response is 200
@@ -368,31 +669,125 @@ def parse_excel(excel_path: Path, keep_header: bool = True) -> typing.List[typin
 
     Returns: List of values ready to write.
     """
-    # Open it up
-    workbook = load_workbook(filename=excel_path)
+    rows = iter_excel_rows(excel_path)
 
-    # Get the first sheet
-    worksheet = workbook.worksheets[0]
+    # Skip the header row, if that's what the user wants
+    if not keep_header:
+        next(rows, None)
 
     # Convert the sheet to a list of lists
-    row_list = []
-    for i, r in enumerate(worksheet.rows):
-        # Skip the header row, if that's what the user wants
-        if i == 0 and not keep_header:
-            continue
+    return list(rows)
 
-        # Parse cells
-        cell_list = [cell.value for cell in r]
 
-        # Skip empty rows
-        try:
-            # A list with only empty cells will throw an error
-            next(c for c in cell_list if c)
-        except StopIteration:
+@contextmanager
+def open_excel(excel_path: Path, data_only: bool = False):
+    """Open an Excel workbook in read-only mode, closing it once the block is done.
+
+    Read-only mode streams rows from the file instead of building an object for
+    every cell, which is much faster and leaner on big workbooks. Its sheets
+    don't have cell styles or hyperlinks, just values.
+
+    Example:
+        Picking a sheet by name::
+
+            with utils.open_excel(path) as workbook:
+                for row in utils.iter_sheet_rows(workbook["Detail"]):
+                    ...
+
+    Args:
+        excel_path (Path): The path to an XLSX file
+        data_only (bool): Read formulas' last calculated values rather than the formulas (default False)
+    """
+    workbook = load_workbook(filename=excel_path, read_only=True, data_only=data_only)
+    try:
+        yield workbook
+    finally:
+        # Read-only workbooks hold their file open until they're closed
+        workbook.close()
+
+
+def iter_sheet_rows(worksheet, skip_empty: bool = True) -> typing.Iterator[typing.List]:
+    """Yield the values in each row of a worksheet as a list.
+
+    Read-only worksheets size their rows by the <dimension> tag in the file,
+    which some programs leave out or get wrong, so rows can come back short
+    or be dropped. Here every row in the file is read, and each is padded
+    with None to at least the declared width and the widest row so far, so
+    columns can be looked up by position as with a fully loaded workbook.
+
+    Args:
+        worksheet: An openpyxl worksheet, ideally from a workbook opened with open_excel
+        skip_empty (bool): Whether to leave out rows without any values (default True)
+    """
+    width = 0
+    if hasattr(worksheet, "reset_dimensions"):
+        width = worksheet.max_column or 0
+        worksheet.reset_dimensions()
+    for row in worksheet.iter_rows(values_only=True):
+        values = list(row)
+        width = max(width, len(values))
+        values.extend([None] * (width - len(values)))
+        if skip_empty and not any(values):
             continue
+        yield values
+
 
-        # Add to the master list
-        row_list.append(cell_list)
+def iter_excel_rows(
+    excel_path: Path,
+    sheet: typing.Union[int, str, None] = 0,
+    skip_empty: bool = True,
+    data_only: bool = False,
+) -> typing.Iterator[typing.List]:
+    """Yield the values in each row of an Excel file as a list, one row at a time.
+
+    The workbook is closed once the last row has been read. To stop early,
+    use open_excel and iter_sheet_rows instead, so it's closed when you're done.
+
+    Args:
+        excel_path (Path): The path to an XLSX file
+        sheet (int or str): The index or name of the sheet to read, or None for every sheet in order (default 0)
+        skip_empty (bool): Whether to leave out rows without any values (default True)
+        data_only (bool): Read formulas' last calculated values rather than the formulas (default False)
+    """
+    with open_excel(excel_path, data_only=data_only) as workbook:
+        if sheet is None:
+            worksheets = workbook.worksheets
+        elif isinstance(sheet, int):
+            worksheets = [workbook.worksheets[sheet]]
+        else:
+            worksheets = [workbook[sheet]]
+        for worksheet in worksheets:
+            yield from iter_sheet_rows(worksheet, skip_empty=skip_empty)
 
-    # Pass it back
-    return row_list
+
+def find_header_row(
+    rows: typing.Iterator[typing.List], match: typing.Callable[[typing.List], bool]
+) -> typing.List:
+    """Read rows until the header, leaving the iterator at the first row after it.
+
+    Args:
+        rows (iterator): Rows of values, like those from iter_sheet_rows
+        match (function): Returns True when handed the header row
+
+    Returns: The header row
+    """
+    for row in rows:
+        if match(row):
+            return row
+    raise ValueError("No header row found")
+
+
+def find_column(header: typing.List, text: str) -> int:
+    """Find the first column whose header contains some text, ignoring case.
+
+    Args:
+        header (list): The values in a header row
+        text (str): The text to look for
+
+    Returns: The column's index
+    """
+    text = text.lower()
+    for index, value in enumerate(header):
+        if value and text in str(value).lower():
+            return index
+    raise ValueError(f"No column header contains {text!r}: {header}")